@@ -1,17 +1,22 @@
 """aem api action"""
 import os
 import json
+import time
 import yaml
+import asyncio
 from dataclasses import dataclass, asdict
 from typing import Optional
 from packaging.version import Version
 from utils import api_utils
+from utils import outputs
+from utils import readiness
 from kpghalogger import KpghaLogger
 
 logger = KpghaLogger()
 workspace = os.getenv('GITHUB_WORKSPACE')
 operation = os.getenv('OPERATION')
 manifest_deploy = bool(os.getenv('MANIFEST_DEPLOY'))
+deploy_concurrency = int(os.getenv('AEM_DEPLOY_CONCURRENCY') or 4) # servers of a group deployed at once
 
 
 @dataclass
@@ -65,6 +70,7 @@ class DeploymentData:
     version_deployed: Optional[bool] = None
     path: Optional[str] = None
     content_path: Optional[str] = None
+    readiness_wait: Optional[float] = None
     
     def to_dict(self) -> dict:
         """Convert to dictionary, excluding None values"""
@@ -104,8 +110,7 @@ def main():
     )
         
     try:
-        for value in vault_map.values(): # iterative deployment to each server
-            deploy_aem_packages(value, deploy_package, deploy_env, artifact_paths, rollback_flow, deployment_data)
+        deploy_aem_packages(vault_map, deploy_package, deploy_env, artifact_paths, rollback_flow, deployment_data)
     except RuntimeError as e: # deploy failure scenario
         deployment_data.deploy_status = 'FAILED'
         deployment_data.rollback = rollback_package
@@ -115,22 +120,67 @@ def main():
             post_deploy_aem_packages(deployment_data_map, vault_map, deployment_data, rollback_package, rollback_flow)
 
 
-def deploy_aem_packages(value, deploy_package: DeploymentPackage, deploy_env, artifact_paths, rollback_flow, deployment_data: DeploymentData):
-    """delete, upload and install packages"""
-    aem_creds = value.get('aem_creds')
-    env_details_path = {}
-    for k,v in artifact_paths.items():
-        env_details_path[k] = v    
-    for server in value.get('server'): # iterate through author and publisher servers
+def deploy_aem_packages(vault_map, deploy_package: DeploymentPackage, deploy_env, artifact_paths, rollback_flow, deployment_data: DeploymentData):
+    """delete, upload and install packages - server groups in order (author before publishers), servers of a group concurrently"""
+    asyncio.run(schedule_deployments(vault_map, deploy_package, deploy_env, artifact_paths, rollback_flow, deployment_data))
+
+
+async def schedule_deployments(vault_map, deploy_package: DeploymentPackage, deploy_env, artifact_paths, rollback_flow, deployment_data: DeploymentData):
+    """deploy each server group after the previous one succeeded, stopping at the first failure"""
+    semaphore = asyncio.Semaphore(max(deploy_concurrency, 1))
+    failed = asyncio.Event()
+    existing_paths = dict(deploy_package.path or {}) # every server starts from the previously deployed packages
+    env_details_path = dict(artifact_paths)
+    await readiness.capture_baseline(vault_map)
+    for group, value in vault_map.items(): # author first, then publishers
+        aem_creds = value.get('aem_creds')
+        servers = value.get('server') or []
+        start = time.monotonic()
+        server_paths = [dict(existing_paths) for _ in servers]
+        results = await asyncio.gather(*[
+            deploy_server(semaphore, failed, server, server_path, deploy_package, deploy_env, env_details_path, aem_creds, rollback_flow, deployment_data)
+            for server, server_path in zip(servers, server_paths)
+        ], return_exceptions=True)
+        if deploy_package.path is None:
+            deploy_package.path = {}
+        group_paths = {} # package path of each artifact on each server of the group
+        for server, server_path in zip(servers, server_paths):
+            for deploy_artifact, upload_path in server_path.items():
+                if upload_path != existing_paths.get(deploy_artifact):
+                    logger.info(f'Package {deploy_artifact} on {server}: {upload_path}')
+                group_paths.setdefault(deploy_artifact, {})[server] = upload_path
+        mismatched = {}
+        for deploy_artifact, paths in group_paths.items(): # in place as the deploy map shares the dict
+            if len(set(paths.values())) == 1:
+                deploy_package.path[deploy_artifact] = next(iter(paths.values()))
+            else:
+                mismatched[deploy_artifact] = paths
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+        if mismatched:
+            raise RuntimeError(f'Package paths differ between {group} servers: {mismatched}')
+        logger.info(f'Deployed {group} to {len(servers)} server(s) in {time.monotonic() - start:.1f}s')
+
+
+async def deploy_server(semaphore, failed, server, package_paths, deploy_package: DeploymentPackage, deploy_env, env_details_path, aem_creds, rollback_flow, deployment_data: DeploymentData):
+    """deploy the artifacts of a package to one server, one after the other"""
+    async with semaphore:
         for deploy_artifact in deploy_package.deploy_artifacts or []: # iterate through components (multiple for spa apps)
+            if failed.is_set(): # another server failed - do not start further work
+                return
             logger.info(
                 f'Deploying {deploy_artifact} in {deploy_env} server {server}'
             )
-            deploy_aem_package(deploy_artifact, deploy_package, env_details_path, server, aem_creds, rollback_flow, deployment_data)
+            try:
+                await deploy_aem_package(deploy_artifact, deploy_package, env_details_path, server, aem_creds, rollback_flow, deployment_data, package_paths)
+            except RuntimeError:
+                failed.set()
+                raise
 
 
-def deploy_aem_package(deploy_artifact, deploy_package: DeploymentPackage, env_details_path, server, aem_creds, rollback_flow, deployment_data: DeploymentData):
-    """delete, check version, upload, and install package"""
+async def deploy_aem_package(deploy_artifact, deploy_package: DeploymentPackage, env_details_path, server, aem_creds, rollback_flow, deployment_data: DeploymentData, package_paths: dict):
+    """delete, check version, upload, and install package - package_paths holds the package paths of this server"""
     try:
         current_version = True if rollback_flow else (deploy_package.module_values_rollback or {}).get('artifact_version')
         primary_package = deploy_artifact == deploy_package.primary
@@ -139,14 +189,14 @@ def deploy_aem_package(deploy_artifact, deploy_package: DeploymentPackage, env_d
         uninstall_flow = operation == 'uninstall'
 
         path_to_package = env_details_path.get(deploy_artifact)
-        existing_package_path = deploy_package.path.get(deploy_artifact)
+        existing_package_path = package_paths.get(deploy_artifact)
 
         # check duplicate version
         skip_deploy = False
         if uninstall_flow:
             skip_deploy = True
             if existing_package_path:
-                api_utils.delete_package(existing_package_path, aem_creds, server)
+                await api_utils.delete_package(existing_package_path, aem_creds, server)
             else:
                 logger.info(f'No existing package found on {server}')
         if all([existing_package_path, primary_package, current_version]) and not any([rollback_flow, uninstall_flow]):
@@ -165,16 +215,16 @@ def deploy_aem_package(deploy_artifact, deploy_package: DeploymentPackage, env_d
             deployment_data.deploy_status = 'SKIPPED'
         elif content_package and rollback_flow:
             logger.info(f'Deleting content package on rollback: {deploy_artifact}')
-            api_utils.delete_package(existing_package_path, aem_creds, server)
+            await api_utils.delete_package(existing_package_path, aem_creds, server)
         else:
             # upload package
-            upload_path = api_utils.upload_package(aem_creds, path_to_package, server)
-            deploy_package.path[deploy_artifact] = upload_path
+            upload_path = await api_utils.upload_package(aem_creds, path_to_package, server)
+            package_paths[deploy_artifact] = upload_path
             if all([current_version, existing_package_path, existing_package_path != upload_path]):
                 logger.info(f'Install Flow. Deleting the previous package: {existing_package_path}')
-                api_utils.delete_package(existing_package_path, aem_creds, server)
+                await api_utils.delete_package(existing_package_path, aem_creds, server)
             # install package
-            api_utils.install_package(aem_creds, upload_path, server)
+            await api_utils.install_package(aem_creds, upload_path, server)
     except RuntimeError as e:
         raise RuntimeError(f'Error in deploy package {e}') from None
 
@@ -193,8 +243,8 @@ def post_deploy_aem_packages(deployment_data_map, vault_map, deployment_data: De
         with open(f'{workspace}/package_deploy_map.json', 'w+', encoding='utf-8') as f:
             json.dump(deployment_data_map, f, indent=2)
 
-        os.system(f"echo 'rollback-scenario={deployment_data.rollback}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'deployment-data={json.dumps(deployment_data_map)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('rollback-scenario', deployment_data.rollback)
+        outputs.set_output('deployment-data', json.dumps(deployment_data_map))
     except RuntimeError as e:
         logger.error(f'Error setting deploy rollback and artifact info: {e}')
 
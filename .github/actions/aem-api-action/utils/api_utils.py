@@ -3,22 +3,23 @@ import os
 import re
 import time
 import asyncio
-import subprocess
-import json
 import yaml
+from utils import outputs
+from utils import readiness
+from utils.client import get_client
 from kpghalogger import KpghaLogger
 
 logger = KpghaLogger()
 workspace = os.getenv('GITHUB_WORKSPACE')
+poll_start = float(os.getenv('AEM_POLL_START') or 0.5) # first status poll interval in seconds, doubled up to the former fixed interval
 
 
-def install_package(aem_creds, upload_path, server):
+async def install_package(aem_creds, upload_path, server):
     """api install package"""
     try:
         logger.info(f'Installing package on {server} at path {upload_path}')
         package_path = upload_path.replace(' ','%20')
-        install_cmd = f"""curl -k -X POST -u '{aem_creds}' {server}/crx/packmgr/service/.json{package_path}?cmd=install"""
-        installed_package, err = asyncio.run(curl_with_retry(install_cmd, 7))
+        installed_package, err = await get_client(server, aem_creds).call('POST', f'/crx/packmgr/service/.json{package_path}?cmd=install', 7)
         if installed_package:
             logger.info(f'Package installed successfully: {installed_package}\n')
         else:
@@ -27,12 +28,12 @@ def install_package(aem_creds, upload_path, server):
         raise RuntimeError(e) from None
 
 
-def upload_package(aem_creds, path_to_package, server):
-    """api upload package"""
+async def upload_package(aem_creds, path_to_package, server):
+    """api upload package - the package is streamed from disk"""
     try:
         logger.info(f'Uploading package to {server} directory {path_to_package}')
-        upload_cmd = f"""curl -k -u '{aem_creds}' -F force=true -F package=@'{workspace}/{path_to_package}' {server}/crx/packmgr/service/.json/?cmd=upload"""
-        uploaded_package, err = asyncio.run(curl_with_retry(upload_cmd, 7))
+        upload = ({'force': 'true'}, 'package', f'{workspace}/{path_to_package}')
+        uploaded_package, err = await get_client(server, aem_creds).call('POST', '/crx/packmgr/service/.json/?cmd=upload', 7, upload=upload)
         if uploaded_package:
             upload_path = uploaded_package.get('path')
             logger.info(f'Package uploaded successfully: {uploaded_package}\n')
@@ -43,13 +44,12 @@ def upload_package(aem_creds, path_to_package, server):
         raise RuntimeError(e) from None
 
 
-def delete_package(package, aem_creds, server):
+async def delete_package(package, aem_creds, server):
     """api delete package"""
     try:
         logger.info(f'Deleting existing package at {package} on {server}')
         package_path = package.replace(' ','%20')
-        delete_cmd = f"""curl -k -X POST -u '{aem_creds}' {server}/crx/packmgr/service/.json{package_path}?cmd=delete"""
-        deleted_package, err = asyncio.run(curl_with_retry(delete_cmd, 7))
+        deleted_package, err = await get_client(server, aem_creds).call('POST', f'/crx/packmgr/service/.json{package_path}?cmd=delete', 7)
         if deleted_package:
             logger.info(f'Package deleted successfully: {deleted_package}\n')
         else:
@@ -58,12 +58,12 @@ def delete_package(package, aem_creds, server):
         raise RuntimeError(e) from None 
 
 
-def confirm_package(aem_creds, server):
+async def confirm_package(aem_creds, server):
     """api confirm package"""
     try:
         logger.info(f'Confirming installation for package on {server}.')
-        install_cmd = f"""curl -k -H 'X-Requested-With: XMLHttpRequest' -u '{aem_creds}' {server}/system/console/bundles.json"""
-        installed_package, err = asyncio.run(curl_with_retry(install_cmd, 3, True))
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        installed_package, err = await get_client(server, aem_creds).call('GET', '/system/console/bundles.json', 3, True, headers=headers)
         if installed_package:
             return installed_package
         else:
@@ -72,89 +72,94 @@ def confirm_package(aem_creds, server):
         raise RuntimeError(e) from None
 
 
-def confirm_status(aem_creds, server, product_core_name):
-    """check package state"""
-    fail_on_status = True
-    product_in_manifest = False
+async def get_bundle(aem_creds, server, bundle_id):
+    """state of a single bundle from its own felix console endpoint"""
+    headers = {'X-Requested-With': 'XMLHttpRequest'}
+    bundle, _ = await get_client(server, aem_creds).call('GET', f'/system/console/bundles/{bundle_id}.json', 1, True, headers=headers)
+    data = (bundle or {}).get('data') or []
+    return data[0] if data else None
+
+
+async def get_bundle_index(aem_creds, server):
+    """bundles of a server by lowercased name - None when the list could not be fetched"""
+    server_bundles = await confirm_package(aem_creds, server)
+    if server_bundles is None:
+        return None
+    return {str(x.get('name')).casefold(): x for x in server_bundles.get('data') or []}
+
+
+async def confirm_status(aem_creds, server, product_core_name):
+    """check package state - polls with exponential backoff, returns True if the bundle is not active by the deadline"""
     interval = 60 if str(product_core_name).startswith('RX Order Management') else 15
-    i = 0
-    while i < 10 and fail_on_status:
-        server_bundles = confirm_package(aem_creds, server)
-        for x in server_bundles.get('data'):
-            if x.get('name').casefold() == product_core_name.casefold():
-                product_in_manifest = True
-                install_state = x.get('state')
-                logger.info(
-                    f'Found package {product_core_name}'
-                    f' on server {server}: {install_state}'
-                )
-                if install_state == 'Active':
-                    return False
-                i += 1
-                logger.info(f'Waiting {interval} seconds to check status of {product_core_name}...')
-                time.sleep(interval)
-        if not product_in_manifest:
-            return False
-    return fail_on_status
-
-
-async def curl_with_retry(cmd, iterations, skip_check=False):
-    """redundant calls to api"""
-    interval = 5 # seconds between attempts
-    i = 0
-    err = None
-    while i < iterations:
-        try:
-            check_status = subprocess.run(cmd, shell=True, capture_output=True, check=True, timeout=360)
-            if check_status.stdout:
-                status_map = json.loads(check_status.stdout.decode())
-                status_true = isinstance(status_map, dict) and status_map.get('success') is True
-                if status_true or skip_check:
-                    return [status_map, None]
-                else:
-                    err = check_status.stdout.decode()
-            else:
-                err = check_status.stderr.decode()
-            i += 1
-        except (json.JSONDecodeError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-            if isinstance(e, subprocess.TimeoutExpired):
-                err = 'Timed out waiting for server.'
-            else:
-                err = 'Command return non-zero exit code.'
-            await asyncio.sleep(interval)
-            i += 1
-            logger.error(f'Attempt {i}: {err}')
-    return [None, err]
+    deadline = time.monotonic() + interval * 10 # longest wait of the former fixed-interval polling
+    delay = poll_start
+    bundle_id = None
+    while True:
+        if bundle_id is None: # locate the bundle in the full list once, then poll only its own endpoint
+            index = await get_bundle_index(aem_creds, server)
+            bundle = index.get(product_core_name.casefold()) if index is not None else None
+            if index is not None and bundle is None:
+                return False # not in manifest
+        else:
+            bundle = await get_bundle(aem_creds, server, bundle_id)
+        if bundle:
+            bundle_id = bundle.get('id')
+            install_state = bundle.get('state')
+            logger.info(
+                f'Found package {product_core_name}'
+                f' on server {server}: {install_state}'
+            )
+            if install_state == 'Active':
+                return False
+        else:
+            bundle_id = None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        logger.info(f'Waiting {min(delay, remaining):.1f} seconds to check status of {product_core_name}...')
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, interval)
+
+
+async def confirm_servers(vault_map, bundle_names):
+    """watch every bundle on every server concurrently - returns the (server, bundle) pairs not active"""
+    targets = [
+        (value.get('aem_creds'), server, name)
+        for value in vault_map.values() for server in value.get('server') or [] for name in bundle_names
+    ]
+    results = await asyncio.gather(*[confirm_status(aem_creds, server, name) for aem_creds, server, name in targets])
+    return [(server, name) for (_, server, name), failed in zip(targets, results) if failed]
 
 
 def check_wait_time(deployment_data_map, vault_map, deployment_data, rollback_available):
     """check install status on target server - if status is not 'active' with threshold, fail deployment"""
-    fail_on_status = False
+    fail_on_status = []
     product_name = deployment_data_map['name']
     product_core_name = deployment_data_map['quality'].get('core_name')
+    max_wait = 0
     if need_sleep_before_cache_flush(product_name):
-        logger.info('Sleeping for 5 minutes...')
-        time.sleep(300) # wait 5 minutes
+        max_wait = 300 # up to 5 minutes
     elif re.search('-config$|-configs$', product_name):
-        logger.info(f'Waiting 3 minutes after deploying {product_name}...')
-        time.sleep(180)
-    for value in vault_map.values():
-        aem_creds = value.get('aem_creds')
-        if product_core_name:
-            for server in value.get('server'):
-                fail_on_status = confirm_status(aem_creds, server, product_core_name)
-        if fail_on_status:
-            logger.error(f'Install failed - artifact not in active status.')
-            deployment_data['deploy_status'] = 'FAILED'
-            deployment_data['rollback'] = rollback_available
-            break
+        max_wait = 180
+    if max_wait:
+        logger.info(f'Waiting up to {max_wait} seconds for servers to be ready after deploying {product_name}...')
+        waited = asyncio.run(readiness.wait_until_ready(vault_map, max_wait))
+        deployment_data['readiness_wait'] = round(waited, 1)
+        outputs.add_summary(f'AEM readiness wait for {product_name}: {waited:.1f}s of at most {max_wait}s')
+    if product_core_name:
+        fail_on_status = asyncio.run(confirm_servers(vault_map, [product_core_name]))
+    if fail_on_status:
+        servers = ', '.join(server for server, _ in fail_on_status)
+        logger.error(f'Install failed - artifact not in active status on {servers}.')
+        deployment_data['deploy_status'] = 'FAILED'
+        deployment_data['rollback'] = rollback_available
     return deployment_data
 
 
 def need_sleep_before_cache_flush(product_name):
     """sleep before cache flush"""
     repo_matched = False
-    repos_needing_sleep = yaml.safe_load(os.getenv('REPOS_NEEDING_SLEEP_BEFORE_CACHE_FLUSH'))
+    repos_needing_sleep = yaml.safe_load(os.getenv('REPOS_NEEDING_SLEEP_BEFORE_CACHE_FLUSH') or '[]') or []
     for each_repo in repos_needing_sleep:
         if each_repo == product_name:
             repo_matched = True
@@ -175,13 +180,12 @@ def run_confirm_status(deploy_package):
         logger.warning("PROJECT_CORE_NAME could not be determined; skipping confirm-status checks.")
         exit(0)
     
-    failed = False
+    failed_servers = {server for server, _ in asyncio.run(confirm_servers(vault_map, [product_core_name]))}
+    failed = bool(failed_servers)
     for entry in vault_map.values():
-        aem_creds = entry.get('aem_creds')
         for server in entry.get('server', []):
-            if confirm_status(aem_creds, server, product_core_name):
+            if server in failed_servers:
                 logger.error(f"Package {product_core_name} is not active on server {server}.")
-                failed = True
             else:
                 logger.info(f"Package {product_core_name} is active on server {server}.")
     
@@ -0,0 +1,146 @@
+"""pooled http client for the aem package manager and felix console"""
+import os
+import mmap
+import uuid
+import asyncio
+import threading
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from kpghalogger import KpghaLogger
+
+logger = KpghaLogger()
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning) # servers use self-signed certificates, as with curl -k
+
+pool_size = int(os.getenv('AEM_POOL_SIZE') or 8)
+request_timeout = int(os.getenv('AEM_REQUEST_TIMEOUT') or 360)
+retry_interval = 5 # seconds between attempts
+shared_upload = (os.getenv('AEM_SHARED_UPLOAD') or 'true').lower() == 'true'
+CHUNK_SIZE = 1024 * 1024
+_clients = {}
+_clients_lock = threading.Lock()
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+class PackageBuffer:
+    """package file mapped into memory once and shared by the uploads to every server"""
+
+    def __init__(self, file_path):
+        with open(file_path, 'rb') as f:
+            self.size = os.fstat(f.fileno()).st_size
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        if self.size and hasattr(self.data, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            self.data.madvise(mmap.MADV_WILLNEED) # read ahead while the first upload starts
+
+    def __iter__(self):
+        view = memoryview(self.data)
+        for offset in range(0, self.size, CHUNK_SIZE):
+            yield view[offset:offset + CHUNK_SIZE]
+
+
+def get_package_buffer(file_path) -> PackageBuffer:
+    """shared buffer per package file"""
+    key = os.path.realpath(file_path)
+    with _buffers_lock:
+        if key not in _buffers:
+            _buffers[key] = PackageBuffer(file_path)
+        return _buffers[key]
+
+
+class MultipartStream:
+    """multipart/form-data body sent in chunks - from the shared package buffer, or read from disk when shared uploads are off"""
+
+    def __init__(self, fields: dict, name, file_path):
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        head = ''.join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n' for k, v in fields.items()
+        )
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{os.path.basename(file_path)}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'
+        )
+        self.head = head.encode()
+        self.tail = f'\r\n--{boundary}--\r\n'.encode()
+        self.file_path = file_path
+        self.buffer = get_package_buffer(file_path) if shared_upload else None
+        size = self.buffer.size if self.buffer else os.path.getsize(file_path)
+        self.length = len(self.head) + size + len(self.tail)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        yield self.head
+        if self.buffer:
+            yield from self.buffer
+        else:
+            with open(self.file_path, 'rb') as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
+        yield self.tail
+
+
+class AemClient:
+    """keep-alive session for one server - blocking calls run in worker threads so requests to several servers overlap"""
+
+    def __init__(self, server, aem_creds):
+        self.server = server.rstrip('/')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.verify = False
+        if aem_creds:
+            self.session.auth = tuple(str(aem_creds).split(':', 1))
+
+    async def call(self, method, path, iterations, skip_check=False, **kwargs):
+        """redundant calls to api - returns [response map, None] or [None, error]"""
+        err = None
+        for i in range(1, iterations + 1):
+            try:
+                response = await asyncio.to_thread(self.send, method, path, **kwargs)
+                status_map = response.json() if response.content else None
+                status_true = isinstance(status_map, dict) and status_map.get('success') is True
+                if status_map is not None and (status_true or skip_check):
+                    return [status_map, None]
+                err = response.text or f'HTTP {response.status_code}'
+            except (ValueError, OSError) as e: # requests exceptions are OSErrors, as is a missing package file
+                if isinstance(e, requests.exceptions.Timeout):
+                    err = 'Timed out waiting for server.'
+                elif isinstance(e, ValueError):
+                    err = 'Response is not valid JSON.'
+                else:
+                    err = f'Request failed: {e}'
+                logger.error(f'Attempt {i}: {err}')
+                if i < iterations:
+                    await asyncio.sleep(retry_interval)
+        return [None, err]
+
+    async def get_status(self, path, **kwargs):
+        """status code of a single GET - None when the server could not be reached"""
+        try:
+            response = await asyncio.to_thread(self.send, 'GET', path, **kwargs)
+            return response.status_code
+        except OSError as e:
+            logger.info(f'GET {self.server}{path} failed: {e}')
+            return None
+
+    def send(self, method, path, upload=None, **kwargs):
+        """send one request - upload is a (fields, name, file path) multipart body built fresh for every attempt"""
+        if upload:
+            body = MultipartStream(*upload)
+            kwargs['data'] = body
+            kwargs['headers'] = {**kwargs.get('headers', {}), 'Content-Type': body.content_type}
+        kwargs.setdefault('timeout', request_timeout)
+        return self.session.request(method, f'{self.server}{path}', **kwargs)
+
+
+def get_client(server, aem_creds) -> AemClient:
+    """shared client per server and credentials"""
+    key = (server, aem_creds)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = AemClient(server, aem_creds)
+        return _clients[key]
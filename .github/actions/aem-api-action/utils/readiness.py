@@ -0,0 +1,94 @@
+"""wait for aem servers to settle after an install by probing readiness signals"""
+import os
+import time
+import asyncio
+from utils.client import get_client
+from kpghalogger import KpghaLogger
+
+logger = KpghaLogger()
+
+poll_interval = float(os.getenv('AEM_READINESS_INTERVAL') or 5) # seconds between probes
+dispatcher_health_urls = [url.strip() for url in (os.getenv('AEM_DISPATCHER_HEALTH_URL') or '').split(',') if url.strip()]
+READY_CONFIRMATIONS = 2 # consecutive green probes before a signal counts as ready
+SETTLING_STATES = {'Installed', 'Starting', 'Stopping'}
+_baselines = {} # server -> bundles not active before the install
+
+
+async def get_bundles(aem_creds, server):
+    """bundles of the felix console - None when the server could not be read"""
+    headers = {'X-Requested-With': 'XMLHttpRequest'}
+    bundles, _ = await get_client(server, aem_creds).call('GET', '/system/console/bundles.json', 1, True, headers=headers)
+    return bundles.get('data') or [] if bundles else None
+
+
+def get_bundle_key(bundle):
+    """bundle identity that survives a reinstall"""
+    return bundle.get('symbolicName') or bundle.get('id')
+
+
+async def capture_baseline(vault_map):
+    """remember which bundles were not active before the install - unresolved or lazily started bundles do not hold up readiness"""
+    targets = [(value.get('aem_creds'), server) for value in vault_map.values() for server in value.get('server') or []]
+    results = await asyncio.gather(*[get_bundles(aem_creds, server) for aem_creds, server in targets])
+    for (_, server), bundles in zip(targets, results):
+        if bundles is not None:
+            _baselines[server] = {get_bundle_key(x) for x in bundles if x.get('state') != 'Active'}
+
+
+async def bundles_ready(aem_creds, server):
+    """no bundle that was active before the install, or is new, is still being resolved, started or stopped"""
+    bundles = await get_bundles(aem_creds, server)
+    if bundles is None:
+        return False
+    baseline = _baselines.get(server, set())
+    return not any(x.get('state') in SETTLING_STATES and get_bundle_key(x) not in baseline for x in bundles)
+
+
+async def install_finished(aem_creds, server):
+    """the package manager has no install job running"""
+    status, _ = await get_client(server, aem_creds).call('GET', '/crx/packmgr/installstatus.jsp', 1, True)
+    return bool(status) and (status.get('status') or {}).get('finished') is True
+
+
+async def dispatcher_healthy(url):
+    """the dispatcher health check answers with a success status"""
+    status_code = await get_client(url, None).get_status('')
+    return status_code is not None and 200 <= status_code < 300
+
+
+def get_signals(vault_map):
+    """readiness probes by signal name"""
+    signals = {}
+    for value in vault_map.values():
+        aem_creds = value.get('aem_creds')
+        for server in value.get('server') or []:
+            signals[f'bundles {server}'] = lambda c=aem_creds, s=server: bundles_ready(c, s)
+            signals[f'install {server}'] = lambda c=aem_creds, s=server: install_finished(c, s)
+    for url in dispatcher_health_urls:
+        signals[f'dispatcher {url}'] = lambda u=url: dispatcher_healthy(u)
+    return signals
+
+
+async def wait_until_ready(vault_map, max_wait) -> float:
+    """probe all signals concurrently until each was green on consecutive probes or max_wait passed - returns seconds waited"""
+    start = time.monotonic()
+    deadline = start + max_wait
+    signals = get_signals(vault_map)
+    streaks = dict.fromkeys(signals, 0)
+    while True:
+        pending = [name for name, streak in streaks.items() if streak < READY_CONFIRMATIONS]
+        results = await asyncio.gather(*[signals[name]() for name in pending], return_exceptions=True)
+        for name, ready in zip(pending, results):
+            streaks[name] = streaks[name] + 1 if ready is True else 0
+            if streaks[name] == READY_CONFIRMATIONS:
+                logger.info(f'Ready after {time.monotonic() - start:.1f}s: {name}')
+        waited = time.monotonic() - start
+        if all(streak >= READY_CONFIRMATIONS for streak in streaks.values()):
+            logger.info(f'All readiness signals green after {waited:.1f}s (upper bound {max_wait}s)')
+            return waited
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            not_ready = ', '.join(name for name, streak in streaks.items() if streak < READY_CONFIRMATIONS)
+            logger.warning(f'Readiness wait reached its upper bound of {max_wait}s - not ready: {not_ready}')
+            return waited
+        await asyncio.sleep(min(poll_interval, remaining))
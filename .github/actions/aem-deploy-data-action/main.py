@@ -8,9 +8,9 @@ import os
 import json
 import yaml
 import re
-import subprocess
 import utils.utils as utils
 from utils.data import DeploymentData
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -127,11 +127,11 @@ def set_notifications_standard(deployment_data, deploy_map, deploy_env, manifest
     if test_url:
         test_urls += f'[Smoke result]({test_url})'
     if re.match('Deployment successful|SUCCESS', msg):
-        subprocess.run([f"""echo "#### :rocket: {msg} {test_urls}" >> $GITHUB_STEP_SUMMARY"""], shell=True)
+        outputs.add_summary(f"#### :rocket: {msg} {test_urls}")
     elif len(re.findall('Rolled back|CRITICAL TEST FAILURE', msg)) > 0:
-        subprocess.run([f"""echo "#### :parachute: {msg} {test_urls}" >> $GITHUB_STEP_SUMMARY"""], shell=True)
+        outputs.add_summary(f"#### :parachute: {msg} {test_urls}")
     else:
-        subprocess.run([f"""echo "#### :information_source: {msg} {test_urls}" >> $GITHUB_STEP_SUMMARY"""], shell=True)        
+        outputs.add_summary(f"#### :information_source: {msg} {test_urls}")        
     set_notify_map(deployment_data, deploy_map, deploy_env, msg, manifest_deploy)
 
 
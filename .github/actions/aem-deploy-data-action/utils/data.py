@@ -8,11 +8,13 @@ import hashlib
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
 from datetime import datetime
+from utils.history import EnvHistory
+import utils.config as config
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
 workspace = os.getenv('GITHUB_WORKSPACE')
-artifact_props = yaml.safe_load(os.getenv('ARTIFACTORY_PROP') or '{}')
 
 @dataclass
 class DeployContext:
@@ -51,6 +53,7 @@ class QualityProperties:
 
     def __post_init__(self):
         """Initialize quality properties from environment variables and artifact properties."""
+        artifact_props = config.get_yaml('ARTIFACTORY_PROP', {})
         if self.context.dispatcher_deploy:
             self.sonar = 'EXEMPT'
             self.sonar_date = 'N/A'
@@ -75,7 +78,7 @@ class QualityProperties:
         logger.info(f'Exception status: {exception_status}')
         rollback_enabled = False if any([
             autorollback_result == 'EXEMPT',
-            os.getenv('AUTO_DISABLE') == 'true',
+            config.get_bool('AUTO_DISABLE'),
             self.context.deploy_package.get('name').endswith('-config')
         ]) else True
         regression_date = expiration_status.get('regression_quality_gate', 'N/A').split(' ')[0]
@@ -109,24 +112,18 @@ class QualityProperties:
 
     def _set_smoke_pass(self, artifact_props, deploy_env, deploy_operation):
         """set smoke props for environment manifest flow - if smoke has already passed it will be skipped on subsequent runs"""
-        critical_prop = artifact_props.get('CRITICAL_TEST') if artifact_props.get('CRITICAL_TEST') else []
-        smoke_prop = artifact_props.get('SMOKE') if artifact_props.get('SMOKE') else []
+        critical_test = EnvHistory(artifact_props.get('CRITICAL_TEST')).get(deploy_env)
+        smoke = EnvHistory(artifact_props.get('SMOKE')).get(deploy_env)
         critical_pass = False
         smoke_pass = False
-        for critical_env in critical_prop:
-            critical_env_prop = critical_env.split('~')
-            if critical_env_prop[0] == deploy_env and critical_env_prop[1] == 'pass':
-                logger.info(f'Artifact already passed critical tests in {deploy_env}')
-                critical_pass = True
-                break
+        if critical_test and critical_test.result == 'pass':
+            logger.info(f'Artifact already passed critical tests in {deploy_env}')
+            critical_pass = True
         if re.match(r'(promote-to-){1}(stage|preprod){1}', str(deploy_operation)): # skip post-deploy critical tests for higher environments
             critical_pass = True
-        for smoke_env in smoke_prop:
-            smoke_env_prop = smoke_env.split('~')
-            if smoke_env_prop[0] == deploy_env and re.match('success|pass', smoke_env_prop[1].lower()):
-                logger.info(f'Artifact already passed smoke tests in {deploy_env}')
-                smoke_pass = True
-                break
+        if smoke and re.match('success|pass', (smoke.result or '').lower()):
+            logger.info(f'Artifact already passed smoke tests in {deploy_env}')
+            smoke_pass = True
         return critical_pass, smoke_pass
     
     def _check_quality(self):
@@ -186,13 +183,14 @@ class AutoDeploy:
         auto-deploy configuration.
         """
         try:
+            artifact_props = config.get_yaml('ARTIFACTORY_PROP', {})
             deploy_env = self.context.env
             manifest_deploy = self.context.manifest_deploy
             env_name_list = ['HINT', 'REGIONAL', 'LOAD', 'PREPROD', 'STAGE', 'PROD'] if manifest_deploy else ['DEV', 'QA']
             env_list_mapping = yaml.safe_load(os.getenv('AEM_CD_ENVIRONMENT_MAPPING', '{}'))
             teams_channel = artifact_props.get('TEAMS_CHANNEL', [''])[0]
             cd_deployed = artifact_props.get('CONTINUOUS_DEPLOY', [])
-            check_mappings = lambda map_env: yaml.safe_load(os.getenv('AEM_CHECK_ENV_MAP', '{}')).get(map_env, map_env)
+            check_mappings = lambda map_env: config.map_value('AEM_CHECK_ENV_MAP', map_env)
             last_lower_env = False
 
             with open(f'{workspace}/ReleaseReadinessConfig.yaml', 'r+') as f:
@@ -297,12 +295,13 @@ class AutoDeploy:
             self.qtest_folder = rrc_config.get('qTestFolder') or ''
             self.arb_risk = rrc_config.get('arbRisk', False)
             self.arb_risk_comment = rrc_config.get('arbRiskComment', '')
-            check_mappings = lambda map_env: yaml.safe_load(os.getenv('AEM_CHECK_ENV_MAP', '{}')).get(map_env, map_env)
+            check_mappings = lambda map_env: config.map_value('AEM_CHECK_ENV_MAP', map_env)
             if regression_envs:
-                dod_envs = set([x.lower() for x in jira_details.get('dod',[])]).intersection([x.lower() for x in regression_envs])
-                self.regression = [check_mappings(auto_deploy_envs[k]).lower() for k in auto_deploy_envs.keys() if k.lower() in [x.lower() for x in regression_envs]]
+                regression_envs = {x.lower() for x in regression_envs}
+                dod_envs = {x.lower() for x in jira_details.get('dod',[])}.intersection(regression_envs)
+                self.regression = [check_mappings(auto_deploy_envs[k]).lower() for k in auto_deploy_envs.keys() if k.lower() in regression_envs]
                 if dod_envs:
-                    self.dod_envs = [check_mappings(auto_deploy_envs[k]).lower() for k in auto_deploy_envs.keys() if k.lower() in [x.lower() for x in dod_envs]]
+                    self.dod_envs = [check_mappings(auto_deploy_envs[k]).lower() for k in auto_deploy_envs.keys() if k.lower() in dod_envs]
             rrc_snow_details = rrc_config.get('snowDetails', {})
             # Add openEnrollmentRiskAnalysis section as a key if present
             if rrc_config.get('openEnrollmentRiskAnalysis', {}):
@@ -372,6 +371,7 @@ class DeploymentData:
     def create_map(self):
         """Create the deployment data map with quality and auto_deploy properties."""
         try:
+            artifact_props = config.get_yaml('ARTIFACTORY_PROP', {})
             context = DeployContext(
                 env=self.env,
                 operation=self.operation,
@@ -398,6 +398,7 @@ class DeploymentData:
 
     def add_rollback(self):
         try:
+            artifact_props = config.get_yaml('ARTIFACTORY_PROP', {})
             last_deployed = yaml.safe_load(os.getenv('LAST_DEPLOYED') or '{}')
             rollback_result = bool(last_deployed)
             self.deploy_package['module_values_rollback'] = dict(
@@ -434,7 +435,7 @@ class DeploymentData:
             auto_deploy.load_id = release_record.get('load_id', '') if release_record else ''
             auto_deploy.ada_id = release_record.get('ada_id', '') if release_record else ''
             if jira_id:
-                os.system(f'echo "jira-id={jira_id}" >> $GITHUB_OUTPUT')
+                outputs.set_output('jira-id', jira_id)
 
             # Compare JIRA release date with ServiceNow release date to update KP.ORG release if needed
             update_release = False
@@ -0,0 +1,57 @@
+"""parsed env~result history properties such as SMOKE, CRITICAL_TEST, P1 and TARGET"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class EnvRecord:
+    """One env~result[~details] entry of a history property."""
+    env: str
+    result: Optional[str] = None
+    details: List[str] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, value: str) -> 'EnvRecord':
+        """Create record from an env~result[~details] string."""
+        env, *values = str(value).split('~')
+        return cls(env=env, result=values[0] if values else None, details=values[1:])
+
+    def to_wire(self) -> str:
+        """Serialize back to the env~result[~details] string."""
+        return '~'.join([self.env] + ([self.result] if self.result is not None else []) + self.details)
+
+
+class EnvHistory:
+    """History property in its original order, with an index of the first entry of each environment as lookups always matched it."""
+
+    def __init__(self, values=None):
+        if isinstance(values, str):
+            values = [values]
+        self.records = [EnvRecord.parse(value) for value in values or []]
+        self.index = {}
+        self.reindex()
+
+    def reindex(self):
+        """Index the first entry of each environment."""
+        self.index = {}
+        for record in self.records:
+            self.index.setdefault(record.env, record)
+
+    def get(self, env) -> Optional[EnvRecord]:
+        """Get the first entry of an environment."""
+        return self.index.get(env)
+
+    def update(self, value, first=False) -> EnvRecord:
+        """Replace the results of an environment with a new entry at the end or optionally at the front - other entries are kept as they are."""
+        record = EnvRecord.parse(value)
+        self.records = [x for x in self.records if x.env != record.env or x.result is None]
+        self.records.insert(0 if first else len(self.records), record)
+        self.reindex()
+        return record
+
+    def to_wire(self) -> list:
+        """Serialize to the list of env~result strings stored in Artifactory."""
+        return [record.to_wire() for record in self.records]
+
+    def __len__(self):
+        return len(self.records)
@@ -4,6 +4,9 @@ import re
 import json
 import yaml
 import traceback
+from utils.history import EnvHistory
+import utils.config as config
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -60,10 +63,10 @@ def post_deploy(deployment_data):
 def check_deploy_map(deployment_data):
     """determine post-deploy testing scenarios by checking deployment data map"""
     try:
-        aem_deploy_env = os.getenv('AEM_ENV_MAP')
-        env_sync_job = os.getenv('GITHUB_REPOSITORY') == 'CDO-KP-ORG/ams-manifest-sync'
+        aem_deploy_env = config.get_str('AEM_ENV_MAP')
+        env_sync_job = config.get_str('GITHUB_REPOSITORY') == 'CDO-KP-ORG/ams-manifest-sync'
         test_package_list = yaml.safe_load(os.getenv('TEST_PACKAGES', '[]'))
-        smoke_tests = os.getenv('SMOKE_TEST') == 'true'
+        smoke_tests = config.get_bool('SMOKE_TEST')
 
         run_tests = {}
         rollback_enabled = deployment_data.quality.get('autorollback_enabled')
@@ -118,10 +121,10 @@ def post_deploy_test(deployment_data):
     This will set the 'post_deploy' block of the deployment data map.
     """
     try:
-        test_result = os.getenv('TEST_RESULT') or 'SKIPPED'
-        regression_result = os.getenv('REGRESSION_RESULT') or 'SKIPPED'
-        p1_tag_result = os.getenv('P1_RESULT') or 'SKIPPED'
-        target_tag_result = os.getenv('TARGET_RESULT') or 'SKIPPED'
+        test_result = config.get_str('TEST_RESULT', 'SKIPPED')
+        regression_result = config.get_str('REGRESSION_RESULT', 'SKIPPED')
+        p1_tag_result = config.get_str('P1_RESULT', 'SKIPPED')
+        target_tag_result = config.get_str('TARGET_RESULT', 'SKIPPED')
 
         p1_result,  p1_total_tests = '', 0
         target_result, target_total_tests = '', 0
@@ -179,20 +182,16 @@ def post_deploy_test(deployment_data):
 
 
 def get_property(env_property, deploy_env):
-    if isinstance(env_property, str):
-        env_property = [env_property]  
-    for env in env_property:
-        env_key, *values = env.split('~')
-        if env_key == deploy_env:
-            result = values[0] if len(values) > 0 else None
-            total_tests = values[1] if len(values) > 1 else None
-            return result, total_tests
-    return None, None
+    """get result and total tests of an environment from an env~result~total property"""
+    record = EnvHistory(env_property).get(deploy_env)
+    if not record:
+        return None, None
+    return record.result, record.details[0] if record.details else None
 
 
 def get_status_and_message(deployment_data, rollback_scenario):
     try:
-        test_url = os.getenv('TEST_URL','N/A')
+        test_url = config.get_str('TEST_URL', 'N/A')
         rollback_map = deployment_data.deploy_package.get('module_values_rollback', {})
         deploy_map = deployment_data.deploy
         rollback_enabled = deployment_data.quality.get('autorollback_enabled')
@@ -238,7 +237,7 @@ def set_deploy_data(deployment_data):
     deploy_package = deployment_data.deploy_package
     deploy_env = deployment_data.env
     auto_deploy = deploy_package.get('cd_deploy')
-    deploy_env = yaml.safe_load(os.getenv('AEM_CHECK_ENV_MAP', '{}')).get(deploy_env, deploy_env).lower()
+    deploy_env = config.map_value('AEM_CHECK_ENV_MAP', deploy_env).lower()
     deploy_props = {'DEPLOY':deploy_env, 'LAST_DEPLOYED_ENV':deploy_env}
     if auto_deploy:
         if deployment_data.auto_deploy.get('env_name') == 'PREPROD':
@@ -253,7 +252,7 @@ def set_deploy_data(deployment_data):
 def set_output(key, value):
     """set output for GitHub Actions"""
     if value is not None:
-        os.system(f"echo '{key}={value}' >> $GITHUB_OUTPUT")
+        outputs.set_output(key, value)
     else:
         logger.warning(f"Output {key} is None, skipping.")
 
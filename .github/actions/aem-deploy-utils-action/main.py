@@ -8,6 +8,7 @@ from datetime import datetime, timezone
 import pytz
 import utils.cache as cache
 from utils import vault
+import utils.outputs as outputs
 
 deploy_env = os.getenv('DEPLOY_ENV')
 log_level = os.getenv('LOG_LEVEL') if os.getenv('LOG_LEVEL') else '20'
@@ -27,6 +28,8 @@ def main():
     manifest_deploy = True if aem_manifest else False
     if re.match('vault-details|generate-csv', str(operation)):
         vault.get_vault_details(deploy_env)
+    elif operation == 'drift-report':
+        vault.drift_report([x.strip() for x in str(deploy_env).split(',') if x.strip()])
     elif operation == 'aem-cache-flush':
         cache.cache_flush(deploy_env)
     elif operation == 'jira-data':
@@ -85,7 +88,7 @@ def set_jira_ticket_details(deployment_data, deploy_map, manifest_deploy, contex
         logging.info(f'Not autodeploy or quality checks failed. Not preceeding to further environments.')
     if jira_ticket_details:
         logging.info('%sJira ticket data:\n%s', COLOR_GREEN, json.dumps(jira_ticket_details, indent=2))
-        os.system(f"echo 'jira-ticket-details={json.dumps(jira_ticket_details)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('jira-ticket-details', json.dumps(jira_ticket_details))
     if manifest_deploy:
         set_test_output(deploy_map, test_result, regression_result, manifest_deploy, sre_id, operation, auto_deploy)     
     else:
@@ -163,7 +166,7 @@ def repo_auto_ticket_details(jira_ticket_details, auto_deploy, overall_success,
         jira_key = auto_deploy.get('jira_id')
         if jira_key:
             jira_ticket_url = f"{os.getenv('JIRA_URL')}/browse/{jira_key}"
-            os.system(f'echo "#### :clipboard: [Jira deploy ticket]({jira_ticket_url})" >> $GITHUB_STEP_SUMMARY')
+            outputs.add_summary(f"#### :clipboard: [Jira deploy ticket]({jira_ticket_url})")
             if auto_deploy.get('update_release'):
                 message += f'(i) Release date or version has been modified. Updating ticket with new fields. '
             message += f'(i) Updating ticket for next deployment to *{next_env.upper()}*. '
@@ -225,7 +228,7 @@ def set_test_output(deploy_map, test_result, regression_result, manifest_deploy,
         deploy_map['regression'] = regression_result
         deploy_map['env'] = deploy_env
         deploy_map['sre_id'] = sre_id
-        os.system(f"echo 'jira-failure-details={json.dumps(deploy_map)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('jira-failure-details', json.dumps(deploy_map))
 
 
 def cd_manifest_deploy(aem_manifest):
@@ -278,7 +281,7 @@ def update_automation_constants():
             else:
                 constant = value
             constant_update[f'AEM_CD_{key.upper()}'] = json.dumps(constant)
-        os.system(f'echo "cd-schedule={json.dumps(constant_update)}" >> $GITHUB_OUTPUT')
+        outputs.set_output('cd-schedule', json.dumps(constant_update))
     except (KeyError, FileNotFoundError, Exception) as e:
         logging.error(f"Failed to update automation constants: {e}")
 
@@ -0,0 +1,77 @@
+"""unit tests of the native ansible vault reader against fixtures encrypted with ansible-vault"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import importlib.util
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import ansible_vault
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PASSWORD = b'fixture-password'
+HAS_CRYPTOGRAPHY = importlib.util.find_spec('cryptography') is not None
+
+
+@unittest.skipUnless(HAS_CRYPTOGRAPHY, 'cryptography is not installed')
+class DecryptTest(unittest.TestCase):
+    """decrypt payloads written by ansible-vault 1.1 AES256"""
+
+    def test_decrypt_file(self):
+        with open(os.path.join(FIXTURES, 'vault.yml'), 'r', encoding='utf-8') as f:
+            plaintext = ansible_vault.decrypt(f.read(), PASSWORD)
+        self.assertEqual(yaml.safe_load(plaintext), {
+            'aem_author': {'server_ip': ['10.0.0.1']},
+            'aem_author_username': 'admin',
+            'aem_author_password': 's3cret',
+        })
+
+    def test_decrypt_inline(self):
+        hostvars = ansible_vault.load_var_file(os.path.join(FIXTURES, 'inline_vault.yml'), PASSWORD)
+        self.assertEqual(hostvars, {'aem_publisher_password': 'inline-s3cret'})
+
+    def test_wrong_password(self):
+        with open(os.path.join(FIXTURES, 'vault.yml'), 'r', encoding='utf-8') as f:
+            with self.assertRaises(ansible_vault.VaultReaderError):
+                ansible_vault.decrypt(f.read(), b'wrong-password')
+
+
+@unittest.skipUnless(HAS_CRYPTOGRAPHY, 'cryptography is not installed')
+class ReadHostvarsTest(unittest.TestCase):
+    """resolve host variables from an inventory set in ansible.cfg"""
+
+    def setUp(self):
+        self.ansible_dir = tempfile.mkdtemp()
+        self.inventory_path = os.path.join(self.ansible_dir, 'hosts')
+        os.makedirs(os.path.join(self.inventory_path, 'host_vars'))
+        os.makedirs(os.path.join(self.inventory_path, 'group_vars'))
+        shutil.copy(os.path.join(FIXTURES, 'vault.yml'), os.path.join(self.inventory_path, 'host_vars', 'dev.yml'))
+        with open(os.path.join(self.ansible_dir, 'ansible.cfg'), 'w', encoding='utf-8') as f:
+            f.write('[defaults]\ninventory = hosts ; relative to ansible.cfg\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.ansible_dir)
+
+    def test_read_hostvars(self):
+        inventory_path = ansible_vault.get_inventory_path(self.ansible_dir)
+        self.assertEqual(inventory_path, self.inventory_path)
+        hostvars = ansible_vault.read_hostvars('dev', inventory_path, PASSWORD)
+        self.assertEqual(hostvars['aem_author_password'], 's3cret')
+
+    def test_other_group_vars_fall_back(self):
+        with open(os.path.join(self.inventory_path, 'group_vars', 'aem.yml'), 'w', encoding='utf-8') as f:
+            f.write('aem_author_username: other\n')
+        with self.assertRaises(ansible_vault.VaultReaderError):
+            ansible_vault.read_hostvars('dev', self.inventory_path, PASSWORD)
+
+    def test_no_inventory_in_config_falls_back(self):
+        with open(os.path.join(self.ansible_dir, 'ansible.cfg'), 'w', encoding='utf-8') as f:
+            f.write('[defaults]\nhost_key_checking = False\n')
+        with self.assertRaises(ansible_vault.VaultReaderError):
+            ansible_vault.get_inventory_path(self.ansible_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""read aem host variables from the ansible inventory without starting ansible"""
+import os
+import hmac
+import json
+import base64
+import hashlib
+import logging
+import binascii
+import configparser
+import yaml
+
+workspace = os.getenv('GITHUB_WORKSPACE')
+cache_dir = os.path.join(os.getenv('RUNNER_TEMP') or '', 'aem-vault-cache') if os.getenv('RUNNER_TEMP') else None
+COLOR_GREEN = "\u001b[32m"
+AEM_ENVS = ['aem_author', 'aem_publisher']
+VAULT_HEADER = '$ANSIBLE_VAULT'
+VAR_EXTENSIONS = ('.yml', '.yaml', '.json')
+
+
+class VaultReaderError(Exception):
+    """host variables cannot be resolved without ansible"""
+
+
+def decrypt(vault_text, password: bytes) -> bytes:
+    """decrypt a $ANSIBLE_VAULT;1.x;AES256 payload as ansible does"""
+    try:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    except ImportError:
+        raise VaultReaderError('cryptography is not installed') from None
+    header, *lines = vault_text.strip().splitlines()
+    if not header.startswith(VAULT_HEADER) or header.split(';')[2].strip() != 'AES256':
+        raise VaultReaderError(f'Unsupported vault format: {header}')
+    try:
+        salt, crypted_hmac, ciphertext = binascii.unhexlify(''.join(line.strip() for line in lines)).split(b'\n', 2)
+        salt, ciphertext = binascii.unhexlify(salt), binascii.unhexlify(ciphertext)
+    except (binascii.Error, ValueError):
+        raise VaultReaderError('Malformed vault payload') from None
+    derived_key = hashlib.pbkdf2_hmac('sha256', password, salt, 10000, 80)
+    key, hmac_key, iv = derived_key[:32], derived_key[32:64], derived_key[64:80]
+    if not hmac.compare_digest(hmac.new(hmac_key, ciphertext, hashlib.sha256).hexdigest().encode(), crypted_hmac.strip()):
+        raise VaultReaderError('Vault HMAC check failed - wrong password?')
+    decryptor = Cipher(algorithms.AES(key), modes.CTR(iv)).decryptor()
+    padded = decryptor.update(ciphertext) + decryptor.finalize()
+    return padded[:-padded[-1]] if padded else padded # pkcs7
+
+
+def get_loader(password: bytes):
+    """yaml loader that decrypts inline !vault values"""
+    class VaultLoader(yaml.SafeLoader):
+        """safe loader with the ansible !vault and !unsafe tags"""
+
+    def construct_vault(loader, node):
+        return decrypt(loader.construct_scalar(node), password).decode()
+
+    VaultLoader.add_constructor('!vault', construct_vault)
+    VaultLoader.add_constructor('!unsafe', lambda loader, node: loader.construct_scalar(node))
+    return VaultLoader
+
+
+def get_var_files(inventory_path, kind, name):
+    """variable files of a host or group - <name>.yml or every file of the <name> directory, sorted"""
+    base = os.path.join(inventory_path, kind, name)
+    files = [f'{base}{extension}' for extension in VAR_EXTENSIONS if os.path.isfile(f'{base}{extension}')]
+    if os.path.isdir(base):
+        files += sorted(os.path.join(base, x) for x in os.listdir(base) if x.endswith(VAR_EXTENSIONS))
+    return files
+
+
+def load_var_file(file_path, password: bytes) -> dict:
+    """load a variable file that is either plain, fully vault encrypted or holds inline !vault values"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if content.startswith(VAULT_HEADER):
+        content = decrypt(content, password).decode()
+    return yaml.load(content, Loader=get_loader(password)) or {}
+
+
+def has_template(value) -> bool:
+    """value still needs jinja templating"""
+    if isinstance(value, dict):
+        return any(has_template(v) for v in value.values())
+    if isinstance(value, list):
+        return any(has_template(v) for v in value)
+    return isinstance(value, str) and ('{{' in value or '{%' in value)
+
+
+def get_inventory_path(ansible_dir):
+    """inventory directory set in the ansible.cfg of ansible_dir, as the ansible cli run from there would use it"""
+    if os.getenv('ANSIBLE_CONFIG') or os.getenv('ANSIBLE_INVENTORY'):
+        raise VaultReaderError('Inventory is configured by environment')
+    config = configparser.ConfigParser(inline_comment_prefixes=('#', ';'), interpolation=None)
+    try:
+        found = config.read(os.path.join(ansible_dir, 'ansible.cfg'))
+    except configparser.Error as e:
+        raise VaultReaderError(f'Unreadable ansible.cfg: {e}') from None
+    inventory = config.get('defaults', 'inventory', fallback='').strip() if found else ''
+    if not inventory or ',' in inventory:
+        raise VaultReaderError('No single inventory set in ansible.cfg')
+    inventory_path = os.path.join(ansible_dir, os.path.expanduser(inventory))
+    if not os.path.isdir(inventory_path):
+        raise VaultReaderError(f'Inventory {inventory} is not a directory')
+    return inventory_path
+
+
+def get_var_groups(inventory_path):
+    """groups with variables in group_vars"""
+    group_vars_path = os.path.join(inventory_path, 'group_vars')
+    if not os.path.isdir(group_vars_path):
+        return set()
+    return {os.path.splitext(x)[0] if x.endswith(VAR_EXTENSIONS) else x for x in os.listdir(group_vars_path) if not x.startswith('.')}
+
+
+def read_hostvars(deploy_env, inventory_path, password: bytes) -> dict:
+    """resolve the aem variables of a host from group_vars/all and its host_vars"""
+    host_files = get_var_files(inventory_path, 'host_vars', deploy_env)
+    if not host_files:
+        raise VaultReaderError(f'No host_vars for {deploy_env}')
+    other_groups = get_var_groups(inventory_path) - {'all'}
+    if other_groups:
+        raise VaultReaderError(f"group_vars of {', '.join(sorted(other_groups))} need ansible to resolve group membership")
+    hostvars = {}
+    for file_path in get_var_files(inventory_path, 'group_vars', 'all') + host_files:
+        hostvars.update(load_var_file(file_path, password))
+    aem_envs = [x for x in AEM_ENVS if x in hostvars]
+    needed_keys = aem_envs + [f'{x}_{y}' for x in aem_envs for y in ['username', 'password']]
+    if not aem_envs or any(x not in hostvars for x in needed_keys):
+        raise VaultReaderError(f'Missing variables for {deploy_env}')
+    if has_template([hostvars[x] for x in needed_keys]):
+        raise VaultReaderError(f'Templated variables for {deploy_env}')
+    return select_aem_vars(hostvars)
+
+
+def get_cache_key(password: bytes) -> bytes:
+    """fernet key of the per-job cache, derived from the vault password"""
+    seed = f"{os.getenv('GITHUB_RUN_ID')}-{os.getenv('GITHUB_RUN_ATTEMPT')}-{os.getenv('GITHUB_JOB')}".encode()
+    return base64.urlsafe_b64encode(hashlib.pbkdf2_hmac('sha256', password, seed, 10000, 32))
+
+
+def read_cache(deploy_env, password: bytes):
+    """cached host variables of this job - None when missing or unreadable"""
+    try:
+        from cryptography.fernet import Fernet, InvalidToken
+    except ImportError:
+        return None
+    cache_path = os.path.join(cache_dir, f'{deploy_env}.bin') if cache_dir else None
+    if not cache_path or not os.path.isfile(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            return json.loads(Fernet(get_cache_key(password)).decrypt(f.read()))
+    except (InvalidToken, OSError, ValueError):
+        return None
+
+
+def write_cache(deploy_env, password: bytes, hostvars):
+    """store host variables encrypted, readable by this job only"""
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError:
+        return
+    if not cache_dir:
+        return
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    cache_path = os.path.join(cache_dir, f'{deploy_env}.bin')
+    descriptor = os.open(f'{cache_path}.tmp', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, 'wb') as f:
+        f.write(Fernet(get_cache_key(password)).encrypt(json.dumps(hostvars).encode()))
+    os.replace(f'{cache_path}.tmp', cache_path)
+
+
+def select_aem_vars(hostvars) -> dict:
+    """the aem server and credential variables of a host"""
+    keys = AEM_ENVS + [f'{x}_{y}' for x in AEM_ENVS for y in ['username', 'password']]
+    return {x: hostvars[x] for x in keys if x in hostvars}
+
+
+def get_hostvars(deploy_env, props_path, ansible_fallback, password_file=None):
+    """aem host variables of an environment, from the job cache, the vault encrypted inventory or else ansible_fallback"""
+    try:
+        with open(password_file or f'{workspace}/ansible.txt', 'rb') as f:
+            password = f.read().strip()
+    except OSError as e:
+        raise RuntimeError(f'Error reading vault password file: {e}') from None
+    hostvars = read_cache(deploy_env, password)
+    if hostvars is not None:
+        logging.info('%sUsing cached host variables for %s', COLOR_GREEN, deploy_env)
+        return hostvars
+    try:
+        hostvars = read_hostvars(deploy_env, get_inventory_path(os.path.join(props_path, 'ansible')), password)
+    except (VaultReaderError, OSError, yaml.YAMLError) as e:
+        logging.info('Reading vault with ansible: %s', e)
+        hostvars = select_aem_vars(ansible_fallback(deploy_env, props_path) or {})
+    write_cache(deploy_env, password, hostvars)
+    return hostvars
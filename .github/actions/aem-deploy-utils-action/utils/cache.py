@@ -1,31 +1,81 @@
 import os
+import time
 import logging
 import yaml
 import subprocess
 import json
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import utils.outputs as outputs
 
 workspace = os.getenv('GITHUB_WORKSPACE')
+flush_workers = int(os.getenv('CACHE_FLUSH_WORKERS') or 8)
+flush_timeout = int(os.getenv('CACHE_FLUSH_TIMEOUT') or 60)
 COLOR_RED = "\u001b[31m"
 COLOR_GREEN = "\u001b[32m"
 log_level = os.getenv('LOG_LEVEL') if os.getenv('LOG_LEVEL') else '20'
 logging.basicConfig(level=int(log_level), format='%(asctime)s :: %(levelname)s :: %(message)s')
 
-def cache_flush(aem_env):
-    aem_cache_flush = yaml.safe_load(os.getenv('AEM_CACHE_FLUSH'))
+def get_flush_targets(aem_envs, aem_cache_flush):
+    """unique flush urls of the environments, and of their configured paths if any"""
+    endpoint = aem_cache_flush['endpoint'].rstrip('/')
+    paths = aem_cache_flush.get('paths') or ['']
+    targets = []
+    for aem_env in aem_envs:
+        for path in paths:
+            target = '/'.join(x for x in [endpoint, aem_env.replace("_","-"), str(path).strip('/')] if x)
+            if target not in targets:
+                targets.append(target)
+    return targets
+
+
+def flush_target(session, target):
+    """flush one target - returns its report row"""
+    start = time.monotonic()
     try:
-        logging.info(f"[INFO] Requesting Cache flush for : {aem_env}")
-        endpoint = aem_cache_flush.get('endpoint')
-        api_call =f'curl -X PUT {endpoint}'
+        response = session.put(target, timeout=flush_timeout)
+        result = response.json().get('result') if response.content else None
+        ok = response.ok and result == 'ok'
+        status = f'{response.status_code} {result}'
+    except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+        ok, status = False, f'error: {e}'
+    return {'target': target, 'ok': ok, 'status': status, 'latency_ms': round((time.monotonic() - start) * 1000)}
+
+
+def cache_flush(aem_env):
+    """flush the dispatcher cache of one or more comma-separated environments concurrently - failures are reported, not raised"""
+    aem_cache_flush = yaml.safe_load(os.getenv('AEM_CACHE_FLUSH') or '{}') or {}
+    if not aem_cache_flush.get('endpoint'):
+        logging.info(f'{COLOR_RED} AEM Cache flush failed with error - no endpoint in AEM_CACHE_FLUSH')
+        outputs.set_output('cache-flush-report', json.dumps([]))
+        return []
+    aem_envs = [x.strip() for x in str(aem_env).split(',') if x.strip()]
+    targets = get_flush_targets(aem_envs, aem_cache_flush)
+    if not targets:
+        outputs.set_output('cache-flush-report', json.dumps([]))
+        return []
+
+    logging.info(f"[INFO] Invoking cache flush for : {', '.join(targets)}")
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=1, status_forcelist=(502, 503, 504), allowed_methods=frozenset(['PUT']), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=flush_workers, pool_maxsize=flush_workers, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    with ThreadPoolExecutor(max_workers=min(flush_workers, len(targets))) as executor:
+        report = list(executor.map(lambda target: flush_target(session, target), targets))
 
-        aem_env = aem_env.replace("_","-")
-        logging.info(f"[INFO] Invoking cache flush for : {aem_env}")
-        api_call = f"{api_call}/{aem_env}"
-        status = subprocess.run(api_call, shell=True, capture_output=True)
-        status = json.loads(status.stdout.decode())
-        if status["result"] == "ok":
-            logging.info("[INFO] AEM Cache flush was successful.")
-    except Exception as e:
-        logging.info(f'{COLOR_RED} AEM Cache flush failed with error - {e}')
+    outputs.add_summary('| Cache flush target | Status | Latency |')
+    outputs.add_summary('|---|---|---|')
+    for row in report:
+        if row['ok']:
+            logging.info(f"[INFO] AEM Cache flush was successful for {row['target']} in {row['latency_ms']}ms")
+        else:
+            logging.info(f"{COLOR_RED} AEM Cache flush failed for {row['target']} in {row['latency_ms']}ms - {row['status']}")
+        outputs.add_summary(f"| {row['target']} | {row['status']} | {row['latency_ms']}ms |")
+    outputs.set_output('cache-flush-report', json.dumps(report))
+    return report
 
 
 def security_test():
@@ -46,7 +96,7 @@ def security_test():
         file_path = f'{workspace}/aem_security_report.html'
         with open(file_path,'w+') as f:
             f.write(result)
-        os.system(f"echo 'security-report={file_path}' >> $GITHUB_OUTPUT")
+        outputs.set_output('security-report', file_path)
     if security_health_check_passed == False:
         logging.info(f"{COLOR_RED}Security Health Check Failed")
     else:
@@ -0,0 +1,80 @@
+"""index of the tracked aem packages installed on each server"""
+import os
+import csv
+import json
+import yaml
+
+
+class PackageInventory:
+    """package manager entries of the tracked packages, indexed by (server, package)"""
+
+    def __init__(self, package_list):
+        self.package_list = list(dict.fromkeys(package_list))
+        self.packages = set(self.package_list)
+        self.servers = []
+        self.index = {}
+
+    @classmethod
+    def from_constants(cls, constants_path=None) -> 'PackageInventory':
+        """create inventory of the packages listed in aem_package_list.yml"""
+        with open(f"{constants_path or os.getenv('CONSTANTS_PATH')}/aem_package_list.yml", 'r', encoding='utf-8') as f:
+            aem_package_list = yaml.load(f, Loader=yaml.BaseLoader)
+        return cls(aem_package_list.get('aem_packages') or [])
+
+    def add_manifest(self, server_name, server_manifest: dict):
+        """index the tracked packages of a list.jsp response in one pass"""
+        if server_name not in self.servers:
+            self.servers.append(server_name)
+        for package in self.package_list:
+            self.index.setdefault((server_name, package), [])
+        for result in server_manifest.get('results') or []:
+            package_name = result.get('name')
+            if package_name in self.packages:
+                self.index[(server_name, package_name)].append(
+                    {'name': package_name, 'path': result.get('path'), 'version': result.get('version')})
+
+    def add_manifest_file(self, server_name, file_path):
+        """index a list.jsp response saved to disk"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            self.add_manifest(server_name, json.load(f))
+
+    def get(self, server_name, package) -> list:
+        """entries of a package on a server, in package manager order"""
+        return self.index.get((server_name, package), [])
+
+    def latest(self, package):
+        """last entry of a package on the last server that has it"""
+        for server_name in reversed(self.servers):
+            entries = [x for x in self.get(server_name, package) if x.get('path')]
+            if entries:
+                return entries[-1]
+        return None
+
+    def versions(self, package) -> dict:
+        """versions of a package by server"""
+        return {server_name: [x.get('version') for x in self.get(server_name, package)] for server_name in self.servers}
+
+    def drift(self) -> dict:
+        """packages whose latest installed version differs between servers, with their versions by server"""
+        drifted = {}
+        for package in self.package_list:
+            versions = self.versions(package)
+            if len({x[-1] if x else None for x in versions.values()}) > 1:
+                drifted[package] = versions
+        return drifted
+
+    def to_manifest_map(self) -> dict:
+        """env manifest map of packages by server, with the tracked packages as deploy_artifacts"""
+        manifest_map = {server_name: {package: self.get(server_name, package) for package in self.package_list} for server_name in self.servers}
+        manifest_map['deploy_artifacts'] = self.package_list
+        return manifest_map
+
+    def write_csv(self, csv_file_path, env):
+        """csv of the latest package file and path of each tracked package"""
+        with open(csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Package Name', env, 'Path'])
+            for package in self.package_list:
+                entry = self.latest(package)
+                if entry:
+                    writer.writerow([package, entry['path'].split('/')[-1], entry['path']])
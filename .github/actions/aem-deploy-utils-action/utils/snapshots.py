@@ -0,0 +1,115 @@
+"""persisted package inventory snapshots of aem environments and the drift between them"""
+import os
+import json
+import time
+import shutil
+import hashlib
+from utils.inventory import PackageInventory
+
+workspace = os.getenv('GITHUB_WORKSPACE')
+store_path = os.getenv('AEM_SNAPSHOT_PATH') or f'{workspace}/aem-snapshots'
+
+
+def content_hash(value) -> str:
+    """sha256 of raw bytes or text, or of a value in canonical json"""
+    if isinstance(value, str):
+        value = value.encode()
+    elif not isinstance(value, bytes):
+        value = json.dumps(value, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(value).hexdigest()
+
+
+def packages_hash(package_list) -> str:
+    """hash of the tracked package list a snapshot was taken with"""
+    return content_hash(sorted(set(package_list)))
+
+
+def build_snapshot(env, package_inventory: PackageInventory, manifest_meta: dict) -> dict:
+    """normalized snapshot of an environment - manifest_meta holds the list.jsp hash and etag of each server"""
+    servers = {}
+    for server_name in package_inventory.servers:
+        packages = {package: package_inventory.get(server_name, package) for package in package_inventory.package_list}
+        servers[server_name] = {**manifest_meta.get(server_name, {}), 'packages': packages}
+    return {
+        'env': env,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'hash': content_hash({name: server['packages'] for name, server in servers.items()}),
+        'packages_hash': packages_hash(package_inventory.package_list),
+        'servers': servers,
+    }
+
+
+def get_env_versions(snapshot) -> dict:
+    """latest version of each package on each server, by package"""
+    env_versions = {}
+    for server_name, server in snapshot.get('servers', {}).items():
+        for package, entries in server.get('packages', {}).items():
+            env_versions.setdefault(package, {})[server_name] = entries[-1].get('version') if entries else None
+    return env_versions
+
+
+def diff(snapshots: dict) -> dict:
+    """packages whose versions differ between any of the labelled snapshots, in one pass - {package: {label: sorted versions}}"""
+    versions = {}
+    for label, snapshot in snapshots.items():
+        for package, server_versions in get_env_versions(snapshot).items():
+            versions.setdefault(package, {})[label] = sorted({str(x) for x in server_versions.values() if x}) or None
+    return {
+        package: by_label for package, by_label in versions.items()
+        if len({tuple(by_label.get(label) or []) for label in snapshots}) > 1
+    }
+
+
+class SnapshotStore:
+    """latest and previous snapshot of each environment, kept as json files"""
+
+    def __init__(self, path=None):
+        self.path = path or store_path
+
+    def get_file(self, env, name='latest'):
+        """snapshot file path"""
+        return os.path.join(self.path, env, f'{name}.json')
+
+    def load(self, env, name='latest'):
+        """load a snapshot - None when there is none"""
+        try:
+            with open(self.get_file(env, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_manifest_file(self, env, server_name):
+        """stored list.jsp response of a server"""
+        return os.path.join(self.path, env, 'manifests', f'{server_name}.json')
+
+    def get_servers(self, env, package_list) -> dict:
+        """servers of the latest snapshot with their stored list.jsp response, to skip unchanged package lists - none when it tracked other packages"""
+        snapshot = self.load(env) or {}
+        if snapshot.get('packages_hash') != packages_hash(package_list):
+            return {}
+        servers = snapshot.get('servers', {})
+        for server_name, server in servers.items():
+            manifest_file = self.get_manifest_file(env, server_name)
+            server['manifest_file'] = manifest_file if os.path.isfile(manifest_file) else None
+        return servers
+
+    def save_manifests(self, env, manifest_dir, server_names):
+        """store the list.jsp response of each server, to stand in for it when the server answers 304"""
+        os.makedirs(os.path.join(self.path, env, 'manifests'), exist_ok=True)
+        for server_name in server_names:
+            shutil.copyfile(os.path.join(manifest_dir, f'server-manifest-{server_name}.json'), self.get_manifest_file(env, server_name))
+
+    def save(self, snapshot) -> bool:
+        """store a snapshot as latest - a changed latest one becomes previous, returns whether the inventory changed"""
+        env = snapshot['env']
+        os.makedirs(os.path.join(self.path, env), exist_ok=True)
+        latest = self.load(env)
+        if latest is not None and {**latest, 'created_at': None} == {**snapshot, 'created_at': None}:
+            return False # keep the file as is, so an unchanged inventory hashes to the same cache key
+        changed = latest is None or latest.get('hash') != snapshot['hash']
+        if latest is not None and changed:
+            os.replace(self.get_file(env), self.get_file(env, 'previous'))
+        with open(f'{self.get_file(env)}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(f'{self.get_file(env)}.tmp', self.get_file(env))
+        return changed
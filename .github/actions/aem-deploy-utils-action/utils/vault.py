@@ -2,15 +2,23 @@
 import subprocess
 import os
 import json
-import time
+import signal
+import shutil
+import asyncio
 import logging
 import yaml
-import csv
 from pathlib import Path
+import utils.outputs as outputs
+from utils import ansible_vault
+from utils import snapshots
+from utils.inventory import PackageInventory
+from utils.snapshots import SnapshotStore
 
 operation = os.getenv('OPERATION')
 workspace = os.getenv('GITHUB_WORKSPACE')
 context = os.getenv('CONTEXT')
+LIST_OPERATIONS = ('generate-csv', 'drift-report') # operations that download the package list of each server
+check_deadline = int(os.getenv('SERVER_CHECK_DEADLINE') or 200) # seconds for all server probes together
 COLOR_RED = "\u001b[31m"
 COLOR_GREEN = "\u001b[32m"
 log_level = os.getenv('LOG_LEVEL') if os.getenv('LOG_LEVEL') else '20'
@@ -20,155 +28,242 @@ logging.basicConfig(level=int(log_level), format='%(asctime)s :: %(levelname)s :
 def get_vault_details(deploy_env):
     """fetch manifest from environment"""
     try:
-        vault_env_details = {}
-        props_path = os.getenv('PROPS_PATH')
-        vault_cmd = f'''ANSIBLE_FORCE_COLOR=false && ANSIBLE_NOCOLOR=true && cd {props_path}/ansible && ansible {deploy_env} -m debug -a var=hostvars[inventory_hostname] --vault-password-file={workspace}/ansible.txt | sed -e "s/{deploy_env} | SUCCESS => //"'''
-        vault_details = subprocess.run(vault_cmd, shell=True, capture_output=True, check=False)
-        if vault_details.returncode != 0:
-            raise RuntimeError(f'Error getting vault details: {vault_details.stderr.decode()}')
-        vault_response = yaml.safe_load(vault_details.stdout.decode()).get('hostvars[inventory_hostname]')
-
-        for aem_env in ['aem_author', 'aem_publisher']:
-            env_server_list = vault_response.get(aem_env,{}).get('server_ip')
-            if env_server_list is None: # kpo
-                continue
-            env_username = vault_response.get(f'{aem_env}_username')
-            env_password = vault_response.get(f'{aem_env}_password')
-            env_credentials = f'{env_username}:{env_password}'
-            env_host = vault_response.get(aem_env).get('http_port')
-            env_hosts = vault_response.get(aem_env).get('https_port')
-            env_details = {}
-            env_details['server'] = []
-            env_details['aem_creds'] = env_credentials
-            for server in env_server_list:
-                auth_server = f'http://{server}'
-                if env_host:
-                    auth_server = f'http://{server}:{env_host}'
-                elif env_hosts:
-                    auth_server = f'https://{server}:{env_hosts}'
-                env_details['server'].append(auth_server)
-            vault_env_details[aem_env] = env_details
+        vault_env_details = get_vault_env_details(deploy_env)
 
         # check server status
-        vault_env_details = check_server_status(vault_env_details)
+        snapshot_store = SnapshotStore()
+        manifest_meta = {}
+        previous_servers = None
         if operation == 'generate-csv':
-            package_details = get_package_details(vault_env_details)
-            generate_csv_output(package_details)
+            previous_servers = snapshot_store.get_servers(deploy_env, PackageInventory.from_constants().package_list)
+        vault_env_details = check_server_status(vault_env_details, previous_servers, manifest_meta)
+        if operation == 'generate-csv':
+            package_inventory = get_package_inventory(vault_env_details)
+            generate_csv_output(package_inventory)
+            snapshot_store.save_manifests(deploy_env, f'{workspace}/manifest', package_inventory.servers)
+            snapshot_store.save(snapshots.build_snapshot(deploy_env, package_inventory, manifest_meta))
+            package_details = package_inventory.to_manifest_map()
+            for package, versions in package_inventory.drift().items():
+                logging.info('%sVersions of %s differ between servers: %s', COLOR_RED, package, versions)
             logging.info('\n%sEnv Manifest Map:\n%s', COLOR_GREEN, yaml.safe_dump(package_details))
-            os.system(f"echo 'env-manifest-packages={json.dumps(package_details)}' >> $GITHUB_OUTPUT")
+            outputs.set_output('env-manifest-packages', json.dumps(package_details))
         masked_details = json.dumps(vault_env_details)
-        os.system(f"echo '::add-mask::{masked_details}' && echo 'vault-map={masked_details}' >> $GITHUB_OUTPUT")
+        print(f"::add-mask::{masked_details}", flush=True)
+        outputs.set_output('vault-map', masked_details)
     except (json.JSONDecodeError, RuntimeError) as e:
         raise RuntimeError(f'Error retrieving vault details: {e}') from None
 
 
-def check_server_status(vault_env_details):
-    """check server status and download manifest"""
+def get_vault_env_details(deploy_env):
+    """author and publisher servers and credentials of an environment"""
+    vault_env_details = {}
+    props_path = os.getenv('PROPS_PATH')
+    vault_response = ansible_vault.get_hostvars(deploy_env, props_path, get_ansible_hostvars)
+
+    for aem_env in ['aem_author', 'aem_publisher']:
+        env_server_list = vault_response.get(aem_env,{}).get('server_ip')
+        if env_server_list is None: # kpo
+            continue
+        env_username = vault_response.get(f'{aem_env}_username')
+        env_password = vault_response.get(f'{aem_env}_password')
+        env_credentials = f'{env_username}:{env_password}'
+        env_host = vault_response.get(aem_env).get('http_port')
+        env_hosts = vault_response.get(aem_env).get('https_port')
+        env_details = {}
+        env_details['server'] = []
+        env_details['aem_creds'] = env_credentials
+        for server in env_server_list:
+            auth_server = f'http://{server}'
+            if env_host:
+                auth_server = f'http://{server}:{env_host}'
+            elif env_hosts:
+                auth_server = f'https://{server}:{env_hosts}'
+            env_details['server'].append(auth_server)
+        vault_env_details[aem_env] = env_details
+    return vault_env_details
+
+
+def get_ansible_hostvars(deploy_env, props_path):
+    """resolve host variables with the ansible cli - used when the inventory needs templating"""
+    vault_cmd = f'''ANSIBLE_FORCE_COLOR=false && ANSIBLE_NOCOLOR=true && cd {props_path}/ansible && ansible {deploy_env} -m debug -a var=hostvars[inventory_hostname] --vault-password-file={workspace}/ansible.txt | sed -e "s/{deploy_env} | SUCCESS => //"'''
+    vault_details = subprocess.run(vault_cmd, shell=True, capture_output=True, check=False)
+    if vault_details.returncode != 0:
+        raise RuntimeError(f'Error getting vault details: {vault_details.stderr.decode()}')
+    return yaml.safe_load(vault_details.stdout.decode()).get('hostvars[inventory_hostname]')
+
+
+def check_server_status(vault_env_details, previous_servers=None, manifest_meta=None):
+    """check server status and download manifest - previous_servers are snapshot entries used to skip unchanged package lists"""
+    return asyncio.run(check_servers(vault_env_details, previous_servers or {}, manifest_meta if manifest_meta is not None else {}))
+
+
+async def check_servers(vault_env_details, previous_servers, manifest_meta):
+    """probe all servers concurrently under one deadline - unhealthy servers are pruned, losing the last server of a group stops all probes"""
+    if operation in LIST_OPERATIONS:
+        os.makedirs(f'{workspace}/manifest', exist_ok=True)
+    tasks = {}
     for key, value in vault_env_details.items():
-        aem_creds = value.get('aem_creds')
         for server in value.get('server'):
-            server_name = server.split('//')[1].split(':')[0].replace('.','-')
             logging.info('%sChecking server status: %s', COLOR_GREEN, server)
-            if operation == 'generate-csv':
-                list_file_path = f"{workspace}/manifest/server-manifest-{server_name}.json"
-                os.makedirs(f'{workspace}/manifest', exist_ok=True)
-                check_status_cmd = f"curl -k -H 'X-Requested-With: XMLHttpRequest' -u '{aem_creds}' {server}/crx/packmgr/list.jsp"
-            else:
-                check_status_cmd = f"curl -k --connect-timeout 10 --max-time 30 -s -o /dev/null -w '%{{http_code}}' {server}/system/console/bundles"
-            response, err = curl_with_retry(check_status_cmd, 3)
-            if response:
-                logging.info('%sSuccess', COLOR_GREEN)
-                if operation == 'generate-csv':
-                    server_manifest = json.loads(response)
-                    with open(list_file_path, 'w+', encoding='utf-8') as f:
-                        f.write(json.dumps(server_manifest))
-                    logging.info('%sArchiving information for server %s', COLOR_GREEN, server)
-            else:
-                error_msg = f'{COLOR_RED}Error in checking server {server} status: {err}'
-                if len(value.get('server')) > 1:
-                    logging.error(error_msg)
-                    vault_env_details[key]['server'].remove(server)
-                else:
-                    raise RuntimeError(error_msg)
+            tasks[asyncio.create_task(check_server(server, value.get('aem_creds'), previous_servers, manifest_meta))] = (key, server)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + check_deadline
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED)
+            if not done: # deadline reached - servers still being checked count as unhealthy
+                for task in sorted(pending, key=list(tasks).index):
+                    prune_server(vault_env_details, *tasks[task], f'No answer within {check_deadline} seconds.')
+                break
+            for task in sorted(done, key=list(tasks).index):
+                err = task.result()
+                if err:
+                    prune_server(vault_env_details, *tasks[task], err)
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
     return vault_env_details
 
 
-def get_package_details(vault_env_details):
-    """create map of packages with same artifact name as deploy artifact"""
-    package_map = {}
+def prune_server(vault_env_details, key, server, err):
+    """drop an unhealthy server - fails when it is the last one of its group"""
+    error_msg = f'{COLOR_RED}Error in checking server {server} status: {err}'
+    servers = vault_env_details[key]['server']
+    if len(servers) > 1:
+        logging.error(error_msg)
+        servers.remove(server)
+    else:
+        raise RuntimeError(error_msg)
+
+
+async def check_server(server, aem_creds, previous_servers, manifest_meta):
+    """probe one server and archive its package list - returns the error, if any"""
+    server_name = get_server_name(server)
+    previous = previous_servers.get(server_name)
+    if operation in LIST_OPERATIONS:
+        list_file_path = f"{workspace}/manifest/server-manifest-{server_name}.json"
+        etag_header = f"-H 'If-None-Match: {previous['etag']}' " if previous and previous.get('etag') and previous.get('manifest_file') else ''
+        check_status_cmd = f"curl -k -sS -D - {etag_header}-H 'X-Requested-With: XMLHttpRequest' -u '{aem_creds}' {server}/crx/packmgr/list.jsp"
+    else:
+        check_status_cmd = f"curl -k --connect-timeout 10 --max-time 30 -s -o /dev/null -w '%{{http_code}}' {server}/system/console/bundles"
+    response, err = await curl_with_retry(check_status_cmd, 3)
+    if response is None:
+        return err
+    logging.info('%sSuccess: %s', COLOR_GREEN, server)
+    if operation in LIST_OPERATIONS:
+        status, etag, body = parse_response(response)
+        if status not in (200, 304):
+            return f'Package list request failed with HTTP {status}.'
+        if status == 304: # package list unchanged since the last snapshot - reuse its stored full response
+            if not (previous and previous.get('manifest_file')):
+                return 'Package list not modified, but no stored response to reuse.'
+            logging.info('%sPackage list unchanged since last snapshot: %s', COLOR_GREEN, server)
+            shutil.copyfile(previous['manifest_file'], list_file_path)
+            manifest_meta[server_name] = {'hash': previous.get('hash'), 'etag': etag or previous.get('etag')}
+        else:
+            try:
+                server_manifest = json.loads(body)
+            except json.JSONDecodeError:
+                return f'Package list is not valid JSON (HTTP {status}).'
+            manifest_meta[server_name] = {'hash': snapshots.content_hash(body), 'etag': etag}
+            with open(list_file_path, 'w+', encoding='utf-8') as f:
+                f.write(json.dumps(server_manifest))
+        logging.info('%sArchiving information for server %s', COLOR_GREEN, server)
+    return None
+
+
+def parse_response(response):
+    """status code, etag and body of a curl -D - response - the last header block is the final response, after any 100 Continue or proxy CONNECT"""
+    head, body = '', response
+    while body.startswith('HTTP/'):
+        head, _, body = body.partition('\r\n\r\n')
+    lines = head.split('\r\n')
+    status = int(lines[0].split()[1]) if len(lines[0].split()) > 1 and lines[0].split()[1].isdigit() else None
+    headers = dict(line.split(':', 1) for line in lines[1:] if ':' in line)
+    etag = next((v.strip() for k, v in headers.items() if k.strip().lower() == 'etag'), None)
+    return status, etag, body
+
+
+def drift_report(deploy_envs):
+    """snapshot the package inventory of each environment and report the drift between them and their previous snapshots"""
+    snapshot_store = SnapshotStore()
+    labelled = {}
+    for deploy_env in deploy_envs:
+        try:
+            vault_env_details = get_vault_env_details(deploy_env)
+            manifest_meta = {}
+            previous_servers = snapshot_store.get_servers(deploy_env, PackageInventory.from_constants().package_list)
+            vault_env_details = check_server_status(vault_env_details, previous_servers, manifest_meta)
+            package_inventory = get_package_inventory(vault_env_details)
+        except (json.JSONDecodeError, RuntimeError) as e:
+            raise RuntimeError(f'Error retrieving package inventory of {deploy_env}: {e}') from None
+        previous = snapshot_store.load(deploy_env)
+        snapshot = snapshots.build_snapshot(deploy_env, package_inventory, manifest_meta)
+        snapshot_store.save_manifests(deploy_env, f'{workspace}/manifest', package_inventory.servers)
+        changed = snapshot_store.save(snapshot)
+        logging.info('%sSnapshot of %s %s', COLOR_GREEN, deploy_env, 'changed' if changed else 'unchanged')
+        labelled[deploy_env] = snapshot
+        if previous and changed:
+            labelled[f'{deploy_env} (previous)'] = previous
+    report = snapshots.diff(labelled)
+    if report:
+        outputs.add_summary(f"| Package | {' | '.join(labelled)} |")
+        outputs.add_summary(f"|---|{'---|' * len(labelled)}")
+        for package, by_label in report.items():
+            outputs.add_summary(f"| {package} | {' | '.join(', '.join(by_label.get(x) or ['-']) for x in labelled)} |")
+    else:
+        outputs.add_summary(f"No package drift between {', '.join(labelled)}")
+    logging.info('\n%sDrift Report:\n%s', COLOR_GREEN, yaml.safe_dump(report))
+    outputs.set_output('drift-report', json.dumps(report))
+    return report
+
+
+def get_server_name(server):
+    """manifest file name part of a server url"""
+    return server.split('//')[1].split(':')[0].replace('.','-')
+
+
+def get_package_inventory(vault_env_details) -> PackageInventory:
+    """index the tracked packages of every checked server"""
+    package_inventory = PackageInventory.from_constants()
     for v in vault_env_details.values():
         for server in v.get('server'):
-            server_name = server.split('//')[1].split(':')[0].replace('.','-')
-            list_file_path = f"{workspace}/manifest/server-manifest-{server_name}.json"
-            package_map[server_name] = {}
-            with open(list_file_path, 'r+', encoding='utf-8') as f:
-                server_manifest = json.load(f)
-            with open(f"{os.getenv('CONSTANTS_PATH')}/aem_package_list.yml", 'r') as f:
-                aem_package_list = yaml.load(f, Loader=yaml.BaseLoader)
-            f.close()
-            package_list = aem_package_list["aem_packages"]
-            
-            for package in package_list:
-                primary_artifact = package if operation == 'generate-csv' else primary_artifact
-                package_map[server_name][package] = []
-            package_map['deploy_artifacts'] = package_list
-            for result in server_manifest.get('results'):
-                package_name = result['name']
-                if package_name in package_list:
-                    package_map[server_name][package_name].append(
-                        {'name':package_name,'path':result['path'], 'version':result['version']})
-    return package_map
-
-
-def generate_csv_output(env_manifest_map):
+            server_name = get_server_name(server)
+            package_inventory.add_manifest_file(server_name, f"{workspace}/manifest/server-manifest-{server_name}.json")
+    return package_inventory
+
+
+def generate_csv_output(package_inventory: PackageInventory):
+    """write the latest file and path of each tracked package to csv-results"""
     env = os.getenv('DEPLOY_ENV')
-    file_name = f"output_{str(env)}.csv"
-    current_dir = Path.cwd()
-    csv_results_folder = current_dir / 'csv-results'
+    csv_results_folder = Path.cwd() / 'csv-results'
     csv_results_folder.mkdir(parents=True, exist_ok=True)
-    csv_file_path = csv_results_folder / file_name
-    with open(f"{os.getenv('CONSTANTS_PATH')}/aem_package_list.yml", 'r') as f:
-        aem_package_list = yaml.load(f, Loader=yaml.BaseLoader)
-    f.close()
-    with open(csv_file_path, "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Package Name", env, "Path"])
-        for package_name in aem_package_list.get("aem_packages", []):
-            last_package_file = None
-            for packages in env_manifest_map.values():
-                if not isinstance(packages, dict):
-                    continue
-                package_info = packages.get(package_name)
-                if isinstance(package_info, list) and package_info:
-                    # Get the last package dict with required keys
-                    for pkg in reversed(package_info):
-                        if isinstance(pkg, dict) and "path" in pkg:
-                            last_package_file = pkg["path"].split("/")[-1]
-                            last_package_path = pkg["path"]
-                            break
-            if last_package_file:
-                writer.writerow([package_name, last_package_file, last_package_path])
-
-
-def curl_with_retry(cmd, iterations):
-    """subprocess to execute API call"""
+    package_inventory.write_csv(csv_results_folder / f"output_{str(env)}.csv", env)
+
+
+async def curl_with_retry(cmd, iterations):
+    """subprocess to execute API call - returns [output, None] or [None, error]"""
     interval = 5 # seconds between attempts
     err = 'Unknown error'
-    i = 0
-    while i < iterations:
+    for i in range(1, iterations + 1):
+        process = await asyncio.create_subprocess_shell(cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, start_new_session=True)
         try:
-            check_status = subprocess.run(cmd, shell=True, capture_output=True, timeout=60, check=False)
-            if check_status.returncode == 0:
-                return [check_status.stdout.decode(), None]
-            err = check_status.stderr.decode().strip().split('\n')[-1]
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=60)
+            if process.returncode == 0:
+                return [stdout.decode(), None]
+            err = stderr.decode().strip().split('\n')[-1] or f'curl exited with code {process.returncode}'
             logging.info('%sError: %s', COLOR_RED, err)
-            i += 1
-        except (json.JSONDecodeError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-            if isinstance(e, subprocess.TimeoutExpired):
-                err = 'Timed out waiting for server.'
-            else:
-                err = 'Command return non-zero exit code.'
-            time.sleep(interval)
-            i += 1
+        except asyncio.TimeoutError:
+            err = 'Timed out waiting for server.'
             logging.info('%sAttempt %s. Error checking server: %s', COLOR_RED, i, err)
-    raise RuntimeError(err)
+            await asyncio.sleep(interval)
+        finally:
+            if process.returncode is None: # timed out or cancelled
+                try:
+                    os.killpg(process.pid, signal.SIGKILL) # the shell and the curl it started
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+    return [None, err]
@@ -2,10 +2,10 @@ import os
 import yaml
 import json
 import re
-import subprocess
 import pytz
 from datetime import datetime
 import utils.prod as prod
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -89,7 +89,7 @@ def create_message(package_deploy_map, deploy_envs):
 
     # set output for github pages
     html_report = html_message.replace('\n','')
-    os.system(f"echo 'report-content={html_report}' >> $GITHUB_OUTPUT")
+    outputs.set_output('report-content', html_report)
     with open(f'{action_path}/{deploy_env}_deployment_results.html', 'w+', encoding='utf-8') as f:
         f.write(html_message)
     f.close()
@@ -223,7 +223,7 @@ def html_report_deploy(package_deploy_map):
             """
         html_message += tabel_closing_tag
         html_message += '</body></html>'
-    os.system(f"echo 'result-map={overall_build_success}' >> $GITHUB_OUTPUT")
+    outputs.set_output('result-map', overall_build_success)
     return html_message
 
 
@@ -243,7 +243,7 @@ def check_environment(package_map, deploy_packages):
             artifact_id = package.get('name')
             logger.error(f'Artifact {artifact_id} did not meet quality standards. Removing from deploy packages.')
             msg = f'Quality checks failed for {artifact_id}'
-            subprocess.run([f"""echo "#### :x: {msg}" >> $GITHUB_STEP_SUMMARY"""], shell=True, check=True)
+            outputs.add_summary(f"#### :x: {msg}")
             remove_packages.append(artifact_id)
             pass_checks = False
             comment += f':x: Quality check failed for {artifact_id}\n'
@@ -257,8 +257,8 @@ def check_environment(package_map, deploy_packages):
     if os.getenv('GITHUB_EVENT_NAME') == 'pull_request':
         comment_map['result'] = pass_checks
         comment_map['comment'] = comment
-        os.system(f"echo 'result-map={json.dumps(comment_map)}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'exclude-packages={json.dumps(exclude_package_map)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('result-map', json.dumps(comment_map))
+    outputs.set_output('exclude-packages', json.dumps(exclude_package_map))
 
 
 if __name__ == '__main__':
@@ -4,6 +4,7 @@ import pytz
 from datetime import datetime
 import json
 import yaml
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -78,7 +79,7 @@ def set_output(report_map, extension='yml'):
         else:
             f.write(report_map)
     f.close()
-    os.system(f"echo 'report-content={report_map}' >> $GITHUB_OUTPUT")
+    outputs.set_output('report-content', report_map)
 
 
 def set_notifications(html_message, deploy_packages, deploy_envs):
@@ -103,7 +104,7 @@ def set_notifications(html_message, deploy_packages, deploy_envs):
     if operation == 'post-deploy':
         email_subject += ' Completed'    
     notification_map['subject'] = email_subject
-    os.system(f"echo 'notification-map={json.dumps(notification_map)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('notification-map', json.dumps(notification_map))
 
 
 def set_post_deploy_map(manifest_products):
@@ -126,4 +127,4 @@ def set_post_deploy_map(manifest_products):
     post_deploy_map['products'] = post_deploy_products
     post_deploy_map['jobs'] = len(post_deploy_products)
     logger.info(f'Post deploy map: {json.dumps(post_deploy_map, indent=2)}')
-    os.system(f"echo 'result-map={json.dumps(post_deploy_map)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('result-map', json.dumps(post_deploy_map))
@@ -3,6 +3,7 @@ import sys
 import yaml
 import copy
 import utils.prechecks as prechecks
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -49,7 +50,7 @@ def critical_test(deploy_env, gh_context):
         critical_test = False
     if aem_manifest.get('critical') == 'False': # pipeline properties global disable
         critical_test = False
-    os.system(f"echo 'critical-tests={critical_test}' >> $GITHUB_OUTPUT")
+    outputs.set_output('critical-tests', critical_test)
     logger.info(f'Require critical regression tests in environment {deploy_env}: {critical_test}')
 
 
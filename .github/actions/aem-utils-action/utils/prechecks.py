@@ -4,6 +4,7 @@ import os
 import json
 import re
 import yaml
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -40,11 +41,11 @@ def set_manifest(aem_manifest, gh_context):
         _handle_dispatcher_package(deploy_packages, operation)
         
         create_environment_map(deploy_packages, context, deploy_env, auto_deploy, operation, aem_manifest_name)
-        os.system(f"echo 'deploy-packages={json.dumps(deploy_packages)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('deploy-packages', json.dumps(deploy_packages))
         logger.info(f'Packages: \n{json.dumps(deploy_packages, indent=2)}')
 
         test_artifacts = manifest_records.get('test-artifacts', [])
-        os.system(f"echo 'test-artifacts={json.dumps(test_artifacts)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('test-artifacts', json.dumps(test_artifacts))
         return deploy_env
     except (FileNotFoundError, IndexError, RuntimeError) as e:
         raise RuntimeError(f'Error setting manifest - confirm {aem_manifest_name} exists in repo: {e}.') from None
@@ -192,7 +193,7 @@ def _handle_dispatcher_package(deploy_packages, operation):
             not re.match('promote-to-stage|promote-to-prod', operation)):
             if deploy_package.get('action') == 'install':
                 logger.info(f'Dispatcher Package: \n{json.dumps(deploy_package, indent=2)}')
-                os.system(f"echo 'dispatcher-package={json.dumps(deploy_package)}' >> $GITHUB_OUTPUT")
+                outputs.set_output('dispatcher-package', json.dumps(deploy_package))
             deploy_packages.remove(deploy_package)
 
 
@@ -255,13 +256,13 @@ def create_environment_map(deploy_map, context, deploy_env, auto_deploy, operati
         deploy_environment['vault_map'] = create_vault_map(deploy_environments)
         deploy_environment['manifest'] = manifest_name
         if auto_deploy:
-            os.system(f"echo '### :information_source: Manifest Name: {manifest_name}' >> $GITHUB_STEP_SUMMARY")
+            outputs.add_summary(f"### :information_source: Manifest Name: {manifest_name}")
     else:
         deploy_environment['name'] = deploy_map['name']
         if auto_deploy:
             deploy_environment['skip_build'] = skip_build
     logger.info(f'Deploy environment: \n{yaml.safe_dump(deploy_environment, indent=2, sort_keys=False)}')
-    os.system(f"echo 'deploy-environment={json.dumps(deploy_environment, sort_keys=False)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('deploy-environment', json.dumps(deploy_environment, sort_keys=False))
     return deploy_environments
 
 
@@ -271,7 +272,7 @@ def set_parallel_manifest(artifact_manifest, gh_context):
     deploy_environment['manifests'] = manifests
     deploy_environment['jobs'] = int(gh_context.get('max-parallel'))
     logger.info(f'Deploy environment: \n{yaml.safe_dump(deploy_environment, indent=2)}')
-    os.system(f"echo 'deploy-environment={json.dumps(deploy_environment, sort_keys=False)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('deploy-environment', json.dumps(deploy_environment, sort_keys=False))
 
   
 def create_vault_map(deploy_environments):
@@ -6,7 +6,9 @@ import re
 import utils.utils_artifactory as utils
 import utils.utils_image as image
 import utils.utils_props as props
-import subprocess
+import utils.utils_client as client
+import utils.utils_outputs as outputs
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -15,6 +17,8 @@ download_url = os.getenv('DOWNLOAD_URL')
 config_artifact_url = os.getenv('CONFIG_ARTIFACT_URL')
 org_name = os.getenv('PROJECT_GIT_ORG').upper()
 repo_name = os.getenv('PROJECT_GIT_REPO')
+download_concurrency = int(os.getenv('DOWNLOAD_CONCURRENCY') or 4)
+tag_secondary_artifacts = os.getenv('TAG_SECONDARY_ARTIFACTS') == 'true'
 COLOR_RED = "\u001b[31m"
 
 
@@ -42,26 +46,30 @@ def main():
         elif operation == 'set-props-output':
             props.set_props_output()
         else:
-            artifact_url = utils.find_latest_version(build_var_map, context)
+            artifact = utils.find_latest_artifact(build_var_map, context)
+            artifact_url = artifact.url if artifact else None
             if operation == 'tag-build-props':
                 props.create_build_props(build_var_map, artifact_url)
                 if artifact_url:
-                   subprocess.run([f"""echo "#### :shield: [Latest artifact URL]({artifact_url})" >> $GITHUB_STEP_SUMMARY"""], shell=True)
+                   outputs.add_summary(f"#### :shield: [Latest artifact URL]({artifact_url})")
             elif operation == 'get-all-props':
                 if artifact_url == None and not build_var_map.get('cd_deploy'):
                     raise RuntimeError(f'Artifact not found in Artifactory.')
                 elif artifact_url:
-                    props.get_all_props(artifact_url)
+                    props.get_all_props(artifact_url, artifact.properties)
             elif operation == 'set-props':
                 if os.getenv('SET_ARTIFACT_PROPS'):
-                    props.set_artifact_property(artifact_url)
+                    secondary_urls = get_secondary_urls(build_var_map, context) if tag_secondary_artifacts else None
+                    props.set_artifact_property(artifact_url, secondary_urls)
                 else:
                     logger.error(logger.format_msg('GHA_TOOL_ARTIFACTORY_BIZ_4_2001', 'No properties found for tagging', "No properties found to tag in the artifact"))
             elif operation == 'get-image-url' and not re.search("apigee-hybrid-fotf-test|mykp-rules-personalization-apigee", repo_name): # apigee hybrid test repos does not have a docker image
-                artifact_props = props.get_all_props(artifact_url)
+                artifact_props = props.get_all_props(artifact_url, artifact.properties if artifact else None)
                 image.get_image_url(build_var_map, artifact_props)
     except RuntimeError as e:
         raise RuntimeError(f'{COLOR_RED}Error in Artifactory Action: {e}') from None
+    finally:
+        client.log_stats()
 
 
 def check_artifactory_version(build_var_map):
@@ -100,29 +108,19 @@ def download_artifactory_artifact(build_var_map, context):
             utils.download_artifact(download_url)
         else:
             if context == 'download-image':
-                latest_version = utils.find_latest_version(build_var_map)
-                artifact_props = props.get_all_props(latest_version)
+                latest_artifact = utils.find_latest_artifact(build_var_map)
+                latest_version = latest_artifact.url if latest_artifact else None
+                artifact_props = props.get_all_props(latest_version, latest_artifact.properties if latest_artifact else None)
                 download_artifact_url = image.get_image_url(build_var_map, artifact_props)
                 utils.download_artifact(download_artifact_url, context)
             elif context == 'aem': # supports multi-component deployments
-                download_paths = {}
-                aem_artifacts = {}
-                deploy_module = build_var_map.get('module_values_deploy') or build_var_map
-                artifact_version = deploy_module.get('artifact_version')
-                aem_artifacts[deploy_module.get('artifact_id')] = artifact_version
-                if deploy_module.get('secondary_ids'):
-                    logger.info(f"Secondary IDs found: {deploy_module.get('secondary_ids')}")
-                    for secondary_id in deploy_module.get('secondary_ids'):
-                        secondary_id_name = secondary_id.split(':')[0]
-                        secondary_id_version = secondary_id.split(':')[1] if ':' in secondary_id else artifact_version
-                        aem_artifacts[secondary_id_name] = secondary_id_version
-                else:
-                    logger.info("No secondary IDs found in the deployment module.")
-                for id, version in aem_artifacts.items():
-                    download_artifact_url = utils.find_latest_version(build_var_map, context, id, version)
-                    download_path = utils.download_artifact(download_artifact_url, context)
-                    download_paths[id] = download_path
-                os.system(f"echo 'download-artifact={json.dumps(download_paths)}' >> $GITHUB_OUTPUT")
+                aem_artifacts = get_component_artifacts(build_var_map)
+                artifacts = utils.find_latest_artifacts({id: (build_var_map, context, id, version) for id, version in aem_artifacts.items()})
+                for id, artifact in artifacts.items():
+                    if artifact:
+                        outputs.set_output('artifact-url', artifact.url)
+                download_paths = download_aem_artifacts(artifacts, context)
+                outputs.set_output('download-artifact', json.dumps(download_paths))
             else:
                 if context == 'test':
                     deploy_module = build_var_map.get('module_values_test', {})
@@ -132,8 +130,8 @@ def download_artifactory_artifact(build_var_map, context):
                 artifact_version = deploy_module.get('artifact_version', '<unknown>')
                 ticket = build_var_map.get('input_map', {}).get('deployment-ticket', '<none>')
                 try:
-                    download_artifact_url = utils.find_latest_version(build_var_map, context)
-                    utils.download_artifact(download_artifact_url, context)
+                    artifact = utils.find_latest_artifact(build_var_map, context)
+                    utils.download_artifact(artifact.url if artifact else None, context, artifact.sha256 if artifact else None)
                 except RuntimeError as e:
                     error_message = (
                         f"{COLOR_RED}[Ticket {ticket}] Artifact '{artifact_id}-{artifact_version}' not found in Artifactory "
@@ -145,6 +143,56 @@ def download_artifactory_artifact(build_var_map, context):
         raise RuntimeError(f'{COLOR_RED}Error downloading artifact: {e}') from None
 
 
+def get_component_artifacts(build_var_map):
+    """
+    Returns the artifact ID and version of the primary artifact followed by each secondary artifact of a multi-component deployment.
+    """
+    component_artifacts = {}
+    deploy_module = build_var_map.get('module_values_deploy') or build_var_map
+    artifact_version = deploy_module.get('artifact_version')
+    component_artifacts[deploy_module.get('artifact_id')] = artifact_version
+    if deploy_module.get('secondary_ids'):
+        logger.info(f"Secondary IDs found: {deploy_module.get('secondary_ids')}")
+        for secondary_id in deploy_module.get('secondary_ids'):
+            secondary_id_name = secondary_id.split(':')[0]
+            secondary_id_version = secondary_id.split(':')[1] if ':' in secondary_id else artifact_version
+            component_artifacts[secondary_id_name] = secondary_id_version
+    else:
+        logger.info("No secondary IDs found in the deployment module.")
+    return component_artifacts
+
+
+def get_secondary_urls(build_var_map, context):
+    """
+    Resolves the URLs of the secondary artifacts of a multi-component deployment with one bulk search.
+    """
+    secondary_artifacts = dict(list(get_component_artifacts(build_var_map).items())[1:])
+    if not secondary_artifacts:
+        return []
+    artifacts = utils.find_latest_artifacts({id: (build_var_map, context, id, version) for id, version in secondary_artifacts.items()})
+    for id, artifact in artifacts.items():
+        if not artifact:
+            logger.warning(f"Secondary artifact {id} not found in Artifactory, skipping property update.")
+    return [artifact.url for artifact in artifacts.values() if artifact]
+
+
+def download_aem_artifacts(artifacts, context):
+    """
+    Downloads all components of an AEM deployment concurrently, limited by DOWNLOAD_CONCURRENCY.
+    The first failure cancels the downloads that have not started yet and is raised.
+    Returns the download path of each component, in the order of the components.
+    """
+    download_paths = {}
+    executor = ThreadPoolExecutor(max_workers=download_concurrency)
+    try:
+        futures = {executor.submit(utils.download_artifact, artifact.url if artifact else None, context, artifact.sha256 if artifact else None): id for id, artifact in artifacts.items()}
+        for future in as_completed(futures):
+            download_paths[futures[future]] = future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return {id: download_paths[id] for id in artifacts}
+
+
 def check_manifest_artifacts(build_var_map, operation):
     """
     Validates that the artifacts specified in the manifest exist in Artifactory.
@@ -154,6 +202,17 @@ def check_manifest_artifacts(build_var_map, operation):
     try:
         latest_version_deploy = ''
 
+        # Resolve every artifact in the manifest with a single bulk search
+        artifact_requests = {}
+        for key, value in build_var_map.items():
+            if not value.get('artifact_id') or not value.get('artifact_version'):
+                continue
+            if key == 'module_values_deploy':
+                artifact_requests[key] = (build_var_map, 'deploy', None, None)
+            elif key != 'app_props':
+                artifact_requests[key] = (value, operation, None, None)
+        latest_artifacts = utils.find_latest_artifacts(artifact_requests)
+
         # Iterate through build_var_map to validate artifacts
         for key, value in build_var_map.items():
             artifact_id = value.get('artifact_id')
@@ -165,16 +224,12 @@ def check_manifest_artifacts(build_var_map, operation):
                 logger.warning(f"Missing artifact details for {key}. Skipping...")
                 continue
 
-            latest_version = None
-
             # Determine the artifact operation (deploy, rollback, config)
-            if key == 'module_values_deploy':
-                latest_version = utils.find_latest_version(build_var_map, 'deploy')
-                if latest_version:
-                    latest_version_deploy = latest_version
-                    artifact_props = props.get_all_props(latest_version_deploy)
-            elif key != 'app_props':
-                latest_version = utils.find_latest_version(value, operation)
+            latest_artifact = latest_artifacts.get(key)
+            latest_version = latest_artifact.url if latest_artifact else None
+            if key == 'module_values_deploy' and latest_version:
+                latest_version_deploy = latest_version
+                artifact_props = props.get_all_props(latest_version_deploy, latest_artifact.properties)
 
             # Handle missing artifacts
             if not latest_version:
@@ -194,12 +249,12 @@ def check_manifest_artifacts(build_var_map, operation):
                 }
 
                 # Output Jira comment to GitHub Actions
-                os.system(f"echo 'jira-comment={json.dumps(jira_comment)}' >> $GITHUB_OUTPUT")
+                outputs.set_output('jira-comment', json.dumps(jira_comment))
                 break  # Stop processing on error
 
         # Output the latest deploy artifact version to GitHub Actions
         if latest_version_deploy:
-            os.system(f"echo 'artifact-url={latest_version_deploy}' >> $GITHUB_OUTPUT")
+            outputs.set_output('artifact-url', latest_version_deploy)
         else:
             logger.warning(f"No deploy artifact found.")
 
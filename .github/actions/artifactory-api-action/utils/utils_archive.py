@@ -0,0 +1,86 @@
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from kpghalogger import KpghaLogger
+logger = KpghaLogger()
+
+compression_level = int(os.getenv('DOTNET_ZIP_COMPRESSION_LEVEL') or 6)
+read_workers = int(os.getenv('ZIP_READ_WORKERS') or 8)
+STREAM_THRESHOLD = 32 * 1024 * 1024 # larger files are streamed into the archive instead of read ahead
+STORED_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.br', '.jar', '.war', '.nupkg',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2', '.mp3', '.mp4', '.pdf'
+}
+
+
+def read_file(file_path):
+    """Read a small file for the archive writer"""
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def get_compression(arcname):
+    """
+    Choose the compression for an archive entry.
+
+    Args:
+        arcname (str): The entry name.
+
+    Returns:
+        tuple: The zipfile compression type and level.
+    """
+    if compression_level == 0 or os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED, None
+    return zipfile.ZIP_DEFLATED, compression_level
+
+
+def create_zip(source_dir, zip_path):
+    """
+    Zip the contents of a directory, like 'cd source_dir && zip -r zip_path .'.
+
+    Small files are read ahead by a thread pool while entries are written in order,
+    already-compressed file types are stored without deflating, and the archive is
+    written straight to zip_path.
+
+    Args:
+        source_dir (str): The directory to archive.
+        zip_path (str): The archive to create.
+
+    Returns:
+        int: The number of files archived.
+    """
+    entries = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for name in dirs + sorted(files):
+            file_path = os.path.join(root, name)
+            entries.append((file_path, os.path.relpath(file_path, source_dir)))
+
+    file_count = 0
+    with zipfile.ZipFile(zip_path, 'w', allowZip64=True) as zf, ThreadPoolExecutor(max_workers=read_workers) as executor:
+        pending = deque()
+
+        def write_next():
+            file_path, arcname, info, data = pending.popleft()
+            compress_type, compress_level = get_compression(arcname)
+            if data is None:
+                zf.write(file_path, arcname, compress_type, compress_level)
+            else:
+                info.compress_type = compress_type
+                zf.writestr(info, data.result(), compress_type, compress_level)
+
+        for file_path, arcname in entries:
+            if os.path.isdir(file_path):
+                pending.append((file_path, arcname, None, None))
+            else:
+                info = zipfile.ZipInfo.from_file(file_path, arcname)
+                data = executor.submit(read_file, file_path) if info.file_size <= STREAM_THRESHOLD else None
+                pending.append((file_path, arcname, info, data))
+                file_count += 1
+            if len(pending) > read_workers * 2:
+                write_next()
+        while pending:
+            write_next()
+    logger.info(f"Archived {file_count} file(s) from '{source_dir}' into '{zip_path}' ({os.path.getsize(zip_path)} bytes, compression level {compression_level}).")
+    return file_count
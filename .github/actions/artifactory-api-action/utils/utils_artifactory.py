@@ -2,13 +2,25 @@ import os
 import subprocess
 import re
 import pytz
-import time
 import glob
 import yaml
-from artifactory import ArtifactoryPath, ArtifactoryException
-from requests.auth import HTTPBasicAuth
+import fnmatch
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from typing import Optional
+from artifactory import ArtifactoryException
 from datetime import datetime
 from requests.exceptions import ConnectionError, RequestException
+import utils.utils_cache as cache
+import utils.utils_client as client
+import utils.utils_download as download
+import utils.utils_extract as extract
+import utils.utils_store as store
+import utils.utils_upload as upload
+import utils.utils_archive as archive
+import utils.utils_outputs as outputs
+import utils.utils_props as props
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -21,6 +33,47 @@ download_path = os.getenv('DOWNLOAD_PATH', '')
 org_name = os.getenv('PROJECT_GIT_ORG').upper()
 gha_org = os.getenv('GHA_ORG')
 COLOR_RED = "\u001b[31m"
+AQL_INCLUDE_FIELDS = ['repo', 'path', 'name', 'created', 'sha256', 'property']
+
+
+@dataclass
+class ArtifactRecord:
+    """Data structure to hold an artifact found by an AQL search, including its properties if the search returned them"""
+    repo: str
+    path: str
+    name: str
+    created: Optional[str] = None
+    sha256: Optional[str] = None
+    properties: Optional[dict] = None
+
+    @classmethod
+    def from_aql(cls, item: dict) -> 'ArtifactRecord':
+        """Create ArtifactRecord instance from an AQL search result - properties stay None for cached results"""
+        properties = None
+        if 'properties' in item:
+            properties = {}
+            for prop in item.get('properties') or []:
+                properties.setdefault(prop.get('key'), []).append(prop.get('value', ''))
+        return cls(
+            repo=item.get('repo'),
+            path=item.get('path'),
+            name=item.get('name'),
+            created=item.get('created'),
+            sha256=item.get('sha256'),
+            properties=properties
+        )
+
+    @property
+    def url(self) -> str:
+        """Artifactory URL of the artifact"""
+        return f"{artifactory_url}/{self.repo}/{self.path}/{self.name}"
+
+    def load_properties(self) -> dict:
+        """Properties of the artifact, read from Artifactory when the search did not return them"""
+        if self.properties is None:
+            self.properties = props.get_artifactory_path(self.url).properties
+        return self.properties
+
 
 def find_latest_version(build_var_map, context=None, artifact_id=None, artifact_version=None):
     """
@@ -35,51 +88,132 @@ def find_latest_version(build_var_map, context=None, artifact_id=None, artifact_
         str: The URL of the latest artifact version.
         list: A list of artifact URLs with missing properties
 
+    Raises:
+        RuntimeError: If there is an error finding the latest Artifactory version.
+    """
+    artifact = find_latest_artifact(build_var_map, context, artifact_id, artifact_version)
+    return artifact.url if artifact else None
+
+
+def find_latest_artifact(build_var_map, context=None, artifact_id=None, artifact_version=None):
+    """
+    Find the latest artifact version along with the properties returned by the search.
+
+    Args:
+        build_var_map (dict): A dictionary containing build variables.
+        context (str, optional): The context of the deployment. Defaults to None.
+        artifact_id (str, optional): The ID of the artifact. Defaults to None.
+        artifact_version (str, optional): The version of the artifact. Defaults to None.
+
+    Returns:
+        ArtifactRecord: The latest artifact, or None if not found.
+
     Raises:
         RuntimeError: If there is an error finding the latest Artifactory version.
     """
     try:
-        app_extension = None
-        if context == 'test':
-            deploy_module = 'module_values_test'
-        elif context == 'test-config':
-            deploy_module = 'module_values_test_config'
-        elif context and re.match('project|build|apigee', context):
-            deploy_module = 'module_values_project'
-        elif context == 'config':
-            deploy_module = 'module_values_config'
-        else:
-            deploy_module = 'module_values_deploy'
-        if gha_org == 'ENTERPRISE': 
-            input_map, application_name = get_input_map() 
-            logger.info(f"Application name Selected: {application_name}")   
-            if application_name:
-                artifact_id = application_name 
-            else:
-                artifact_id = (build_var_map.get(deploy_module, {}).get('artifact_id') or build_var_map.get('artifact_id'))
-                module_name = ( build_var_map.get('app_props', {}).get('module_name') or build_var_map.get('build_group', {}).get('module-name'))
-                if module_name:
-                    if module_name == artifact_id:
-                        logger.info(f"Matches the module name '{module_name}' and artifact id '{artifact_id}' values")
-                    elif module_name.lower() == artifact_id:
-                        logger.info(f"Mismatch in case for module name '{module_name}' and artifact id '{artifact_id}'")
-                    else:
-                        logger.info(f"Mismatch in values: module name = '{module_name}', artifact id = '{artifact_id}'")
-        else:
-            artifact_id = artifact_id or (build_var_map.get(deploy_module, {}).get('artifact_id') or build_var_map.get('artifact_id'))
-        artifact_version = artifact_version or build_var_map.get(deploy_module,{}).get('artifact_version') or build_var_map.get('artifact_version') or build_var_map.get('app_props').get('artifact_version')
-        app_extension = get_app_extension(build_var_map, context)
-        if artifact_version_env:
-            artifact_version = artifact_version_env.lower()
-        artifact_url = get_url_by_app_type(artifact_id, artifact_version, app_extension, context)
+        artifact_id, artifact_version, app_extension = get_artifact_request(build_var_map, context, artifact_id, artifact_version)
+        artifact = get_artifact_by_app_type(artifact_id, artifact_version, app_extension, context)
+        artifact_url = artifact.url if artifact else None
         if artifact_url:
-            os.system(f"echo 'artifact-url={artifact_url}' >> $GITHUB_OUTPUT")
+            outputs.set_output('artifact-url', artifact_url)
         logger.info(f'Latest artifact version: {artifact_url}')
-        return artifact_url
+        return artifact
     except RuntimeError as e:
         raise RuntimeError(f"{COLOR_RED}Error finding latest Artifactory version: {e}")
 
 
+def find_latest_artifacts(artifact_requests):
+    """
+    Find the latest version of several artifacts with as few AQL searches as possible.
+
+    Every artifact sharing the same repo set is resolved by a single AQL query whose
+    name patterns cover all artifacts. The query leaves out properties and is bounded
+    by the version-specific name patterns. The response is grouped per artifact locally,
+    and the same rules as get_url_by_app_type are applied to the newest 3 matches of
+    each group. Properties are only read for the records that need them.
+
+    Args:
+        artifact_requests (dict): Map of key to (build_var_map, context, artifact_id, artifact_version),
+            using the same arguments as find_latest_version.
+
+    Returns:
+        dict: Map of key to the latest ArtifactRecord, or None if not found.
+
+    Raises:
+        RuntimeError: If there is an error finding the latest Artifactory versions.
+    """
+    try:
+        artifact_searches = {}
+        for key, (build_var_map, context, artifact_id, artifact_version) in artifact_requests.items():
+            artifact_id, artifact_version, app_extension = get_artifact_request(build_var_map, context, artifact_id, artifact_version)
+            artifact_version, version_search = get_version_search(artifact_version)
+            name_patterns = get_name_patterns(artifact_id, artifact_version, version_search, app_extension, context)
+            artifact_repo = get_artifact_repo(artifact_version, context)
+            artifact_searches.setdefault(artifact_repo, {})[key] = (artifact_id, artifact_version, context, name_patterns)
+
+        artifacts = {}
+        for artifact_repo, searches in artifact_searches.items():
+            search_patterns = list(dict.fromkeys(pattern for search in searches.values() for pattern in search[3]))
+            data_req = build_search_query(search_patterns, artifact_repo, limit=None, include_properties=False)
+            logger.info(f"Constructed bulk search query for {len(searches)} artifacts: {data_req}")
+            response = search_artifacts(data_req, 'bulk')
+            for key, (artifact_id, artifact_version, context, name_patterns) in searches.items():
+                artifact_matches = [i for i in response if any(fnmatch.fnmatchcase(i.get('name', ''), pattern) for pattern in name_patterns)]
+                artifacts[key] = select_artifact(artifact_matches[:3], artifact_id, artifact_version, context)
+                logger.info(f'Latest artifact version for {artifact_id}: {artifacts[key].url if artifacts[key] else None}')
+        return artifacts
+    except RuntimeError as e:
+        raise RuntimeError(f"{COLOR_RED}Error finding latest Artifactory versions: {e}")
+
+
+def get_artifact_request(build_var_map, context=None, artifact_id=None, artifact_version=None):
+    """
+    Determine the artifact ID, version and extension to search for.
+
+    Args:
+        build_var_map (dict): A dictionary containing build variables.
+        context (str, optional): The context of the deployment. Defaults to None.
+        artifact_id (str, optional): The ID of the artifact. Defaults to None.
+        artifact_version (str, optional): The version of the artifact. Defaults to None.
+
+    Returns:
+        tuple: The artifact ID, artifact version and application extension.
+    """
+    if context == 'test':
+        deploy_module = 'module_values_test'
+    elif context == 'test-config':
+        deploy_module = 'module_values_test_config'
+    elif context and re.match('project|build|apigee', context):
+        deploy_module = 'module_values_project'
+    elif context == 'config':
+        deploy_module = 'module_values_config'
+    else:
+        deploy_module = 'module_values_deploy'
+    if gha_org == 'ENTERPRISE': 
+        input_map, application_name = get_input_map() 
+        logger.info(f"Application name Selected: {application_name}")   
+        if application_name:
+            artifact_id = application_name 
+        else:
+            artifact_id = (build_var_map.get(deploy_module, {}).get('artifact_id') or build_var_map.get('artifact_id'))
+            module_name = ( build_var_map.get('app_props', {}).get('module_name') or build_var_map.get('build_group', {}).get('module-name'))
+            if module_name:
+                if module_name == artifact_id:
+                    logger.info(f"Matches the module name '{module_name}' and artifact id '{artifact_id}' values")
+                elif module_name.lower() == artifact_id:
+                    logger.info(f"Mismatch in case for module name '{module_name}' and artifact id '{artifact_id}'")
+                else:
+                    logger.info(f"Mismatch in values: module name = '{module_name}', artifact id = '{artifact_id}'")
+    else:
+        artifact_id = artifact_id or (build_var_map.get(deploy_module, {}).get('artifact_id') or build_var_map.get('artifact_id'))
+    artifact_version = artifact_version or build_var_map.get(deploy_module,{}).get('artifact_version') or build_var_map.get('artifact_version') or build_var_map.get('app_props').get('artifact_version')
+    app_extension = get_app_extension(build_var_map, context)
+    if artifact_version_env:
+        artifact_version = artifact_version_env.lower()
+    return artifact_id, artifact_version, app_extension
+
+
 def get_app_extension(build_var_map, context=None):
     """
     Get the application extension based on the build variable map.
@@ -112,6 +246,26 @@ def get_url_by_app_type(artifact_id, artifact_version, app_extension, context):
     Returns:
         str: The URL of a valid artifact URL if found.
 
+    Raises:
+        RuntimeError: If there is an error querying Artifactory.
+    """
+    artifact = get_artifact_by_app_type(artifact_id, artifact_version, app_extension, context)
+    return artifact.url if artifact else None
+
+
+def get_artifact_by_app_type(artifact_id, artifact_version, app_extension, context):
+    """
+    Query Artifactory for any deployable artifact matching the ID, version, and application extension.
+
+    Args:
+        artifact_id (str): The ID of the artifact.
+        artifact_version (str): The version of the artifact.
+        app_extension (str): The application extension.
+        context (str): The context of the deployment.
+
+    Returns:
+        ArtifactRecord: A valid artifact if found.
+
     Raises:
         RuntimeError: If there is an error querying Artifactory.
     """
@@ -119,9 +273,34 @@ def get_url_by_app_type(artifact_id, artifact_version, app_extension, context):
     logger.info(f"artifact version in get url by app type:{artifact_version}")
     logger.info(f"app extension in get url by app type: {app_extension}")
     logger.info(f"context in get url by app type: {context}")
-    
-    # Artifactory repo
-    if re.match('ENTERPRISE', gha_org) and re.match('CDTS', org_name[:4]):
+
+    artifact_version, version_search = get_version_search(artifact_version)
+    name_patterns = get_name_patterns(artifact_id, artifact_version, version_search, app_extension, context)
+    artifact_repo = get_artifact_repo(artifact_version, context)
+
+    # Search query
+    data_req = build_search_query(name_patterns, artifact_repo)
+    logger.info(f"Constructed search query for Artifactory: {data_req}")
+    response = search_artifacts(data_req, context)
+    return select_artifact(response, artifact_id, artifact_version, context)
+
+
+def get_artifact_repo(artifact_version, context):
+    """
+    Get the Artifactory repos to search for the organization.
+
+    Args:
+        artifact_version (str): The version of the artifact.
+        context (str): The context of the deployment.
+
+    Returns:
+        str: The AQL repo clauses.
+    """
+    if context == 'config' and not re.match('ENTERPRISE', gha_org) and artifact_version.startswith('latest'): # support latest tag for KPD config artifacts
+        artifact_repo = f"""
+            {{"repo":"inhouse_{artifact_version.split('-')[1]}"}}
+            """
+    elif re.match('ENTERPRISE', gha_org) and re.match('CDTS', org_name[:4]):
         artifact_repo = f"""
         {{"repo":"npm-release"}},
         {{"repo":"npm-local"}},
@@ -159,8 +338,19 @@ def get_url_by_app_type(artifact_id, artifact_version, app_extension, context):
         {{"repo":"npm-virtual"}},
         {{"repo":"pypi-virtual"}}
         """
+    return artifact_repo
+
+
+def get_version_search(artifact_version):
+    """
+    Get the version pattern to match artifact names against.
 
-    # Version match
+    Args:
+        artifact_version (str): The version of the artifact.
+
+    Returns:
+        tuple: The normalized artifact version and the version search pattern.
+    """
     if gha_org == 'CDO-KP-ORG':
         artifact_version = artifact_version.lower()
         version_search = re.sub(r'([a-zA-Z]{1,})(-[a-zA-Z]{1,})?','*', artifact_version)
@@ -170,112 +360,152 @@ def get_url_by_app_type(artifact_id, artifact_version, app_extension, context):
         else:  
            artifact_version = artifact_version.upper()
            version_search = artifact_version
-    
+    return artifact_version, version_search
+
+
+def get_name_patterns(artifact_id, artifact_version, version_search, app_extension, context):
+    """
+    Get the artifact name patterns to search for.
+
+    Args:
+        artifact_id (str): The ID of the artifact.
+        artifact_version (str): The version of the artifact.
+        version_search (str): The version search pattern.
+        app_extension (str): The application extension.
+        context (str): The context of the deployment.
+
+    Returns:
+        list: The AQL $match name patterns.
+    """
     if context == 'config' and not re.match('ENTERPRISE', gha_org):
-        search_context = f"""
-        {{"name":{{"$match":"{artifact_id}-{version_search}.zip"}}}}
-        """
-        if artifact_version.startswith('latest'): # support latest tag for KPD config artifacts
-            artifact_repo = f"""
-            {{"repo":"inhouse_{artifact_version.split('-')[1]}"}}
-            """
+        name_patterns = [f"{artifact_id}-{version_search}.zip"]
     elif app_extension and not re.match('test|project|apigee', str(context)):
-        search_context = f"""
-        {{"name":{{"$match":"{artifact_id}-{version_search}.{app_extension}"}}}}
-        """
+        name_patterns = [f"{artifact_id}-{version_search}.{app_extension}"]
     elif gha_org == 'CDO-KP-ORG' and re.match('test|apigee', str(context)):
         if context == 'test' and 'it.tests' in artifact_id:
-            search_context = f"""
-            {{"name":{{"$match":"{artifact_id}-{version_search}.zip"}}}},
-            {{"name":{{"$match":"{artifact_id}-{version_search}.tgz"}}}},
-            {{"name":{{"$match":"{artifact_id}-{version_search}.tar.gz"}}}}
-        """
+            name_patterns = [f"{artifact_id}-{version_search}.{ext}" for ext in ['zip', 'tgz', 'tar.gz']]
         else:
-            search_context = f"""
-            {{"name":{{"$match":"{artifact_id}-{version_search}.jar"}}}},
-            {{"name":{{"$match":"{artifact_id}-{version_search}.zip"}}}},
-            {{"name":{{"$match":"{artifact_id}-{version_search}.tgz"}}}},
-            {{"name":{{"$match":"{artifact_id}-{version_search}.tar.gz"}}}}
-        """
+            name_patterns = [f"{artifact_id}-{version_search}.{ext}" for ext in ['jar', 'zip', 'tgz', 'tar.gz']]
     elif 'parentpom' in artifact_id:
-        search_context = f"""
-        {{"name":{{"$match":"{artifact_id}-{version_search}.pom"}}}}
-        """
+        name_patterns = [f"{artifact_id}-{version_search}.pom"]
     else:
-         logger.info(f"Version search is: {version_search}")  
-         search_context = f"""
-         {{"name":{{"$match":"{artifact_id}-{version_search}.war"}}}},
-         {{"name":{{"$match":"{artifact_id}-{version_search}.zip"}}}},
-         {{"name":{{"$match":"{artifact_id}-{version_search}.jar"}}}},
-         {{"name":{{"$match":"{artifact_id}-{version_search}.ear"}}}},
-         {{"name":{{"$match":"{artifact_id}-{version_search}.tgz"}}}},
-         {{"name":{{"$match":"{artifact_id}-{version_search}.tar.gz"}}}},
-         {{"name":{{"$match":"{artifact_id}.{version_search}.nupkg"}}}}
-         """
-        
-    
+        logger.info(f"Version search is: {version_search}")  
+        name_patterns = [f"{artifact_id}-{version_search}.{ext}" for ext in ['war', 'zip', 'jar', 'ear', 'tgz', 'tar.gz']]
+        name_patterns.append(f"{artifact_id}.{version_search}.nupkg")
+
     if context == 'build' or app_extension == 'pom':
-       search_context += f',{{"name":{{"$match":"{artifact_id}-{version_search}.pom"}}}}'   
+        name_patterns.append(f"{artifact_id}-{version_search}.pom")
+    return name_patterns
 
-    # Search query
+
+def build_search_query(name_patterns, artifact_repo, limit=3, include_properties=True):
+    """
+    Build the AQL search query.
+
+    Args:
+        name_patterns (list): The AQL $match name patterns.
+        artifact_repo (str): The AQL repo clauses.
+        limit (int, optional): The maximum number of results, or None for no limit. Defaults to 3.
+        include_properties (bool, optional): Whether the results include artifact properties. Defaults to True.
+
+    Returns:
+        str: The AQL search query.
+    """
+    include_fields = ','.join(f'"{x}"' for x in AQL_INCLUDE_FIELDS if include_properties or x != 'property')
+    search_context = ',\n            '.join(f'{{"name":{{"$match":"{pattern}"}}}}' for pattern in name_patterns)
     data_req = f"""items.find({{
         "$or":[
             {search_context}
         ],
         "$or":[
             {artifact_repo}
-        ]}}).sort({{"$desc":["created"]}}).limit(3)
-    """ 
-    logger.info(f"Constructed search query for Artifactory: {data_req}")
-    urls_for_missing_props = []
+        ]}}).include({include_fields}).sort({{"$desc":["created"]}})"""
+    if limit:
+        data_req += f".limit({limit})"
+    return data_req
 
-    try:
-        logger.debug(f"Request to Artifactory: {data_req}")
-        artifactory_path = ArtifactoryPath(artifactory_url, auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-        response = artifactory_path.aql(data_req)
-        logger.info(f"Response from Artifactory: {response}")
 
-        artifact_url = None
-        for i in response:
-            artifact_repo = i.get('repo')
-            artifact_path = i.get('path')
-            artifact_name = i.get('name')
-            artifact_url = f"{artifactory_url}/{artifact_repo}/{artifact_path}/{artifact_name}"
-            logger.info(f"Found artifact at {artifact_url}")
-
-            if context == 'deploy':
-                artifactory_path = ArtifactoryPath(artifact_url, auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-                props = artifactory_path.properties
-                logger.info(f"[INFO] PROPERTIES FOR {artifact_name}: {props}")
-                if props and (props.get('REPO_NAME') or props.get('repoName')):
-                    logger.info(f'Found artifact URL: {artifact_url}')
-                    return artifact_url 
-                else:
-                    logger.warning(f"Artifact found at {artifact_url}, but it is missing the required properties 'REPONAME' or 'repoName'.")
-                    urls_for_missing_props.append(artifact_url)
-            else:
-                logger.info(f"Deployment context not applicable. Returning artifact URL: {artifact_url}.")
-                return artifact_url
+def search_artifacts(data_req, context=None):
+    """
+    Run an AQL search against Artifactory, using the AQL cache when possible.
 
-        if urls_for_missing_props:
-            missing_urls_message = '\n'.join(urls_for_missing_props)
-            error_message = (
-                f"ERROR: No valid artifact '{artifact_id}-{artifact_version}' was found in Artifactory. "
-                f"The artifact is missing the required properties: 'REPO_NAME' or 'repoName'.\n\n"
-                f"The following artifact URLs lack the required properties:\n{missing_urls_message}\n"
-            )
-            logger.error(error_message)
+    Properties are left out of cached responses, since they change independently of
+    the search results. Results served from the cache carry no properties key.
+
+    Args:
+        data_req (str): The AQL search query.
+        context (str, optional): The context of the search. Defaults to None.
 
-        return None
+    Returns:
+        list: The AQL search results.
 
+    Raises:
+        RuntimeError: If there is an error querying Artifactory.
+    """
+    try:
+        logger.debug(f"Request to Artifactory: {data_req}")
+        response = cache.get_cached_aql(data_req, context)
+        if response is None:
+            artifactory_path = client.get_client().path(artifactory_url)
+            response = artifactory_path.aql(data_req)
+            cache.set_cached_aql(data_req, [{k: v for k, v in i.items() if k != 'properties'} for i in response], context)
+        logger.info(f"Response from Artifactory: {response}")
+        return response
     except (ConnectionError, ArtifactoryException) as e:
         logger.error(f"Artifactory connection error: {e}")
         raise RuntimeError(f"Artifactory server is unreachable: {e}")
     except Exception as e:
-        logger.error(f"Error in get_url_by_app_type function: {e}")
+        logger.error(f"Error in search_artifacts function: {e}")
         raise RuntimeError(f"Unexpected error: {e}")
 
 
+def select_artifact(response, artifact_id, artifact_version, context):
+    """
+    Select the newest valid artifact from AQL search results sorted by creation date.
+
+    For the deploy context the artifact must have the REPO_NAME or repoName property,
+    which is read from the properties included in the search results, or from Artifactory
+    when the results came from the AQL cache.
+
+    Args:
+        response (list): The AQL search results.
+        artifact_id (str): The ID of the artifact.
+        artifact_version (str): The version of the artifact.
+        context (str): The context of the deployment.
+
+    Returns:
+        ArtifactRecord: A valid artifact if found.
+    """
+    urls_for_missing_props = []
+    for i in response:
+        artifact = ArtifactRecord.from_aql(i)
+        logger.info(f"Found artifact at {artifact.url}")
+
+        if context == 'deploy':
+            artifact_props = artifact.load_properties()
+            logger.info(f"[INFO] PROPERTIES FOR {artifact.name}: {artifact_props}")
+            if artifact_props and (artifact_props.get('REPO_NAME') or artifact_props.get('repoName')):
+                logger.info(f'Found artifact URL: {artifact.url}')
+                return artifact
+            else:
+                logger.warning(f"Artifact found at {artifact.url}, but it is missing the required properties 'REPONAME' or 'repoName'.")
+                urls_for_missing_props.append(artifact.url)
+        else:
+            logger.info(f"Deployment context not applicable. Returning artifact URL: {artifact.url}.")
+            return artifact
+
+    if urls_for_missing_props:
+        missing_urls_message = '\n'.join(urls_for_missing_props)
+        error_message = (
+            f"ERROR: No valid artifact '{artifact_id}-{artifact_version}' was found in Artifactory. "
+            f"The artifact is missing the required properties: 'REPO_NAME' or 'repoName'.\n\n"
+            f"The following artifact URLs lack the required properties:\n{missing_urls_message}\n"
+        )
+        logger.error(error_message)
+
+    return None
+
+
 def upload_artifact(build_var_map):
     """
     Upload an artifact to Artifactory.
@@ -287,12 +517,9 @@ def upload_artifact(build_var_map):
         RuntimeError: If there is an error uploading the artifact to Artifactory.
     """
     try:
+        cache.invalidate_aql_cache() # uploaded artifacts must be visible to later searches
         upload_packages = {}
-        if os.getenv('GHA_ORG') == 'CDO-KP-ORG':
-            artifactory_token = os.getenv('ARTIFACTORY_TOKEN')
-        else:
-            artifactory_user = os.getenv('ARTIFACTORY_USERNAME')
-            artifactory_pass = os.getenv('ARTIFACTORY_PASSWORD')
+        upload_client = client.get_client(client.select_profile(os.getenv('GHA_ORG') == 'CDO-KP-ORG'))
         if os.getenv('ARTIFACT_PATH') is not None:
             artifact_name = os.getenv('ARTIFACT_PATH').split('/')[-1]
             artifactory_directory = os.getenv('ARTIFACTORY_DIR')
@@ -335,28 +562,16 @@ def upload_artifact(build_var_map):
                 artifact_name = f"{app_name}-{app_version}.{app_extension}"
 
             if app_extension == 'zip':
-                zip_output_path = os.path.join("app", artifact_name)
                 publish_folder = 'app/publish' 
                 if not os.path.exists(publish_folder):
                     logger.error(f"Artifact path '{publish_folder}' does not exist.")
                     raise FileNotFoundError(f"Missing directory: {publish_folder}")
-                logger.info(f"Zipping contents of '{publish_folder}' to '{zip_output_path}'")
+                logger.info(f"Zipping contents of '{publish_folder}' to '{artifact_name}' (upload root)")
                 try:
-                    subprocess.run(f"cd {publish_folder} && zip -r ../../{zip_output_path} .", shell=True, check=True)
-                except subprocess.CalledProcessError as e:
+                    archive.create_zip(publish_folder, artifact_name)
+                except (OSError, zipfile.BadZipFile) as e:
                     logger.error(f"Failed to zip artifact contents: {e}")
                     raise
-    
-                if not os.path.exists(zip_output_path):
-                    logger.error(f"Zipped artifact not found at expected location: {zip_output_path}")
-                    raise FileNotFoundError(f"Missing zip file: {zip_output_path}")
-    
-                try:
-                    subprocess.run(f"cp {zip_output_path} {artifact_name}", shell=True, check=True)
-                    logger.info(f"Copied from '{zip_output_path}' to '{artifact_name}' (upload root)")
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"Failed to copy artifact zip: {e}")
-                    raise
             elif app_extension == 'nupkg':  
                  publish_folder = 'bin/release'
                  pack_command = f"dotnet pack {workspace}/{app_name}.csproj --configuration Release --output {workspace}/{publish_folder}/"
@@ -441,29 +656,15 @@ def upload_artifact(build_var_map):
             logger.info(f'Artifacts {artifact_name}, {zip_artifact_name} to be uploaded to Artifactory.')
             logger.info(f'Paths: {artifactory_url}/{artifact_path}, {artifactory_url}/{zip_artifact_path}')
         
-            # Upload .tar.gz
+            # Upload .tar.gz and .zip, each into a folder named after the file as before
             tar_source_path = os.path.join(workspace, artifact_name)
             if not os.path.exists(tar_source_path):
                 raise FileNotFoundError(f"File not found for upload: {tar_source_path}")
-            tar_artifactory_path = ArtifactoryPath(f'{artifactory_url}/{artifact_path}', auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-            try:
-                tar_artifactory_path.mkdir()
-            except FileExistsError:
-                logger.info(f"Path exists: {tar_artifactory_path}")
-            logger.info(f"Uploading artifact from: {tar_source_path}")
-            tar_artifactory_path.deploy_file(tar_source_path)
-        
-            # Upload .zip
             zip_source_path = os.path.join(workspace, zip_artifact_name)
             if not os.path.exists(zip_source_path):
                 raise FileNotFoundError(f"File not found for upload: {zip_source_path}")
-            zip_artifactory_path = ArtifactoryPath(f'{artifactory_url}/{zip_artifact_path}', auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-            try:
-                zip_artifactory_path.mkdir()
-            except FileExistsError:
-                logger.info(f"Path exists: {zip_artifactory_path}")
-            logger.info(f"Uploading artifact from: {zip_source_path}")
-            zip_artifactory_path.deploy_file(zip_source_path)
+            logger.info(f"Uploading artifacts from: {tar_source_path}, {zip_source_path}")
+            upload.upload_files(client.get_client(), [(tar_source_path, f'{artifactory_url}/{artifact_path}'), (zip_source_path, f'{artifactory_url}/{zip_artifact_path}')])
         elif build_var_map.get('app_props').get('build_type') == 'ant':
             app_name = build_var_map.get('module_values_project').get('artifact_id')
             app_version = build_var_map.get('module_values_project').get('artifact_version')
@@ -485,24 +686,17 @@ def upload_artifact(build_var_map):
                 artifact_loc = f"{app_name}.{app_extension}" 
                 subprocess.run(f"cp {artifact_loc} {artifact_name}", shell=True)
             upload_packages[artifact_name] = artifactory_directory
+        uploads = []
         for upload_package,upload_dir in upload_packages.items():
-            if os.getenv('GHA_ORG') == 'CDO-KP-ORG':
-                artifactory_path = ArtifactoryPath(f'{artifactory_url}/{upload_dir}', apikey=artifactory_token)
-            else:
-                artifactory_path = ArtifactoryPath(f'{artifactory_url}/{upload_dir}', auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-            try:
-                artifactory_path.mkdir()
-                logger.info("Uploading artifact")
-            except FileExistsError:
-                logger.info(f"Path exists, uploading artifact: {artifactory_path}") # catches duplication error for snapshot path  
             if upload_package.endswith(".nupkg"):
                 source_path = os.path.join(workspace, 'bin/release', upload_package)
                 if not os.path.exists(source_path):
                     raise FileNotFoundError(f"File not found for upload for nupkg: {source_path}")
                 logger.info(f"Artifact uploading from: {source_path}")    
-                artifactory_path.deploy_file(source_path)
+                uploads.append((source_path, f'{artifactory_url}/{upload_dir}'))
             else:
-                artifactory_path.deploy_file(f"{workspace}/{upload_package}")   
+                uploads.append((f"{workspace}/{upload_package}", f'{artifactory_url}/{upload_dir}'))
+        upload.upload_files(upload_client, uploads)
     except (ConnectionError,ArtifactoryException) as e:
         logger.error("Artifactory server is down or unreachable.")
         raise RuntimeError(f"{COLOR_RED}Artifactory server is down or unreachable: {e}")          
@@ -510,21 +704,22 @@ def upload_artifact(build_var_map):
         raise RuntimeError(f"{COLOR_RED}Error uploading artifact to Artifactory: {e}")
 
 
-def download_artifact(artifact_url, context=None):
+def download_artifact(artifact_url, context=None, checksum=None):
     """
     Download an artifact from Artifactory.
 
+    Artifacts already in the local artifact store are copied from it without a download.
+
     Args:
         artifact_url (str): The URL of the artifact.
         context (str, optional): The context of the download. Defaults to None.
+        checksum (str, optional): The SHA-256 checksum from the AQL search. Looked up if not supplied. Defaults to None.
 
     Raises:
         RuntimeError: If there is an error downloading the artifact.
     """
     try:
         unzip_artifact = True if os.getenv('UNZIP_ARTIFACT') == 'true' else False
-        max_retries = 3
-        attempt = 0
 
         if not artifact_url:
             error_message = (
@@ -534,41 +729,45 @@ def download_artifact(artifact_url, context=None):
             logger.error(error_message)
             raise RuntimeError(error_message)
 
-        while attempt < max_retries:
-            try:
-                path = ArtifactoryPath(artifact_url, auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-                break
-            except (RequestException, RuntimeError) as e:
-                logger.error(f"Attempt {attempt + 1}: Failed to connect to Artifactory: {e}")
-                attempt += 1
-                if attempt < max_retries:
-                    time.sleep(5)  
-                else:
-                    raise RuntimeError(f"{COLOR_RED}Exceeded maximum retries to connect to Artifactory.")
-
-        subprocess.run([f"if [ ! -d {workspace}/{download_path} ]; then mkdir -p {workspace}/{download_path}; fi;"], shell=True)
+        artifact_client = client.get_client()
+        artifact_dir = f"{workspace}/{download_path}"
+        os.makedirs(artifact_dir, exist_ok=True)
         download_artifact = artifact_url.split('/')[-1]
-        with path.open() as artifact_path, open(f"{workspace}/{download_path}/{download_artifact}", "wb") as artifact_file:
-            artifact_file.write(artifact_path.read())
-        logger.info(f"Downloaded artifact {download_artifact} into {workspace}/{download_path} directory.")
-        if unzip_artifact:
-            download_artifact_ext = download_artifact.split('.')[-1]
-            if download_artifact_ext == 'zip':
-                if context == 'test':
-                    subprocess.run(f'unzip -q {workspace}/{download_path}/{download_artifact} -d {workspace}/{download_path}/tmp && cp -R {workspace}/{download_path}/tmp/*/* {workspace}/{download_path}', shell=True)
-                else:
-                    subprocess.run(f'unzip -q {workspace}/{download_path}/{download_artifact} -d {workspace}/{download_path}', shell=True)
-            else:
-                subprocess.run([f"tar -xvf {workspace}/{download_path}/{download_artifact} -C {workspace}/{download_path} --strip 1"], shell=True)
-            subprocess.run(f'rm {workspace}/{download_path}/{download_artifact}', shell=True)
-        subprocess.run([f"rm -rf {workspace}/{download_path}/tmp && cd {workspace}/{download_path} && ls -ltr"], shell=True)
+        artifact_file = f"{artifact_dir}/{download_artifact}"
+        if not checksum and not store.store_disabled:
+            checksum = download.get_checksum(artifact_client, artifact_url)
+        store_added = False
+        if store.fetch(checksum, artifact_file):
+            logger.info(f"Copied artifact {download_artifact} from the artifact store into {artifact_dir} directory.")
+            if unzip_artifact:
+                extract.extract_artifact(artifact_file, artifact_dir, context)
+                os.remove(artifact_file)
+        elif unzip_artifact and extract.is_tar(download_artifact):
+            try:
+                file_sha256 = extract.stream_extract_tar(artifact_client, artifact_url, artifact_dir, copy_path=artifact_file)
+            except RequestException as e:
+                logger.warning(f"Streaming extraction of {download_artifact} interrupted, downloading it first: {e}")
+                file_sha256 = download.download_file(artifact_client, artifact_url, artifact_file)
+                extract.extract_artifact(artifact_file, artifact_dir, context)
+            store_added = store.add(file_sha256, artifact_file)
+            os.remove(artifact_file)
+        else:
+            # chunked, resumable and checksum-verified; connection retries are handled by the shared client
+            file_sha256 = download.download_file(artifact_client, artifact_url, artifact_file)
+            logger.info(f"Downloaded artifact {download_artifact} into {artifact_dir} directory.")
+            store_added = store.add(file_sha256, artifact_file)
+            if unzip_artifact:
+                extract.extract_artifact(artifact_file, artifact_dir, context)
+                os.remove(artifact_file)
+        if store_added:
+            outputs.set_output('artifact-store-key', store.get_store_key())
         download_artifact_path = f'{download_path}/{download_artifact}'
-        os.system(f"echo 'download-artifact={download_artifact_path}' >> $GITHUB_OUTPUT")
+        outputs.set_output('download-artifact', download_artifact_path)
         return download_artifact_path
     except (ConnectionError,ArtifactoryException) as e:
         logger.error("Artifactory server is down or unreachable.")
         raise RuntimeError(f"{COLOR_RED}Artifactory server is down or unreachable: {e}")      
-    except RuntimeError as e:
+    except (RuntimeError, OSError, tarfile.TarError, zipfile.BadZipFile) as e:
         raise RuntimeError(f"{COLOR_RED}Error downloading artifact from Artifactory: {e}")
 
 def process_multiple_module_and_upload_artifact(build_var_map,module_name,app_name, app_version, app_extension,artifactory_url, artifactory_user, artifactory_pass, timestamp):
@@ -584,6 +783,7 @@ def process_multiple_module_and_upload_artifact(build_var_map,module_name,app_na
         artifact_name = f'build/libs/{app_name}-{app_version}.{app_extension}'
 
     # Handle multi-level module (if there are multiple modules)
+    uploads = []
     if len(module_names) > 1:
         app_extensions = build_var_map.get('build_group', {}).get('app-extension', '').split(',')
         for module in module_names:
@@ -591,16 +791,7 @@ def process_multiple_module_and_upload_artifact(build_var_map,module_name,app_na
                 artifactory_directory = f'libs-release-local/{artifact_group}/{module}/{app_version}/' 
                 artifact_loc = glob.glob(f"{module}/build/**/*{module}-{app_version}.{ext}", recursive=True)
                 if artifact_loc:
-                    artifact_name = artifact_loc[0]
-                    upload_packages = {artifact_name: artifactory_directory}
-                    for upload_package, upload_dir in upload_packages.items():
-                        artifactory_path = ArtifactoryPath(f'{artifactory_url}/{upload_dir}', auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-                        try:
-                            artifactory_path.mkdir()
-                            logger.info("Uploading artifact")
-                        except FileExistsError:
-                            logger.info(f"Path exists, uploading artifact: {artifactory_path}")
-                        artifactory_path.deploy_file(f"{workspace}/{upload_package}")
+                    uploads.append((f"{workspace}/{artifact_loc[0]}", f'{artifactory_url}/{artifactory_directory}'))
                 else:
                     continue
     else:
@@ -609,16 +800,11 @@ def process_multiple_module_and_upload_artifact(build_var_map,module_name,app_na
             logger.info(f"Artifactory directory: {artifactory_directory}")
             logger.info(f"Artifact location: {artifact_loc}")
             if artifact_loc:
-                artifact_name = artifact_loc[0]
-                artifactory_path = ArtifactoryPath(f'{artifactory_url}/{artifactory_directory}', auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
-                try:
-                    artifactory_path.mkdir()
-                    logger.info("Uploading artifact")
-                except FileExistsError:
-                       logger.info(f"Path exists, uploading artifact: {artifactory_path}")
-                artifactory_path.deploy_file(f"{workspace}/{artifact_name}")
+                uploads.append((f"{workspace}/{artifact_loc[0]}", f'{artifactory_url}/{artifactory_directory}'))
             else:
                 logger.error("Artifact not found")           
+    upload.upload_files(client.get_client(), uploads)
+
 def get_input_map():
     raw_input = os.getenv('INPUT_MAP')
     if not raw_input or raw_input == 'null':
@@ -0,0 +1,113 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from kpghalogger import KpghaLogger
+logger = KpghaLogger()
+
+workspace = os.getenv('GITHUB_WORKSPACE')
+run_id = os.getenv('GITHUB_RUN_ID', 'local')
+run_attempt = os.getenv('GITHUB_RUN_ATTEMPT', '1')
+aql_cache_ttl = int(os.getenv('AQL_CACHE_TTL') or 900)
+aql_cache_disabled = os.getenv('AQL_CACHE_DISABLED') == 'true'
+
+
+def get_cache_dir():
+    """
+    Get the AQL cache directory for the current workflow run.
+
+    Returns:
+        str: The cache directory, or None if no workspace is available.
+    """
+    if not workspace:
+        return None
+    return os.path.join(workspace, '.artifactory-cache', f'{run_id}-{run_attempt}', 'aql')
+
+
+def get_cache_key(data_req, context=None):
+    """
+    Build a content-addressed key for an AQL query.
+
+    Whitespace is normalized so the same repo set, name patterns and context
+    always produce the same key regardless of how the query was formatted.
+
+    Args:
+        data_req (str): The AQL query.
+        context (str, optional): The context of the query. Defaults to None.
+
+    Returns:
+        str: The SHA-256 hex digest of the normalized query.
+    """
+    normalized_query = re.sub(r'\s+', '', data_req)
+    return hashlib.sha256(f'{context}|{normalized_query}'.encode('utf-8')).hexdigest()
+
+
+def get_cached_aql(data_req, context=None):
+    """
+    Fetch a cached AQL response.
+
+    Args:
+        data_req (str): The AQL query.
+        context (str, optional): The context of the query. Defaults to None.
+
+    Returns:
+        list: The cached response, or None if not cached or expired.
+    """
+    cache_dir = get_cache_dir()
+    if aql_cache_disabled or not cache_dir:
+        return None
+    cache_file = os.path.join(cache_dir, f'{get_cache_key(data_req, context)}.json')
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache_entry = json.load(f)
+        if time.time() - cache_entry.get('created', 0) > aql_cache_ttl:
+            logger.info('AQL cache entry expired.')
+            os.remove(cache_file)
+            return None
+        logger.info(f'Using cached AQL response from {cache_file}')
+        return cache_entry.get('response')
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f'Unable to read AQL cache entry {cache_file}: {e}')
+        return None
+
+
+def set_cached_aql(data_req, response, context=None):
+    """
+    Store an AQL response in the cache.
+
+    Args:
+        data_req (str): The AQL query.
+        response (list): The AQL response.
+        context (str, optional): The context of the query. Defaults to None.
+    """
+    cache_dir = get_cache_dir()
+    if aql_cache_disabled or not cache_dir:
+        return
+    tmp_file = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_file = os.path.join(cache_dir, f'{get_cache_key(data_req, context)}.json')
+        # unique per writer, threads of one process share the pid
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache_dir, suffix='.tmp', delete=False) as f:
+            tmp_file = f.name
+            json.dump({'created': time.time(), 'context': context, 'response': response}, f)
+        os.replace(tmp_file, cache_file)
+    except (OSError, TypeError) as e:
+        logger.warning(f'Unable to write AQL cache entry: {e}')
+        if tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def invalidate_aql_cache():
+    """
+    Remove all cached AQL responses for the current workflow run.
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir and os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        logger.info('Invalidated AQL cache.')
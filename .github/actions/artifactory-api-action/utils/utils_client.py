@@ -0,0 +1,129 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+from artifactory import ArtifactoryPath
+from kpghalogger import KpghaLogger
+logger = KpghaLogger()
+
+pool_size = int(os.getenv('ARTIFACTORY_POOL_SIZE') or 16) # concurrent component downloads each use several chunk connections
+max_retries = int(os.getenv('ARTIFACTORY_MAX_RETRIES') or 3)
+backoff_factor = float(os.getenv('ARTIFACTORY_BACKOFF') or 1)
+request_timeout = int(os.getenv('ARTIFACTORY_TIMEOUT') or 300)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'POST']) # POST is only used for AQL searches; uploads are never replayed
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class ArtifactoryClient:
+    """
+    Keep-alive HTTP client shared by all Artifactory calls for one set of credentials.
+
+    A single requests.Session with a sized connection pool and a retry/backoff
+    policy is reused for raw requests and for every ArtifactoryPath created
+    through the client, so connections are set up once per job step.
+    Response times are counted per method and logged by log_stats.
+    """
+
+    def __init__(self, name, username=None, password=None, token=None):
+        self.name = name
+        self.session = requests.Session()
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS, allowed_methods=RETRY_METHODS, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if token:
+            self.session.headers['X-JFrog-Art-Api'] = token
+        elif username:
+            self.session.auth = HTTPBasicAuth(username, password)
+        self.session.hooks['response'].append(self._record_timing)
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    def path(self, url):
+        """
+        Create an ArtifactoryPath that uses the shared session.
+
+        Args:
+            url (str): The Artifactory URL.
+
+        Returns:
+            ArtifactoryPath: An instance of the ArtifactoryPath class.
+        """
+        return ArtifactoryPath(url, session=self.session, timeout=request_timeout)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request using the shared session.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The request URL.
+            **kwargs: Additional arguments passed to requests.
+
+        Returns:
+            requests.Response: The response.
+        """
+        kwargs.setdefault('timeout', request_timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def _record_timing(self, response, *args, **kwargs):
+        """Response hook counting calls and time per HTTP method"""
+        method = response.request.method
+        elapsed = response.elapsed.total_seconds()
+        with self._stats_lock:
+            count, total = self.stats.get(method, (0, 0.0))
+            self.stats[method] = (count + 1, total + elapsed)
+        logger.debug(f"Artifactory {self.name} {method} {response.url} {response.status_code} in {elapsed * 1000:.0f}ms")
+        return response
+
+
+def get_client(profile='basic'):
+    """
+    Get the shared client for an auth profile, creating it on first use.
+
+    Args:
+        profile (str, optional): 'basic' for Artifactory user/password, 'token' for the
+            Artifactory token, or 'image' for the image registry. Defaults to 'basic'.
+
+    Returns:
+        ArtifactoryClient: The shared client.
+    """
+    with _clients_lock:
+        if profile not in _clients:
+            if profile == 'token':
+                _clients[profile] = ArtifactoryClient(profile, token=os.getenv('ARTIFACTORY_TOKEN'))
+            elif profile == 'image':
+                _clients[profile] = ArtifactoryClient(profile, os.getenv('JFROG_USERNAME'), os.getenv('JFROG_PASSWORD'))
+            else:
+                _clients[profile] = ArtifactoryClient(profile, os.getenv('ARTIFACTORY_USERNAME'), os.getenv('ARTIFACTORY_PASSWORD'))
+        return _clients[profile]
+
+
+def select_profile(use_token):
+    """
+    Select token or user/password authentication.
+
+    Args:
+        use_token (bool): Whether the caller requires token authentication.
+
+    Returns:
+        str: 'token' if requested and a token is configured, otherwise 'basic'.
+    """
+    if use_token and os.getenv('ARTIFACTORY_TOKEN'):
+        logger.info('using artifactory token to access artifactory')
+        return 'token'
+    logger.info('using artifactory user/password to access artifactory')
+    return 'basic'
+
+
+def log_stats():
+    """
+    Log the number of calls and time spent per HTTP method for every client used.
+    """
+    for name, artifactory_client in _clients.items():
+        for method, (count, total) in sorted(artifactory_client.stats.items()):
+            logger.info(f"Artifactory {name} client: {count} {method} call(s) in {total:.2f}s (avg {total / count * 1000:.0f}ms)")
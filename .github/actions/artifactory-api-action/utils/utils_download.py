@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.exceptions import RequestException
+from kpghalogger import KpghaLogger
+logger = KpghaLogger()
+
+chunk_size = int(os.getenv('DOWNLOAD_CHUNK_MB') or 16) * 1024 * 1024
+download_workers = int(os.getenv('DOWNLOAD_WORKERS') or 4)
+max_attempts = int(os.getenv('DOWNLOAD_MAX_ATTEMPTS') or 5)
+retry_interval = 5 # seconds between attempts
+BUFFER_SIZE = 1024 * 1024
+
+
+def download_file(artifact_client, artifact_url, file_path):
+    """
+    Download a file from Artifactory straight to disk.
+
+    Files larger than one chunk are fetched as parallel HTTP Range requests when the
+    server supports them. Progress is kept next to the file in a .part file and a
+    .part.json state file, so a dropped connection only re-fetches the missing bytes,
+    including on a later attempt of the same step. The SHA-256 Artifactory reports in
+    its X-Checksum-Sha256 header is verified before the file is moved into place.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        artifact_url (str): The URL of the artifact.
+        file_path (str): The local path to write the artifact to.
+
+    Returns:
+        str: The SHA-256 checksum of the downloaded file.
+
+    Raises:
+        RuntimeError: If the download fails or the checksum does not match.
+    """
+    try:
+        start_time = time.time()
+        response = artifact_client.request('HEAD', artifact_url, allow_redirects=True)
+        response.raise_for_status()
+        file_size = int(response.headers.get('Content-Length') or 0)
+        expected_sha256 = response.headers.get('X-Checksum-Sha256')
+        accept_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        part_path = f'{file_path}.part'
+        state_path = f'{file_path}.part.json'
+
+        if accept_ranges and file_size > chunk_size:
+            download_chunks(artifact_client, artifact_url, part_path, state_path, file_size, expected_sha256)
+        else:
+            download_stream(artifact_client, artifact_url, part_path, accept_ranges)
+
+        file_sha256 = get_sha256(part_path)
+        if expected_sha256 and file_sha256 != expected_sha256:
+            os.remove(part_path)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            raise RuntimeError(f'Checksum mismatch for {artifact_url}: expected {expected_sha256}, got {file_sha256}.')
+        os.replace(part_path, file_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        elapsed = max(time.time() - start_time, 0.001)
+        file_size = os.path.getsize(file_path)
+        logger.info(f'Downloaded {file_size} bytes in {elapsed:.1f}s ({file_size / elapsed / 1024 / 1024:.1f} MB/s), sha256 {file_sha256} {"verified" if expected_sha256 else "not reported by Artifactory"}.')
+        return file_sha256
+    except (RequestException, OSError) as e:
+        raise RuntimeError(f'Error downloading {artifact_url}: {e}') from None
+
+
+def get_checksum(artifact_client, artifact_url):
+    """
+    Get the SHA-256 checksum Artifactory reports for an artifact, without downloading it.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        artifact_url (str): The URL of the artifact.
+
+    Returns:
+        str: The SHA-256 checksum, or None if it is not available.
+    """
+    try:
+        response = artifact_client.request('HEAD', artifact_url, allow_redirects=True)
+        response.raise_for_status()
+        return response.headers.get('X-Checksum-Sha256')
+    except RequestException as e:
+        logger.warning(f'Unable to get checksum of {artifact_url}: {e}')
+        return None
+
+
+def download_chunks(artifact_client, artifact_url, part_path, state_path, file_size, expected_sha256):
+    """
+    Download a file as parallel Range requests into a preallocated .part file.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        artifact_url (str): The URL of the artifact.
+        part_path (str): The partial file to write to.
+        state_path (str): The file recording completed chunks.
+        file_size (int): The size of the artifact in bytes.
+        expected_sha256 (str): The checksum reported by Artifactory, used to detect a changed artifact.
+    """
+    state = {'url': artifact_url, 'size': file_size, 'sha256': expected_sha256, 'chunk_size': chunk_size, 'done': []}
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            saved_state = json.load(f)
+        if os.path.exists(part_path) and all(saved_state.get(k) == state[k] for k in ['url', 'size', 'sha256', 'chunk_size']):
+            state['done'] = saved_state.get('done', [])
+            logger.info(f'Resuming download with {len(state["done"])} chunk(s) already downloaded.')
+    except (FileNotFoundError, ValueError):
+        pass
+    if not state['done']:
+        with open(part_path, 'wb') as f:
+            f.truncate(file_size)
+
+    chunks = [(i, start, min(start + chunk_size, file_size) - 1) for i, start in enumerate(range(0, file_size, chunk_size))]
+    pending_chunks = [chunk for chunk in chunks if chunk[0] not in state['done']]
+    logger.info(f'Downloading {file_size} bytes in {len(pending_chunks)} chunk(s) with {download_workers} worker(s).')
+    state_lock = threading.Lock()
+
+    def fetch_chunk(chunk):
+        index, start, end = chunk
+        download_range(artifact_client, artifact_url, part_path, start, end)
+        with state_lock:
+            state['done'].append(index)
+            with open(state_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+
+    with ThreadPoolExecutor(max_workers=download_workers) as executor:
+        futures = [executor.submit(fetch_chunk, chunk) for chunk in pending_chunks]
+        for future in as_completed(futures):
+            future.result()
+
+
+def download_range(artifact_client, artifact_url, part_path, start, end):
+    """
+    Download one byte range into the .part file, resuming within the range after a dropped connection.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        artifact_url (str): The URL of the artifact.
+        part_path (str): The partial file to write to.
+        start (int): The first byte of the range.
+        end (int): The last byte of the range.
+    """
+    position = start
+    attempt = 0
+    with open(part_path, 'r+b') as f:
+        while position <= end:
+            try:
+                with artifact_client.request('GET', artifact_url, headers={'Range': f'bytes={position}-{end}'}, stream=True) as response:
+                    if response.status_code != 206:
+                        raise RuntimeError(f'Range request returned status {response.status_code}.')
+                    f.seek(position)
+                    for data in response.iter_content(BUFFER_SIZE):
+                        f.write(data)
+                        position += len(data)
+                if position <= end:
+                    raise RequestException(f'Connection closed at byte {position} of range {start}-{end}.')
+            except RequestException as e:
+                attempt += 1
+                if attempt >= max_attempts:
+                    raise
+                logger.warning(f'Attempt {attempt}: download of bytes {position}-{end} interrupted: {e}')
+                time.sleep(retry_interval)
+
+
+def download_stream(artifact_client, artifact_url, part_path, accept_ranges):
+    """
+    Download a file as a single stream, resuming from the end of the .part file when possible.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        artifact_url (str): The URL of the artifact.
+        part_path (str): The partial file to write to.
+        accept_ranges (bool): Whether the server supports Range requests.
+    """
+    attempt = 0
+    while True:
+        position = os.path.getsize(part_path) if accept_ranges and os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={position}-'} if position else {}
+        try:
+            with artifact_client.request('GET', artifact_url, headers=headers, stream=True) as response:
+                if response.status_code == 416: # partial file already complete
+                    return
+                response.raise_for_status()
+                mode = 'ab' if position and response.status_code == 206 else 'wb'
+                with open(part_path, mode) as f:
+                    for data in response.iter_content(BUFFER_SIZE):
+                        f.write(data)
+            return
+        except RequestException as e:
+            attempt += 1
+            if attempt >= max_attempts:
+                raise
+            logger.warning(f'Attempt {attempt}: download interrupted at byte {position}: {e}')
+            time.sleep(retry_interval)
+
+
+def get_sha256(file_path):
+    """
+    Compute the SHA-256 checksum of a file.
+
+    Args:
+        file_path (str): The file path.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for data in iter(lambda: f.read(BUFFER_SIZE), b''):
+            sha256.update(data)
+    return sha256.hexdigest()
@@ -0,0 +1,232 @@
+import os
+import zlib
+import stat
+import shutil
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+from contextlib import nullcontext
+from requests.exceptions import RequestException
+from urllib3.exceptions import HTTPError as Urllib3Error
+from kpghalogger import KpghaLogger
+logger = KpghaLogger()
+
+BUFFER_SIZE = 1024 * 1024
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+
+class HashingReader:
+    """File-like wrapper hashing every byte read from a stream; transport errors surface as RequestException"""
+
+    def __init__(self, stream, copy_file=None):
+        self.stream = stream
+        self.copy_file = copy_file
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        try:
+            data = self.stream.read(size)
+        except Urllib3Error as e: # ProtocolError, ReadTimeoutError, ... from response.raw
+            raise RequestException(f'Download stream interrupted: {e}') from e
+        self.sha256.update(data)
+        if self.copy_file:
+            self.copy_file.write(data)
+        return data
+
+    def drain(self):
+        """Read the rest of the stream so the digest covers the whole file"""
+        while self.read(BUFFER_SIZE):
+            pass
+        return self.sha256.hexdigest()
+
+
+def get_target_path(dest, name, strip_components=0):
+    """
+    Map an archive entry to its extraction path.
+
+    Args:
+        dest (str): The extraction directory.
+        name (str): The entry name in the archive.
+        strip_components (int, optional): The number of leading path components to remove. Defaults to 0.
+
+    Returns:
+        str: The absolute target path, or None if the entry is stripped away entirely.
+
+    Raises:
+        RuntimeError: If the entry would be written outside the extraction directory.
+    """
+    parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.')]
+    if len(parts) <= strip_components:
+        return None
+    dest = os.path.realpath(dest)
+    target_path = os.path.realpath(os.path.join(dest, *parts[strip_components:]))
+    if os.path.commonpath([dest, target_path]) != dest:
+        raise RuntimeError(f'Archive entry {name} points outside of {dest}.')
+    return target_path
+
+
+def extract_zip(file_path, dest, strip_components=0):
+    """
+    Extract a zip archive, streaming each entry straight to its final path.
+
+    Args:
+        file_path (str): The zip file.
+        dest (str): The extraction directory.
+        strip_components (int, optional): The number of leading path components to remove;
+            entries with no path left are skipped. Defaults to 0.
+
+    Returns:
+        int: The number of files extracted.
+    """
+    file_count = 0
+    with zipfile.ZipFile(file_path) as zf:
+        for info in zf.infolist():
+            target_path = get_target_path(dest, info.filename, strip_components)
+            if not target_path:
+                continue
+            if info.is_dir():
+                os.makedirs(target_path, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            with zf.open(info) as source, open(target_path, 'wb') as target:
+                shutil.copyfileobj(source, target, BUFFER_SIZE)
+            mode = (info.external_attr >> 16) & 0o777
+            if mode:
+                os.chmod(target_path, mode | stat.S_IRUSR | stat.S_IWUSR)
+            file_count += 1
+    return file_count
+
+
+def extract_tar(fileobj, dest, strip_components=1):
+    """
+    Extract a tar stream entry by entry, so it can be fed while the download is still in flight.
+
+    Args:
+        fileobj (file): A readable stream of the (optionally compressed) tar file.
+        dest (str): The extraction directory.
+        strip_components (int, optional): The number of leading path components to remove. Defaults to 1.
+
+    Returns:
+        int: The number of files extracted.
+    """
+    file_count = 0
+    extract_args = {'filter': 'tar'} if hasattr(tarfile, 'tar_filter') else {}
+    with tarfile.open(fileobj=fileobj, mode='r|*') as tf:
+        for member in tf:
+            target_path = get_target_path(dest, member.name, strip_components)
+            if not target_path:
+                continue
+            if member.islnk():
+                link_path = get_target_path(dest, member.linkname, strip_components)
+                if not link_path:
+                    continue
+                member.linkname = os.path.relpath(link_path, os.path.realpath(dest))
+            member.name = os.path.relpath(target_path, os.path.realpath(dest))
+            tf.extract(member, dest, **extract_args)
+            if member.isfile():
+                file_count += 1
+    return file_count
+
+
+def is_tar(file_name):
+    """
+    Check whether a file name is a tar archive.
+
+    Args:
+        file_name (str): The file name.
+
+    Returns:
+        bool: True for tar archives.
+    """
+    return file_name.lower().endswith(TAR_EXTENSIONS)
+
+
+def move_tree(source_dir, dest):
+    """
+    Move the contents of a directory into another one, merging existing directories.
+
+    Args:
+        source_dir (str): The directory to empty.
+        dest (str): The target directory.
+    """
+    for name in os.listdir(source_dir):
+        source_path = os.path.join(source_dir, name)
+        target_path = os.path.join(dest, name)
+        if os.path.isdir(source_path) and not os.path.islink(source_path) and os.path.isdir(target_path):
+            move_tree(source_path, target_path)
+        else:
+            if os.path.isdir(target_path) and not os.path.islink(target_path):
+                shutil.rmtree(target_path)
+            os.replace(source_path, target_path)
+
+
+def stream_extract_tar(artifact_client, artifact_url, dest, strip_components=1, copy_path=None):
+    """
+    Extract a tar artifact while it downloads, verifying the SHA-256 Artifactory reports.
+
+    Entries are extracted into a staging directory inside dest and only moved into
+    place once the checksum matches, so a failed download leaves nothing behind.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        artifact_url (str): The URL of the artifact.
+        dest (str): The extraction directory.
+        strip_components (int, optional): The number of leading path components to remove. Defaults to 1.
+        copy_path (str, optional): A path to also write the downloaded archive to. Defaults to None.
+
+    Returns:
+        str: The SHA-256 checksum of the downloaded archive.
+
+    Raises:
+        RequestException: If the download is interrupted or the stream ends in a truncated archive.
+        RuntimeError: If the checksum does not match.
+    """
+    staging_dir = tempfile.mkdtemp(prefix='.extract-', dir=dest)
+    try:
+        try:
+            with artifact_client.request('GET', artifact_url, stream=True) as response:
+                response.raise_for_status()
+                expected_sha256 = response.headers.get('X-Checksum-Sha256')
+                response.raw.decode_content = True
+                with (open(copy_path, 'wb') if copy_path else nullcontext()) as copy_file:
+                    reader = HashingReader(response.raw, copy_file)
+                    file_count = extract_tar(reader, staging_dir, strip_components)
+                    file_sha256 = reader.drain()
+        except (tarfile.TarError, EOFError, zlib.error) as e: # a dropped stream shows up as a truncated archive
+            raise RequestException(f'Incomplete archive stream for {artifact_url}: {e}') from e
+        if expected_sha256 and file_sha256 != expected_sha256:
+            raise RuntimeError(f'Checksum mismatch for {artifact_url}: expected {expected_sha256}, got {file_sha256}.')
+        move_tree(staging_dir, dest)
+    except BaseException:
+        if copy_path and os.path.exists(copy_path):
+            os.remove(copy_path)
+        raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    logger.info(f'Extracted {file_count} file(s) into {dest} while downloading, sha256 {file_sha256} {"verified" if expected_sha256 else "not reported by Artifactory"}.')
+    return file_sha256
+
+
+def extract_artifact(file_path, dest, context=None):
+    """
+    Extract a downloaded artifact with the same layout the unzip/tar commands produced.
+
+    Test zips keep only the contents of their top-level directories, other zips are
+    extracted as-is, and tar archives have their top-level directory stripped.
+
+    Args:
+        file_path (str): The downloaded artifact.
+        dest (str): The extraction directory.
+        context (str, optional): The context of the download. Defaults to None.
+
+    Returns:
+        int: The number of files extracted.
+    """
+    if file_path.lower().endswith('.zip'):
+        file_count = extract_zip(file_path, dest, strip_components=1 if context == 'test' else 0)
+    else:
+        with open(file_path, 'rb') as f:
+            file_count = extract_tar(f, dest)
+    logger.info(f'Extracted {file_count} file(s) from {os.path.basename(file_path)} into {dest}.')
+    return file_count
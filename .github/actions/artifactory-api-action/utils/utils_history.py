@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class EnvRecord:
+    """Data structure to hold one env~result entry of a history property"""
+    env: str
+    result: Optional[str] = None
+    details: List[str] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, value: str) -> 'EnvRecord':
+        """Create EnvRecord instance from an env~result[~details] string"""
+        env, *values = str(value).split('~')
+        return cls(env=env, result=values[0] if values else None, details=values[1:])
+
+    def to_wire(self) -> str:
+        """Serialize back to the env~result[~details] string"""
+        return '~'.join([self.env] + ([self.result] if self.result is not None else []) + self.details)
+
+
+class EnvHistory:
+    """
+    Parsed env~result history property such as SMOKE, CRITICAL_TEST, DEPLOY or DOD_CHECK_SUMMARY.
+
+    All entries are kept in their original order, including repeated environments.
+    The first entry of each environment, the one lookups always matched, is indexed
+    so lookups do not re-split and scan the whole list.
+    """
+
+    def __init__(self, values=None):
+        if isinstance(values, str):
+            values = [values]
+        self.records = [EnvRecord.parse(value) for value in values or []]
+        self.index = {}
+        self.reindex()
+
+    def reindex(self):
+        """
+        Index the first entry of each environment.
+        """
+        self.index = {}
+        for record in self.records:
+            self.index.setdefault(record.env, record)
+
+    def get(self, env):
+        """
+        Get the first entry of an environment.
+
+        Args:
+            env (str): The environment.
+
+        Returns:
+            EnvRecord: The entry, or None if the environment has none.
+        """
+        return self.index.get(env)
+
+    def update(self, value, first=False):
+        """
+        Replace the results of an environment with a new entry. Entries of other environments are kept as they are.
+
+        Args:
+            value (str): The new env~result[~details] string.
+            first (bool, optional): Insert the entry at the front instead of the end. Defaults to False.
+
+        Returns:
+            EnvRecord: The new entry.
+        """
+        record = EnvRecord.parse(value)
+        self.records = [x for x in self.records if x.env != record.env or x.result is None]
+        self.records.insert(0 if first else len(self.records), record)
+        self.reindex()
+        return record
+
+    def to_wire(self):
+        """
+        Serialize to the list of env~result strings stored in Artifactory.
+
+        Returns:
+            list: The entries in order.
+        """
+        return [record.to_wire() for record in self.records]
+
+    def __len__(self):
+        return len(self.records)
@@ -1,16 +1,14 @@
 import os
 import yaml
-import requests
 from datetime import datetime
 import pytz
-from requests.auth import HTTPBasicAuth
 from requests.exceptions import ConnectionError
+import utils.utils_client as client
+import utils.utils_outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
 
-artifactory_user = os.getenv('JFROG_USERNAME')
-artifactory_pass = os.getenv('JFROG_PASSWORD')
 aks_constants = os.getenv('AKS_CONSTANTS')
 COLOR_RED = "\u001b[31m"
 
@@ -48,10 +46,9 @@ def get_image_url(deploy_var_map, artifact_props):
         logger.info(f"Artifact name is: {artifact_name}")
         app_name = deploy_var_map.get('app_props').get('app_name')
         image_dir = deploy_var_map.get('app_props').get('image_dir')
-        request_auth = HTTPBasicAuth(artifactory_user, artifactory_pass)
         image_repo = deploy_var_map.get('image').get('image_registry')
         request_url = f'https://{artifactory_image_base_repo}/artifactory/api/storage/{image_repo}/{image_dir}/{app_name}/{artifact_name.lower()}'
-        response = requests.request("GET", request_url, auth=request_auth)
+        response = client.get_client('image').request("GET", request_url)
         image_props = yaml.safe_load(response.text)
         logger.debug(f"response text is: {image_props}")
         if image_props.get('errors'):
@@ -65,7 +62,7 @@ def get_image_url(deploy_var_map, artifact_props):
         artifact_image_path = image_props.get('path')    
         full_artifact_path = f'{artifact_image_repo}{artifact_image_path}'
         logger.info(f'Artifact path is: {full_artifact_path}')
-        os.system(f"echo 'image-path={full_artifact_path}' >> $GITHUB_OUTPUT")    
+        outputs.set_output('image-path', full_artifact_path)    
     except RuntimeError as e:
         raise RuntimeError(f'{COLOR_RED}Error getting image URL: {e}.')
         
@@ -3,21 +3,22 @@ import json
 import re
 import yaml
 import copy
-from artifactory import ArtifactoryPath, ArtifactoryException
-from requests.auth import HTTPBasicAuth
+from concurrent.futures import ThreadPoolExecutor
+from artifactory import ArtifactoryException
 from requests.exceptions import ConnectionError
+import utils.utils_client as client
+import utils.utils_history as history
+import utils.utils_outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
 
 workspace = os.getenv('GITHUB_WORKSPACE')
-artifactory_user = os.getenv('ARTIFACTORY_USERNAME')
-artifactory_pass = os.getenv('ARTIFACTORY_PASSWORD')
-artifactory_token = os.getenv('ARTIFACTORY_TOKEN')
 artifact_version_env = os.getenv('ARTIFACT_VERSION_ENV')
 sonar_props = os.getenv('SONAR_PROPS')
 log_level = os.getenv('LOG_LEVEL') if os.getenv('LOG_LEVEL') else '20'
 download_path = os.getenv('DOWNLOAD_PATH')
+props_workers = int(os.getenv('PROPS_WORKERS') or 4)
 COLOR_RED = "\u001b[31m"
 
 
@@ -76,20 +77,21 @@ def tag_build_props(build_props, artifact_url):
     Returns:
         None
     """
-    prev_props = get_all_props(artifact_url)
+    artifactory_path = get_artifactory_path(artifact_url)
+    prev_props = artifactory_path.properties
     build_props.update(prev_props)
     logger.info(f"Properties to be added to artifact: {build_props}")
-    artifactory_path = get_artifactory_path(artifact_url)
-    artifactory_path.properties = build_props
-    os.system(f"echo 'artifact-properties={json.dumps(build_props)}' >> $GITHUB_OUTPUT")
+    write_props_diff(artifactory_path, prev_props, build_props)
+    outputs.set_output('artifact-properties', json.dumps(build_props))
 
 
-def set_artifact_property(artifact_url):
+def set_artifact_property(artifact_url, secondary_urls=None):
     """
     Sets individual artifact properties.
 
     Args:
         artifact_url (str): The URL of the artifact.
+        secondary_urls (list, optional): URLs of secondary artifacts to tag with the same properties. Defaults to None.
 
     Returns:
         None
@@ -98,48 +100,157 @@ def set_artifact_property(artifact_url):
         artifact_props = os.getenv('SET_ARTIFACT_PROPS')
         new_props = yaml.safe_load(artifact_props)
         logger.info(f"Props to be added: {new_props}")
-        artifactory_path = get_artifactory_path(artifact_url)
-        existing_prop_map = artifactory_path.properties
-        if not existing_prop_map:
-            raise RuntimeError(f'{COLOR_RED}Properties not found at path {artifact_url}.')
-        logger.info(f"Existing properties are: {existing_prop_map}")
-        keys = list(new_props.keys())
-        for key in keys:
-            logger.info(f"key : {key}")
-            value = new_props[key]
-             # Skip updating Artifactory if key is P1 or TARGET and value is SKIPPED
-            if re.match('P1|TARGET', key) and value == "SKIPPED":
-                logger.info(f"Skipping update for {key}:SKIPPED")
-                continue
-            elif re.match('SRE_SMOKE|SMOKE|REGRESSION|DEPLOY|P1|TARGET|CRITICAL_TEST|CONTINUOUS_DEPLOY', key):
-                current_props_list = get_updated_props(value, existing_prop_map.get(key))
-            elif key == "DOD_CHECK_SUMMARY":
-                current_props_list = get_dod_check_updated_value(key,value,existing_prop_map)
-            else:
-                current_props_list = value
-            existing_prop_map[key] = copy.copy(current_props_list)
-        artifactory_path.properties = existing_prop_map
-        logger.info(f"Tagged artifact at {artifact_url} with props {existing_prop_map}.")
-        os.system(f"echo 'artifact-properties={json.dumps(existing_prop_map)}' >> $GITHUB_OUTPUT")
+        prop_updates = {url: (new_props, None) for url in [artifact_url] + (secondary_urls or [])}
+        updated_props = update_props_bulk(prop_updates)
+        for url, prop_map in updated_props.items():
+            logger.info(f"Tagged artifact at {url} with props {prop_map}.")
+        outputs.set_output('artifact-properties', json.dumps(updated_props[artifact_url]))
     except RuntimeError as e:
         raise RuntimeError(f"{COLOR_RED}Error setting artifact properties: {e}")
 
 
-def get_all_props(artifact_url):
+def update_props_bulk(prop_updates):
+    """
+    Merges and writes properties for several artifacts concurrently. The properties of every
+    artifact are read and checked before any of them is written, so a missing artifact fails
+    the update without leaving the others tagged.
+
+    Args:
+        prop_updates (dict): Map of artifact URL to (new_props, existing_props); existing_props
+            may be None to read them from Artifactory.
+
+    Returns:
+        dict: Map of artifact URL to its updated properties.
+
+    Raises:
+        RuntimeError: If any artifact has no properties.
+    """
+    workers = max(1, min(len(prop_updates), props_workers))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {url: executor.submit(read_props, url, existing_props) for url, (_, existing_props) in prop_updates.items()}
+    existing = {url: future.result() for url, future in futures.items()}
+    missing = [url for url, (_, existing_prop_map) in existing.items() if not existing_prop_map]
+    if missing:
+        raise RuntimeError(f'{COLOR_RED}Properties not found at path {", ".join(missing)}, no properties were updated.')
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {url: executor.submit(update_props, *existing[url], new_props) for url, (new_props, _) in prop_updates.items()}
+    return {url: future.result() for url, future in futures.items()}
+
+
+def read_props(artifact_url, existing_prop_map=None):
+    """
+    Gets an artifact's path and current properties.
+
+    Args:
+        artifact_url (str): The URL of the artifact.
+        existing_prop_map (dict, optional): The current properties. Read from Artifactory if not supplied. Defaults to None.
+
+    Returns:
+        tuple: The ArtifactoryPath and its properties.
+    """
+    artifactory_path = get_artifactory_path(artifact_url)
+    if existing_prop_map is None:
+        existing_prop_map = artifactory_path.properties
+    return artifactory_path, existing_prop_map
+
+
+def update_props(artifactory_path, existing_prop_map, new_props):
+    """
+    Merges new properties into an artifact's properties and writes only the changed keys.
+
+    Args:
+        artifactory_path (ArtifactoryPath): The artifact path.
+        existing_prop_map (dict): The current properties.
+        new_props (dict): The properties to add.
+
+    Returns:
+        dict: The updated properties.
+    """
+    logger.info(f"Existing properties are: {existing_prop_map}")
+    updated_prop_map = merge_props(existing_prop_map, new_props)
+    write_props_diff(artifactory_path, existing_prop_map, updated_prop_map)
+    return updated_prop_map
+
+
+def merge_props(existing_prop_map, new_props):
+    """
+    Merges new properties into existing properties, updating env~result history keys in place.
+
+    Args:
+        existing_prop_map (dict): The current properties; not modified.
+        new_props (dict): The properties to add.
+
+    Returns:
+        dict: The merged properties.
+    """
+    prop_map = copy.deepcopy(existing_prop_map)
+    for key, value in new_props.items():
+        logger.info(f"key : {key}")
+         # Skip updating Artifactory if key is P1 or TARGET and value is SKIPPED
+        if re.match('P1|TARGET', key) and value == "SKIPPED":
+            logger.info(f"Skipping update for {key}:SKIPPED")
+            continue
+        elif re.match('SRE_SMOKE|SMOKE|REGRESSION|DEPLOY|P1|TARGET|CRITICAL_TEST|CONTINUOUS_DEPLOY', key):
+            current_props_list = get_updated_props(value, prop_map.get(key))
+        elif key == "DOD_CHECK_SUMMARY":
+            current_props_list = get_dod_check_updated_value(key,value,prop_map)
+        else:
+            current_props_list = value
+        prop_map[key] = copy.copy(current_props_list)
+    return prop_map
+
+
+def get_props_diff(existing_prop_map, prop_map):
+    """
+    Gets the properties that differ from the existing properties.
+
+    Args:
+        existing_prop_map (dict): The current properties.
+        prop_map (dict): The desired properties.
+
+    Returns:
+        dict: The changed or added keys with their values as lists of strings.
+    """
+    def as_list(value):
+        return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+    return {key: as_list(value) for key, value in prop_map.items() if key not in existing_prop_map or as_list(value) != as_list(existing_prop_map[key])}
+
+
+def write_props_diff(artifactory_path, existing_prop_map, prop_map):
+    """
+    Writes only the changed properties in one request, leaving other keys untouched.
+
+    Args:
+        artifactory_path (ArtifactoryPath): The artifact path.
+        existing_prop_map (dict): The current properties.
+        prop_map (dict): The desired properties.
+    """
+    props_diff = get_props_diff(existing_prop_map, prop_map)
+    if not props_diff:
+        logger.info(f"Properties of {artifactory_path} are already up to date.")
+        return
+    logger.info(f"Updating {len(props_diff)} changed properties of {artifactory_path}: {list(props_diff)}")
+    artifactory_path.set_properties(props_diff, recursive=False)
+
+
+def get_all_props(artifact_url, artifact_properties=None):
     """
     Fetches all artifact properties.
 
     Args:
         artifact_url (str): The URL of the artifact.
+        artifact_properties (dict, optional): Properties already returned by an AQL search.
+            Artifactory is only queried when not supplied. Defaults to None.
 
     Returns:
         dict: A dictionary containing the artifact properties.
     """
     try:
-        artifactory_path = get_artifactory_path(artifact_url)
-        artifact_properties = artifactory_path.properties
+        if artifact_properties is None:
+            artifactory_path = get_artifactory_path(artifact_url)
+            artifact_properties = artifactory_path.properties
         logger.info(f"Artifact properties: {artifact_properties}")
-        os.system(f"echo 'artifact-properties={json.dumps(artifact_properties)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('artifact-properties', json.dumps(artifact_properties))
         return artifact_properties
     except RuntimeError as e:
         logger.error(f"Error fetching artifact properties: {e}")
@@ -148,7 +259,7 @@ def get_all_props(artifact_url):
 
 def get_dod_check_updated_value(key,value,existing_prop_map):
     """
-    Updates the value of the DOD_CHECK_SUMMARY property.
+    Updates the value of the DOD_CHECK_SUMMARY property, moving the environment's result to the front.
 
     Args:
         key (str): The key of the property.
@@ -158,23 +269,18 @@ def get_dod_check_updated_value(key,value,existing_prop_map):
     Returns:
         list or str: The updated value of the property.
     """
-    if existing_prop_map.get(key):
-        props_array = existing_prop_map[key]
-        logger.info(f'Existing DoD summary results: {props_array}')
-        new_env = value.split('~')[0]
-        for prop in props_array:
-            prop_env = prop.split('~')[0]
-            if prop_env == new_env: props_array.remove(prop)
-            props_array.insert(0,value)
-            logger.info(f'Adding value {value}')
-            break
-    else: props_array = value
-    return props_array
+    if not existing_prop_map.get(key):
+        return value
+    logger.info(f'Existing DoD summary results: {existing_prop_map[key]}')
+    env_history = history.EnvHistory(existing_prop_map[key])
+    env_history.update(value, first=True)
+    logger.info(f'Adding value {value}')
+    return env_history.to_wire()
 
 
 def get_updated_props(new_prop_value, new_prop_map):
     """
-    Updates the value of a property.
+    Updates the value of a property, replacing the environment's previous result.
 
     Args:
         new_prop_value (str): The new value to be added.
@@ -183,18 +289,14 @@ def get_updated_props(new_prop_value, new_prop_map):
     Returns:
         list or str: The updated value of the property.
     """
-    if new_prop_map:
-        prop_value = []
-        for old_prop in new_prop_map:
-            if len(old_prop.split('~')) > 1 and old_prop.split('~')[0] == new_prop_value.split('~')[0]:
-                logger.info(f'Property exists , so updating the value {old_prop} with the current execution {new_prop_value}')
-            else:
-                prop_value.append(old_prop)
-        prop_value.append(new_prop_value)
-        prop_list = prop_value
-    else:
-        prop_list = new_prop_value
-    return prop_list
+    if not new_prop_map:
+        return new_prop_value
+    env_history = history.EnvHistory(new_prop_map)
+    old_prop = env_history.get(history.EnvRecord.parse(new_prop_value).env)
+    if old_prop:
+        logger.info(f'Property exists , so updating the value {old_prop.to_wire()} with the current execution {new_prop_value}')
+    env_history.update(new_prop_value)
+    return env_history.to_wire()
 
 
 def set_props_output():
@@ -207,7 +309,7 @@ def set_props_output():
     legacy_props = os.getenv('LEGACY_PROPS')
     artifact_props = os.getenv('ARTIFACT_PROPS')
     artifact_properties = legacy_props or artifact_props
-    os.system(f"echo 'artifact-properties={artifact_properties}' >> $GITHUB_OUTPUT")
+    outputs.set_output('artifact-properties', artifact_properties)
 
 
 def get_artifactory_path(artifact_url):
@@ -221,12 +323,8 @@ def get_artifactory_path(artifact_url):
         ArtifactoryPath: An instance of the ArtifactoryPath class.
     """
     try:
-        if re.match('CDO-KP-ORG|SDS', os.getenv('PROJECT_GIT_ORG')):
-            logger.info('using artifactory token to access artifactory')
-            artifactory_path = ArtifactoryPath(artifact_url, apikey=artifactory_token)
-        else:
-            logger.info('using artifactory user/password to access artifactory')
-            artifactory_path = ArtifactoryPath(artifact_url, auth=(artifactory_user, artifactory_pass), auth_type=HTTPBasicAuth)
+        profile = client.select_profile(bool(re.match('CDO-KP-ORG|SDS', os.getenv('PROJECT_GIT_ORG'))))
+        artifactory_path = client.get_client(profile).path(artifact_url)
         return artifactory_path
     except (ConnectionError,ArtifactoryException) as e:
         logger.error("Artifactory server is down or unreachable.")
@@ -0,0 +1,140 @@
+import os
+import re
+import fcntl
+import shutil
+import hashlib
+from contextlib import contextmanager
+from kpghalogger import KpghaLogger
+logger = KpghaLogger()
+
+store_path = os.getenv('ARTIFACT_STORE_PATH') or os.path.join(os.getenv('RUNNER_TOOL_CACHE') or os.path.expanduser('~/.cache'), 'artifactory-store')
+store_max_bytes = int(os.getenv('ARTIFACT_STORE_MAX_MB') or 4096) * 1024 * 1024
+store_disabled = os.getenv('ARTIFACT_STORE_DISABLED') == 'true'
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+@contextmanager
+def store_lock():
+    """Hold an exclusive lock on the store, shared with other steps on the same runner"""
+    os.makedirs(store_path, exist_ok=True)
+    with open(os.path.join(store_path, '.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_blob_path(checksum):
+    """
+    Get the store location of an artifact.
+
+    Args:
+        checksum (str): The SHA-256 checksum of the artifact.
+
+    Returns:
+        str: The blob path, or None if the store is disabled or the checksum is invalid.
+    """
+    checksum = (checksum or '').lower()
+    if store_disabled or not SHA256_PATTERN.match(checksum):
+        return None
+    return os.path.join(store_path, 'sha256', checksum[:2], checksum)
+
+
+def fetch(checksum, file_path):
+    """
+    Copy an artifact from the store, verifying its checksum and marking it as recently used.
+
+    Args:
+        checksum (str): The SHA-256 checksum of the artifact.
+        file_path (str): The path to place the artifact at.
+
+    Returns:
+        bool: True if the artifact was found in the store.
+    """
+    blob_path = get_blob_path(checksum)
+    if not blob_path:
+        return False
+    try:
+        with store_lock():
+            if not os.path.exists(blob_path):
+                return False
+            os.utime(blob_path)
+            tmp_path = f'{file_path}.{os.getpid()}.tmp'
+            sha256 = hashlib.sha256()
+            with open(blob_path, 'rb') as source, open(tmp_path, 'wb') as target:
+                while chunk := source.read(1024 * 1024):
+                    sha256.update(chunk)
+                    target.write(chunk)
+            if sha256.hexdigest() != checksum.lower():
+                os.remove(tmp_path)
+                os.remove(blob_path)
+                logger.warning(f'Removed corrupt artifact store entry {blob_path}.')
+                return False
+            os.replace(tmp_path, file_path)
+        logger.info(f'Artifact store hit for sha256 {checksum}, skipped download.')
+        return True
+    except OSError as e:
+        logger.warning(f'Unable to read artifact store entry {blob_path}: {e}')
+        return False
+
+
+def add(checksum, file_path):
+    """
+    Add a downloaded artifact to the store as a read-only blob and evict least recently used entries over the size limit.
+
+    Args:
+        checksum (str): The SHA-256 checksum of the artifact.
+        file_path (str): The downloaded artifact.
+
+    Returns:
+        bool: True if the artifact was new to the store.
+    """
+    blob_path = get_blob_path(checksum)
+    if not blob_path:
+        return False
+    added = False
+    try:
+        with store_lock():
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f'{blob_path}.{os.getpid()}.tmp'
+                shutil.copyfile(file_path, tmp_path)
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, blob_path)
+                added = True
+                logger.info(f'Added sha256 {checksum} to the artifact store.')
+            evict()
+    except OSError as e:
+        logger.warning(f'Unable to add {file_path} to the artifact store: {e}')
+    return added
+
+
+def get_store_key():
+    """
+    Get a key for the store contents, to save it to the actions cache only when it changed.
+
+    Returns:
+        str: The SHA-256 of the sorted checksums of the stored artifacts.
+    """
+    with store_lock():
+        checksums = sorted(name for _, _, files in os.walk(os.path.join(store_path, 'sha256')) for name in files if SHA256_PATTERN.match(name))
+    return hashlib.sha256('\n'.join(checksums).encode()).hexdigest()
+
+
+def evict():
+    """
+    Remove least recently used artifacts until the store fits in ARTIFACT_STORE_MAX_MB. Callers hold the store lock.
+    """
+    blobs = []
+    for root, _, files in os.walk(os.path.join(store_path, 'sha256')):
+        for name in files:
+            blob_stat = os.stat(os.path.join(root, name))
+            blobs.append((blob_stat.st_mtime, blob_stat.st_size, os.path.join(root, name)))
+    total_size = sum(size for _, size, _ in blobs)
+    for _, size, blob_path in sorted(blobs):
+        if total_size <= store_max_bytes:
+            break
+        os.remove(blob_path)
+        total_size -= size
+        logger.info(f'Evicted {os.path.basename(blob_path)} from the artifact store.')
@@ -0,0 +1,170 @@
+import os
+import time
+import hashlib
+import random
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.exceptions import RequestException
+import utils.utils_outputs as outputs
+from kpghalogger import KpghaLogger
+logger = KpghaLogger()
+
+upload_workers = int(os.getenv('UPLOAD_WORKERS') or 4)
+max_attempts = int(os.getenv('UPLOAD_MAX_ATTEMPTS') or 3)
+backoff_factor = float(os.getenv('UPLOAD_BACKOFF') or 2)
+BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class UploadResult:
+    """Data structure to hold the outcome of one file upload"""
+    source_path: str
+    target_url: str
+    size: int
+    seconds: float
+    deduplicated: bool = False
+
+    @property
+    def rate(self) -> float:
+        """Upload rate in bytes per second"""
+        return self.size / max(self.seconds, 0.001)
+
+
+def upload_files(artifact_client, uploads):
+    """
+    Upload several files to Artifactory with a worker pool.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        uploads (list): (source_path, target_dir_url) tuples; each file is deployed under its own name in the directory.
+
+    Returns:
+        list: An UploadResult for each file, in the order of uploads.
+
+    Raises:
+        RuntimeError: If a file fails to upload; uploads that have not started are cancelled.
+    """
+    if not uploads:
+        return []
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=upload_workers)
+    try:
+        futures = {executor.submit(upload_file, artifact_client, source_path, target_dir_url): i for i, (source_path, target_dir_url) in enumerate(uploads)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    results = [results[i] for i in range(len(uploads))]
+    log_summary(results)
+    return results
+
+
+def upload_file(artifact_client, source_path, target_dir_url):
+    """
+    Upload one file, trying a checksum deploy first and retrying with jittered backoff.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        source_path (str): The local file.
+        target_dir_url (str): The Artifactory directory URL.
+
+    Returns:
+        UploadResult: The outcome of the upload.
+
+    Raises:
+        RuntimeError: If the file does not exist or all attempts fail.
+    """
+    if not os.path.exists(source_path):
+        raise RuntimeError(f"File not found for upload: {source_path}")
+    target_url = f"{target_dir_url.rstrip('/')}/{os.path.basename(source_path)}"
+    size = os.path.getsize(source_path)
+    checksum_headers = get_checksum_headers(source_path)
+    for attempt in range(1, max_attempts + 1):
+        start_time = time.time()
+        try:
+            deduplicated = deploy_by_checksum(artifact_client, target_url, checksum_headers)
+            if not deduplicated:
+                deploy_file(artifact_client, target_url, source_path, checksum_headers)
+            logger.info(f"Uploaded {source_path} to {target_url}{' by checksum' if deduplicated else ''}.")
+            return UploadResult(source_path, target_url, size, time.time() - start_time, deduplicated)
+        except (RequestException, OSError) as e:
+            if attempt == max_attempts:
+                raise RuntimeError(f"Error uploading {source_path} to {target_url} after {attempt} attempts: {e}") from None
+            delay = backoff_factor * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            logger.warning(f"Attempt {attempt}: upload of {source_path} failed, retrying in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+
+def get_checksum_headers(source_path):
+    """
+    Compute the MD5, SHA-1 and SHA-256 of a file in one streaming pass.
+
+    Args:
+        source_path (str): The local file.
+
+    Returns:
+        dict: The Artifactory checksum headers for the file.
+    """
+    md5, sha1, sha256 = hashlib.md5(), hashlib.sha1(), hashlib.sha256()
+    with open(source_path, 'rb') as f:
+        for data in iter(lambda: f.read(BUFFER_SIZE), b''):
+            md5.update(data)
+            sha1.update(data)
+            sha256.update(data)
+    return {'X-Checksum-Md5': md5.hexdigest(), 'X-Checksum-Sha1': sha1.hexdigest(), 'X-Checksum-Sha256': sha256.hexdigest()}
+
+
+def deploy_by_checksum(artifact_client, target_url, checksum_headers):
+    """
+    Deploy a file by checksum only, without sending its content.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        target_url (str): The Artifactory file URL.
+        checksum_headers (dict): The checksum headers of the file.
+
+    Returns:
+        bool: True if Artifactory already held the content, False if it returned 404.
+
+    Raises:
+        RequestException: If the request fails for any other reason.
+    """
+    response = artifact_client.request('PUT', target_url, headers={**checksum_headers, 'X-Checksum-Deploy': 'true'})
+    if response.status_code == 404:
+        return False
+    response.raise_for_status()
+    return True
+
+
+def deploy_file(artifact_client, target_url, source_path, checksum_headers):
+    """
+    Stream a file to Artifactory, which verifies it against the checksum headers.
+
+    Args:
+        artifact_client (ArtifactoryClient): The shared Artifactory client.
+        target_url (str): The Artifactory file URL.
+        source_path (str): The local file.
+        checksum_headers (dict): The checksum headers of the file.
+
+    Raises:
+        RequestException: If the upload fails.
+    """
+    with open(source_path, 'rb') as f:
+        response = artifact_client.request('PUT', target_url, data=f, headers=checksum_headers)
+    response.raise_for_status()
+
+
+def log_summary(results):
+    """
+    Log the upload rate of each file and add it to the step summary.
+
+    Args:
+        results (list): UploadResult for each uploaded file.
+    """
+    rows = [f"| {os.path.basename(r.source_path)} | {r.size} | {r.seconds:.1f} | {r.rate / 1024 / 1024:.1f} | {'yes' if r.deduplicated else 'no'} |" for r in results]
+    table = ["| File | Bytes | Seconds | MB/s | Checksum deploy |", "| --- | --: | --: | --: | --- |"] + rows
+    for line in table:
+        logger.info(line)
+    outputs.add_summary("#### Artifactory uploads")
+    for line in table:
+        outputs.add_summary(line)
@@ -2,6 +2,7 @@ import subprocess
 import sys
 import os
 import yaml
+import outputs
 
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
@@ -24,13 +25,13 @@ def set_vars(config_map):
     app_name=config_map.get('app_props').get('app_name')
     runtime_version = config_map.get('sdk_version')
     app_version = config_map.get('app_props').get('product_version')
-    os.system(f"echo 'app-name={app_name}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'app-version={app_version}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'runtime-version={runtime_version}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'args-build={config_map.get('args_build')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'configuration={config_map.get('configuration')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'args-test={config_map.get('args_test')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'test-flag-enabled={config_map.get('test_flag_enabled')}' >> $GITHUB_OUTPUT")
+    outputs.set_output('app-name', app_name)
+    outputs.set_output('app-version', app_version)
+    outputs.set_output('runtime-version', runtime_version)
+    outputs.set_output('args-build', config_map.get('args_build'))
+    outputs.set_output('configuration', config_map.get('configuration'))
+    outputs.set_output('args-test', config_map.get('args_test'))
+    outputs.set_output('test-flag-enabled', config_map.get('test_flag_enabled'))
 
 def test_report():
     '''
@@ -40,7 +41,7 @@ def test_report():
         report_path = f'{workspace}/*/TestResults/*.xml'
         try:
             logger.info(f"report path {report_path}")
-            os.system(f"echo 'report-path={report_path}' >> $GITHUB_OUTPUT")
+            outputs.set_output('report-path', report_path)
         except (subprocess.TimeoutExpired, RuntimeError) as e:
             raise RuntimeError(f'Error producing any report: {e}') from e
     except RuntimeError as e:
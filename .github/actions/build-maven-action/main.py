@@ -3,6 +3,7 @@ import sys
 import os
 import re
 import yaml
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -35,14 +36,14 @@ def set_vars(config_map):
         set_runtime_version(runtime_version)
     else:
         logger.info('Using default runtimes.')
-    os.system(f"echo 'runtime-version={runtime_version}' >> $GITHUB_OUTPUT")
+    outputs.set_output('runtime-version', runtime_version)
     if node_version:
-        os.system(f"echo 'node-version={node_version}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'args-build={config_map.get('args_build')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'args-test={config_map.get('args_test')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'test-flag-enabled={config_map.get('test_flag_enabled')}' >> $GITHUB_OUTPUT")
+        outputs.set_output('node-version', node_version)
+    outputs.set_output('args-build', config_map.get('args_build'))
+    outputs.set_output('args-test', config_map.get('args_test'))
+    outputs.set_output('test-flag-enabled', config_map.get('test_flag_enabled'))
     if os.getenv('GHA_ORG') == 'ENTERPRISE':
-       os.system(f"echo 'delete-yarn-lock-flag={delete_yarn_lock_flag}' >> $GITHUB_OUTPUT")
+       outputs.set_output('delete-yarn-lock-flag', delete_yarn_lock_flag)
 
 
 def generate_test_reports(config_map):
@@ -66,7 +67,7 @@ def generate_test_reports(config_map):
             if report_present:
                 report_path = '**/target/site/jacoco/**'
                 logger.info(f"Jacoco report path {report_path}")
-                os.system(f"echo 'jacoco-report-path={report_path}' >> $GITHUB_OUTPUT")
+                outputs.set_output('jacoco-report-path', report_path)
             else:
                 logger.warning(logger.format_msg('GHA_BUILD_MAVEN_BIZ_3_2001', 'No Jacoco reports were produced', {'detailMessage': f'Jacoco execution did not produce any reports', 'metrics': {'status': 'failure'}}))
         if cobertura:
@@ -74,7 +75,7 @@ def generate_test_reports(config_map):
         if test_report_xml:
             test_report_path = f"{workspace}/{test_report_xml}"
             logger.info(f"Test report path {test_report_path}")
-            os.system(f"echo 'test-report-path={test_report_path}' >> $GITHUB_OUTPUT")
+            outputs.set_output('test-report-path', test_report_path)
         
         try:
             html_report_dir = build_group.get('html-reports').get('pipeline-coverage-report').get('report-dir')
@@ -86,7 +87,7 @@ def generate_test_reports(config_map):
                 html_report_path = subprocess.check_output([f"find {workspace}/{module_name} -type d -name {html_report_dir}"], shell=True, text=True).strip()
                 if html_report_path:
                     logger.info(f"HTML report path {html_report_path}")
-                    os.system(f"echo 'html-report-path={html_report_path}' >> $GITHUB_OUTPUT")
+                    outputs.set_output('html-report-path', html_report_path)
             except RuntimeError: logger.warning(logger.format_msg('GHA_BUILD_MAVEN_BIZ_3_2002', 'No HTML reports were produced', {'detailMessage': f'Test execution did not produce any HTML reports', 'metrics': {'status': 'failure'}}))
     except RuntimeError as e:
         raise RuntimeError(f'Error running build tests: {e}.')
@@ -112,8 +113,7 @@ def set_runtime_version(runtime_version):
     )
     subprocess.run(command, shell=True)
 
-    env_command = f'echo "JAVA_HOME={jdk_path}" >> $GITHUB_ENV'
-    subprocess.run([env_command], shell=True, text=True)
+    outputs.set_env('JAVA_HOME', jdk_path)
 
 
 def remove_artifacts():
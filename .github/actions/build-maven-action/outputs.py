@@ -0,0 +1,61 @@
+"""buffered GitHub Actions outputs, environment variables and step summary, written once at exit"""
+import os
+import uuid
+import atexit
+import threading
+
+_outputs = {}
+_env = {}
+_summary = []
+_lock = threading.Lock()
+
+
+def set_output(key, value):
+    """buffer a step output - the last value set for a key wins"""
+    with _lock:
+        _outputs.pop(key, None)
+        _outputs[key] = str(value)
+
+
+def set_env(key, value):
+    """buffer an environment variable for the following steps"""
+    with _lock:
+        _env.pop(key, None)
+        _env[key] = str(value)
+
+
+def add_summary(markdown):
+    """buffer a line of the step summary"""
+    with _lock:
+        _summary.append(str(markdown))
+
+
+def format_entry(key, value):
+    """format a key/value entry, using a heredoc delimiter for multi-line values"""
+    if '\n' not in value and '\r' not in value:
+        return f'{key}={value}\n'
+    delimiter = f'ghadelimiter_{uuid.uuid4()}'
+    return f'{key}<<{delimiter}\n{value}\n{delimiter}\n'
+
+
+def write_file(env_var, content):
+    """append content to the file named by GITHUB_OUTPUT, GITHUB_ENV or GITHUB_STEP_SUMMARY in a single write"""
+    file_path = os.getenv(env_var)
+    if not content or not file_path:
+        return
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write(content)
+
+
+def flush():
+    """write all buffered outputs, environment variables and summary lines at exit, one append per file"""
+    with _lock:
+        write_file('GITHUB_OUTPUT', ''.join(format_entry(k, v) for k, v in _outputs.items()))
+        write_file('GITHUB_ENV', ''.join(format_entry(k, v) for k, v in _env.items()))
+        write_file('GITHUB_STEP_SUMMARY', ''.join(f'{line}\n' for line in _summary))
+        _outputs.clear()
+        _env.clear()
+        _summary.clear()
+
+
+atexit.register(flush)
@@ -2,6 +2,7 @@ import subprocess
 import sys
 import os
 import yaml
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 workspace = os.getenv('GITHUB_WORKSPACE')
@@ -44,13 +45,13 @@ def generate_test_reports(build_var_map):
         lcov_dir = build_var_map.get('build_group').get('source-directory','')
         lcov_html_report_path = f"{workspace}/{lcov_dir}/coverage/lcov-report"
         logger.info(f"Lcov report path {lcov_report_path}")
-        os.system(f"echo 'lcov-report-path={workspace}/{lcov_dir}/{lcov_report_path}' >> $GITHUB_OUTPUT")
+        outputs.set_output('lcov-report-path', f"{workspace}/{lcov_dir}/{lcov_report_path}")
         logger.info(f"Lcov html report path {lcov_html_report_path}")
-        os.system(f"echo 'lcov-html-report-path={lcov_html_report_path}' >> $GITHUB_OUTPUT")
+        outputs.set_output('lcov-html-report-path', lcov_html_report_path)
 
     if cobertura_report_path:
         logger.info(f"cobertura report path {cobertura_report_path}")
-        os.system(f"echo 'cobertura-report-path={cobertura_report_path}' >> $GITHUB_OUTPUT")
+        outputs.set_output('cobertura-report-path', cobertura_report_path)
 
     if html_report_dir:
         try:
@@ -60,7 +61,7 @@ def generate_test_reports(build_var_map):
             ).strip()
             if html_report_path:
                 logger.info(f"HTML report path {html_report_path}")
-                os.system(f"echo 'html-report-path={html_report_path}' >> $GITHUB_OUTPUT")
+                outputs.set_output('html-report-path', html_report_path)
         except Exception as e:
             logger.error(logger.format_msg('GHA_BUILD_NPM_BIZ_4_2003', 'No HTML reports were produced', {'detailMessage': f'Test execution did not produce any HTML reports: {e}', 'metrics': {'status': 'failure'}}))
 
@@ -68,13 +69,13 @@ def generate_test_reports(build_var_map):
 def set_vars(config_map):
     runtime_version = config_map.get('runtime_version')
     if runtime_version:
-        os.system(f"echo 'runtime-version={runtime_version}' >> $GITHUB_OUTPUT")
+        outputs.set_output('runtime-version', runtime_version)
     test_flag_enabled = True if all([config_map.get('test_flag_enabled'), config_map.get('args_test')]) else False
-    os.system(f"echo 'args-build={config_map['args_build']}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'args-test={config_map['args_test']}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'test-flag-enabled={test_flag_enabled}' >> $GITHUB_OUTPUT")
+    outputs.set_output('args-build', config_map['args_build'])
+    outputs.set_output('args-test', config_map['args_test'])
+    outputs.set_output('test-flag-enabled', test_flag_enabled)
     if config_map['build_group'].get('build-tool','npm'):
-       os.system(f"echo 'build-tool={config_map['build_group'].get('build-tool','npm')}' >> $GITHUB_OUTPUT")
+       outputs.set_output('build-tool', config_map['build_group'].get('build-tool','npm'))
 
 
 if __name__ == '__main__':
@@ -3,6 +3,7 @@ import sys
 import yaml
 import os
 import re
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -28,11 +29,11 @@ def set_vars(config_map):
     build_type = config_map.get('app_props').get('build_type')
     runtime_version = config_map.get('runtime_version')
     pip_version = config_map.get('pip_version')
-    os.system(f"echo 'runtime-version={runtime_version}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'pip-version={pip_version}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'args-build={config_map.get('args_build')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'args-test={config_map.get('args_test')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'test-flag-enabled={config_map.get('test_flag_enabled')}' >> $GITHUB_OUTPUT")
+    outputs.set_output('runtime-version', runtime_version)
+    outputs.set_output('pip-version', pip_version)
+    outputs.set_output('args-build', config_map.get('args_build'))
+    outputs.set_output('args-test', config_map.get('args_test'))
+    outputs.set_output('test-flag-enabled', config_map.get('test_flag_enabled'))
 
 def test_report():
     '''
@@ -43,7 +44,7 @@ def test_report():
     try:
         report_path = f'{workspace}/htmlcov/index.html'
         logger.info(f"report path {report_path}")
-        os.system(f"echo 'report-path={report_path}' >> $GITHUB_OUTPUT")
+        outputs.set_output('report-path', report_path)
     except RuntimeError as e:
         raise RuntimeError(f'Error running build tests: {e}.')
 
@@ -6,6 +6,7 @@ import pytz
 import json
 import utils
 import utils.standalone_docker_build as standalone_docker_build
+import utils.outputs as outputs
 from datetime import datetime
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
@@ -34,7 +35,7 @@ def main():
                     check_docker_path()
                 build_docker_image(artifact_properties, docker_base_image, artifact_type,artifact_version)
                 image_repo = config_map.get('image').get('image_path')
-                subprocess.run([f"""echo "#### :shield: [Image path]({image_repo})" >> $GITHUB_STEP_SUMMARY"""], shell=True)
+                outputs.add_summary(f"#### :shield: [Image path]({image_repo})")
             elif operation == 'push':
                 docker_image_name = image_repo.split('/')[-1]
                 docker_image_repo = image_repo.split(f'/{docker_image_name}')[0]
@@ -56,7 +57,7 @@ def main():
             create_dockerfile(docker_base_image, image, namespace)
             image_tag = build_docker_image(artifact_properties, docker_base_image, 'vendor',artifact_version)
             logger.info(f'image tag: {image_tag}')
-            os.system(f"echo 'docker-image-name={image_tag}' >> $GITHUB_OUTPUT")
+            outputs.set_output('docker-image-name', image_tag)
             os.remove('Dockerfile')
         elif operation == 'push':
             image_repo = image_info.get('image_path')
@@ -120,7 +121,7 @@ def build_docker_image(artifact_properties, docker_base_image, artifact_type,art
     build_cmd_str = build_cmd.strip()
     image_build = subprocess.run([build_cmd_str], shell=True).returncode
     if image_build == 0:
-        os.system(f"echo 'docker-image-name={image_tag}' >> $GITHUB_OUTPUT")
+        outputs.set_output('docker-image-name', image_tag)
         return image_tag
     else: raise OSError('Docker build failed.')
     
@@ -139,28 +140,28 @@ def set_image_vars(deploy_var_map):
     deploy_env = os.getenv('DEPLOY_ENV')
     aks_constant_map = yaml.safe_load(aks_constants)
     image_base_url = aks_constant_map.get('registry-url').strip()
-    os.system(f"echo 'app-name={deploy_var_map.get('app_props').get('app_name')}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'deploy-environment={deploy_env}' >> $GITHUB_OUTPUT")
+    outputs.set_output('app-name', deploy_var_map.get('app_props').get('app_name'))
+    outputs.set_output('deploy-environment', deploy_env)
     service_map = deploy_var_map.get('deploy_config_yml').get(deploy_env)
     image_promotion = False
     if not any(deploy_env.startswith(substring) for substring in aks_constant_map.get('image-promotion-dev-envs', [])):
         image_promotion = True
     logger.info(f"image promotion for env = {deploy_env}: {image_promotion}")
-    os.system(f"echo 'image-promotion={image_promotion}' >> $GITHUB_OUTPUT")
+    outputs.set_output('image-promotion', image_promotion)
     if 'is_vendor_deployment' not in deploy_var_map.get('app_props'):
         image_map = deploy_var_map.get('image')
         image_repo_path = image_map.get('image_path')
-        os.system(f"echo 'image-ssha={image_repo_path.split('.')[-1]}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'image-path={image_repo_path.split(':')[0].replace(image_repo_path.split('/')[0],'').lstrip('/')}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'image-registry={service_map.get('image_registry')}.{image_base_url}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'image-promotion-registry={service_map.get('image_promotion_registry')}.{image_base_url}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'image-dir={deploy_var_map.get('app_props').get('image_dir')}' >> $GITHUB_OUTPUT")
+        outputs.set_output('image-ssha', image_repo_path.split('.')[-1])
+        outputs.set_output('image-path', image_repo_path.split(':')[0].replace(image_repo_path.split('/')[0],'').lstrip('/'))
+        outputs.set_output('image-registry', f"{service_map.get('image_registry')}.{image_base_url}")
+        outputs.set_output('image-promotion-registry', f"{service_map.get('image_promotion_registry')}.{image_base_url}")
+        outputs.set_output('image-dir', deploy_var_map.get('app_props').get('image_dir'))
         if deploy_var_map.get('app_props').get('artifact_type') == 'DOCKER':
-            os.system(f"echo 'app-version={deploy_var_map.get('build_props').get('APP_VERSION').lower().replace('-snapshot','').replace('-release','')}' >> $GITHUB_OUTPUT")
+            outputs.set_output('app-version', deploy_var_map.get('build_props').get('APP_VERSION').lower().replace('-snapshot','').replace('-release',''))
         else:
-            os.system(f"echo 'app-version={deploy_var_map.get('module_values_deploy').get('artifact_version').lower().replace('-snapshot','').replace('-release','')}' >> $GITHUB_OUTPUT")
+            outputs.set_output('app-version', deploy_var_map.get('module_values_deploy').get('artifact_version').lower().replace('-snapshot','').replace('-release',''))
     elif 'is_vendor_deployment' in deploy_var_map.get('app_props') and deploy_var_map.get('app_props').get('is_vendor_deployment') == True:
-        os.system(f"echo 'image-map={json.dumps(deploy_var_map)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('image-map', json.dumps(deploy_var_map))
 
 def create_dockerfile(docker_base_image, image, namespace):
     file_content = f"""FROM {docker_base_image}
@@ -12,6 +12,7 @@ import json
 import sys
 import os
 import subprocess
+import utils.outputs as outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -48,13 +49,9 @@ def set_target_registry():
         if not target_registry:
             raise KeyError(f"Invalid platform '{platform}' or registry '{registry}'")
 
-        # Directly write outputs
-        with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
-            f.write(f'target-registry={target_registry}\n')
-            f.write(f'result=success\n')
-
         logger.info(f"KP registry: {target_registry}")
-        os.system(f"echo 'target-registry={target_registry}' >> $GITHUB_OUTPUT")
+        outputs.set_output('target-registry', target_registry)
+        outputs.set_output('result', 'success')
         return target_registry
 
     except Exception as e:
@@ -104,7 +101,7 @@ def scan_image():
                 continue
 
             # Export the JSON file path as GitHub Actions output
-            os.system(f"echo 'scan-results={json_file}' >> $GITHUB_OUTPUT")
+            outputs.set_output('scan-results', json_file)
             logger.info(f"Scan completed. Results saved to {json_file}")
             scan_results_files.append(json_file)
 
@@ -153,7 +150,7 @@ def build_docker_image():
         build_cmd = f"docker build -t {image_url}:{image_tag} {label_args} ."
         subprocess.run(build_cmd, shell=True, check=True)
         logger.info(f"Successfully built image: {image_url}:{image_tag}")
-        os.system(f"echo 'docker-image={image_url}:{image_tag}' >> $GITHUB_OUTPUT") 
+        outputs.set_output('docker-image', f"{image_url}:{image_tag}")
         return f"{image_url}:{image_tag}"
 
     except subprocess.CalledProcessError as e:
@@ -212,7 +209,7 @@ def push_docker_image():
         subprocess.run(cleanup_cmd, shell=True, check=True)
 
         logger.info(f"Successfully pushed image: https://{target_registry}/ui/repos/tree/General/{platform}{image_path}")
-        os.system(f"echo 'image-url=https://{target_registry}/ui/repos/tree/General/{platform}{image_path}' >> $GITHUB_OUTPUT")
+        outputs.set_output('image-url', f"https://{target_registry}/ui/repos/tree/General/{platform}{image_path}")
         return target_image
 
     except Exception as e:
@@ -2,6 +2,7 @@ import os
 import yaml
 import json
 from datetime import datetime
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -149,8 +150,8 @@ def main():
         raise Exception(f"{COLOR_RED} Error encountered while determining the quality gate : {e}")
     logger.info(f"exception status map: {exception_status_map}")
     logger.info(f"exception expiration date map: {exception_expiration_date_map}")
-    os.system(f"echo 'exception-status-map={json.dumps(exception_status_map)}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'exception-expiration-date-map={json.dumps(exception_expiration_date_map)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('exception-status-map', json.dumps(exception_status_map))
+    outputs.set_output('exception-expiration-date-map', json.dumps(exception_expiration_date_map))
 
         
 def check_exclusion_expiration(expiration_date):
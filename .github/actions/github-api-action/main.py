@@ -6,6 +6,7 @@ from utils import gh_cli
 from utils import gh_repos
 from utils import gh_branch_rules
 from utils import gh_utils
+from utils import outputs
 from urllib.parse import urlparse
 from kpghalogger import KpghaLogger
 
@@ -60,8 +61,8 @@ def set_result():
     jenkins_url = os.getenv('JENKINS_URL')
     test_url = git_url or jenkins_url
 
-    os.system(f"echo 'test-url={test_url}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'test-result={test_result}' >> $GITHUB_OUTPUT")
+    outputs.set_output('test-url', test_url)
+    outputs.set_output('test-result', test_result)
 
 def login_gha():
     server_url = os.getenv('GITHUB_SERVER_URL')
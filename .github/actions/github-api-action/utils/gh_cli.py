@@ -6,6 +6,7 @@ import yaml
 import json
 import pytz
 from datetime import datetime
+from utils import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -50,7 +51,9 @@ def check_secrets():
     accepted_pattern = r"^[a-zA-z0-9]+$"
     for x,y in zip(secret_names, secret_values):
         logger.info(f'Checking secret {x}...')
-        os.system(f"echo '::add-mask::{y}' && echo '{x}={y}' >> $GITHUB_ENV")
+        for line in y.splitlines() or [y]: # mask before the value is buffered, one line per command
+            print(f'::add-mask::{line}', flush=True)
+        outputs.set_env(x, y)
     for name in secret_names:
         if not bool(re.match(accepted_pattern, name)):
             raise Exception(f"{COLOR_RED}Failed to add secret. Secret names can only contain alphanumeric characters ([a-z], [A-Z], [0-9]) or underscores (_). Spaces are not allowed. Must start with a letter ([a-z], [A-Z]) or underscores (_).")
@@ -61,11 +64,11 @@ def check_secrets():
             elif name.upper().endswith('PROD'):
                 env = 'prod'
                 secret_env['prod'] = True
-                os.system(f"echo 'DEPLOY_ENV={env}' >> $GITHUB_ENV")
+                outputs.set_env('DEPLOY_ENV', env)
             else:
                 raise Exception(f'{COLOR_RED}Secret name must start with AZ or end with PROD, NONPROD, or NON_PROD.')
             logger.info(f'Setting KP config check to {env} secret')
-    os.system(f"echo 'env-name={json.dumps(secret_env)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('env-name', json.dumps(secret_env))
 
 
 def regression():
@@ -122,7 +125,7 @@ def check_workflow(job_type, repo_name="", watch_run=False, qtest_folder="", dod
             gh_run = re.split('\s+', gh_run_list.stdout.decode().strip().split('workflow_dispatch')[1].strip())[0]
             run_url = f'{github_url}/{github_repo}/actions/runs/{gh_run}'
             logger.info(f'GH run URL: {run_url}')
-            os.system(f"echo 'test-url={run_url}' >> $GITHUB_OUTPUT")
+            outputs.set_output('test-url', run_url)
 
         if ((watch_run and job_type == "Regression") or job_type == "Deployment Validation"):
             try:
@@ -140,7 +143,7 @@ def check_workflow(job_type, repo_name="", watch_run=False, qtest_folder="", dod
                 logger.info(f'Job passed at {run_url}')
             else:
                 logger.info(f'Job failed at {run_url}')        
-            os.system(f"echo 'test-result={job_status}' >> $GITHUB_OUTPUT")
+            outputs.set_output('test-result', job_status)
             logger.info(f'{job_type} job result: {job_status}')
 
     except Exception as e:
@@ -234,7 +237,7 @@ def rate_limit():
         elif api_remaining < 150 and prod_deploy:
             logger.error(f'API rate limit remaining ({api_remaining} - reset at {reset} PST) could result in incomplete deployment. Setting output for check approval.')
             rate_limit_check_approval = {'remaining':api_remaining, 'reset':reset}
-            os.system(f"echo 'rate-limit={json.dumps(rate_limit_check_approval)}' >> $GITHUB_OUTPUT")
+            outputs.set_output('rate-limit', json.dumps(rate_limit_check_approval))
         else:
             logger.info(f'API rate limit remaining ({api_remaining} - reset at {reset} PST) does not exceed threshold of < {api_threshold}.')
     except (RuntimeError, AttributeError) as e:
@@ -5,6 +5,7 @@ import json
 import yaml
 import sys
 import requests
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -205,10 +206,10 @@ def onboard_application(tro_codebase_id, onboard_url, team_name, project_name, n
             if (entry.get('type') == 'Nexus'):
                 nexus_id = entry.get('id')
         logger.info(f"Application ID (NexusID): {nexus_id}, Checkmarx Name: {checkmarx_name}, Checkmarx ID: {checkmarx_id}")
-        os.system(f"echo 'nexus-id={nexus_id}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'checkmarx-name={checkmarx_name}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'checkmarx-id={checkmarx_id}' >> $GITHUB_OUTPUT")
-        os.system(f"echo 'team-name={team_name}' >> $GITHUB_OUTPUT")
+        outputs.set_output('nexus-id', nexus_id)
+        outputs.set_output('checkmarx-name', checkmarx_name)
+        outputs.set_output('checkmarx-id', checkmarx_id)
+        outputs.set_output('team-name', team_name)
         
         # Check if required outputs are empty and fail the workflow if they are
         if not (checkmarx_name and nexus_id and checkmarx_id):
@@ -228,7 +229,7 @@ def create_notification_map(email_list, notification_message):
     notification_map = {}
     notification_map['email_recipients'] = email_list
     notification_map['message'] = notification_message
-    os.system(f"echo 'notification-map={json.dumps(notification_map)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('notification-map', json.dumps(notification_map))
 
 
 if __name__ == '__main__':
@@ -10,6 +10,7 @@ import os
 import yaml
 import pytz
 from datetime import datetime
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -49,7 +50,7 @@ def main():
             message_deploy_data['env'] = message_data_obj.get('deploy_env')
             message_deploy_data['rollback'] = message_data_obj.get('rollback', False)
             message_deploy_data['rollbackVersion'] = last_deployed_version.get('version') if last_deployed_version else (message_data_obj.get('rollback_version') or message_data_obj.get('rollbackVersion'))
-            os.system(f"echo 'artifact-version={message_deploy_data['version']}' >> $GITHUB_OUTPUT")
+            outputs.set_output('artifact-version', message_deploy_data['version'])
             message_data_obj = construct_deploy_data(message_deploy_data)
         artifact_labels = message_data_obj['metadata']['labels'] if message_data_obj else None
         logger.info(f"Artifact labels: {artifact_labels}")
@@ -77,7 +78,7 @@ def main():
         logger.error(f"[ERROR] In send message to mq: {e}")
         notification_map = {}
         notification_map['message'] = f"Error sending message to message queue: {e}"
-        os.system(f"echo 'notification-map={json.dumps(notification_map)}' >> $GITHUB_OUTPUT")
+        outputs.set_output('notification-map', json.dumps(notification_map))
         raise Exception(f"In send message to mq: {e}")
 
 
@@ -137,7 +138,7 @@ def construct_deploy_data(message_data):
 def send_msg(mq_host, user_name, user_pass, exchange, queue, routing_key, message_data_obj):
     message_data_obj.get('data')[0].update({'buildURL': os.getenv('BUILD_URL')})
     artifact_labels = message_data_obj['metadata']['labels'][0] if message_data_obj else None
-    os.system(f"echo 'artifact-labels={artifact_labels}' >> $GITHUB_OUTPUT")
+    outputs.set_output('artifact-labels', artifact_labels)
     logger.info(f"Host -> {mq_host}")
     logger.info(f"User -> {user_name}")
     logger.info(f"Exchange -> {exchange}")
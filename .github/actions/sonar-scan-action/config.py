@@ -0,0 +1,60 @@
+"""lazy, memoized access to configuration passed through environment variables"""
+import os
+import copy
+import json
+import yaml
+import threading
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _load(name, parser):
+    """parse an environment variable on first use only"""
+    key = (name, parser)
+    if key not in _cache:
+        with _lock:
+            if key not in _cache:
+                raw = os.getenv(name)
+                _cache[key] = parser(raw) if raw else None
+    return _cache[key]
+
+
+def to_bool(value, default=False) -> bool:
+    """convert a 'true'/'false' string or a YAML boolean to bool"""
+    if value is None or value == '':
+        return default
+    return value if isinstance(value, bool) else str(value).lower() == 'true'
+
+
+def get_str(name, default=None) -> str:
+    """get a string environment variable"""
+    return os.getenv(name) or default
+
+
+def get_bool(name, default=False) -> bool:
+    """get a 'true'/'false' environment variable"""
+    return to_bool(os.getenv(name), default)
+
+
+def get_int(name, default=0) -> int:
+    """get an integer environment variable"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def get_yaml(name, default=None):
+    """get a YAML environment variable, parsed once - callers must not modify the returned value"""
+    value = _load(name, yaml.safe_load)
+    return copy.copy(default) if value is None else value
+
+
+def get_json(name, default=None):
+    """get a JSON environment variable, parsed once - callers must not modify the returned value"""
+    value = _load(name, json.loads)
+    return copy.copy(default) if value is None else value
+
+
+def map_value(name, key):
+    """look up a key in a YAML map environment variable, returning the key itself when not mapped"""
+    return get_yaml(name, {}).get(key, key)
@@ -7,21 +7,23 @@ import re
 import base64
 from time import sleep
 from urllib.parse import unquote
+import config
+import outputs
 from kpghalogger import KpghaLogger
 import json
 logger = KpghaLogger()
 
 COLOR_RED = "\u001b[31m"
-workspace = os.getenv('GITHUB_WORKSPACE')
-sonar_user = os.getenv('SONARQUBE_TOKEN')
-git_branch = os.getenv('GITHUB_REF_NAME')
-repo_name = os.getenv('PROJECT_GIT_REPO')
-org_name = os.getenv('PROJECT_GIT_ORG')
-base_branch = os.getenv('GITHUB_HEAD_REF')
-target_branch = os.getenv('GITHUB_BASE_REF')
+workspace = config.get_str('GITHUB_WORKSPACE')
+sonar_user = config.get_str('SONARQUBE_TOKEN')
+git_branch = config.get_str('GITHUB_REF_NAME')
+repo_name = config.get_str('PROJECT_GIT_REPO')
+org_name = config.get_str('PROJECT_GIT_ORG')
+base_branch = config.get_str('GITHUB_HEAD_REF')
+target_branch = config.get_str('GITHUB_BASE_REF')
 sonar_url = yaml.safe_load(os.getenv('SONARQUBE_URL')).get('production')
 quality_gate = yaml.safe_load(os.getenv('SONARQUBE_QUALITY_GATE'))
-sonar_quality_profiles = os.getenv('SONAR_QUALITY_PROFILE')
+sonar_quality_profiles = config.get_str('SONAR_QUALITY_PROFILE')
 token = base64.b64encode(f"{sonar_user}:".encode()).decode()
 header = {'Authorization': f"Basic {token}"}
 
@@ -49,7 +51,7 @@ def main(build_var_map):
         # vars from build map
         global quality_gate
         build_group = build_var_map.get('build_group')
-        sonar_clean_build = build_group.get('sonarCoverageCheck') if build_group.get('sonarCoverageCheck') else False
+        sonar_clean_build = config.to_bool(build_group.get('sonarCoverageCheck'))
         logger.info(f"Sonar coverage check during declar: {sonar_clean_build}")
         app_type = build_var_map.get('app_type')
         project_version = build_var_map.get('module_values_project').get('artifact_version')
@@ -80,7 +82,7 @@ def main(build_var_map):
             quality_gate = yaml.safe_load(os.getenv('CLEANBUILD_SONARQUBE_QUALITY_GATE'))
         check_if_project_exists(sonar_url, quality_gate, org_name, repo_name)
         # run sonar scan
-        if os.getenv('GHA_ORG') == 'ENTERPRISE':
+        if config.get_str('GHA_ORG') == 'ENTERPRISE':
            sonar_project_key = f"-Dsonar.projectKey={repo_name}"
         else:
            sonar_project_key = f"-Dsonar.projectKey={org_name}:{repo_name}"
@@ -127,7 +129,7 @@ def main(build_var_map):
             if match:
                 logger.info("Sonar report Pattern found in the output")
                 sonar_summary_report = match.group(1) or match.group(2)
-                subprocess.run([f"""echo "#### :chart_with_upwards_trend: [Sonar report]({sonar_summary_report})" >> $GITHUB_STEP_SUMMARY"""], shell=True)
+                outputs.add_summary(f"#### :chart_with_upwards_trend: [Sonar report]({sonar_summary_report})")
     # You can perform additional operations here
             else:
                 logger.info("Sonar report url pattern not found in the output")        
@@ -139,7 +141,7 @@ def main(build_var_map):
         report_path_cmd = f"cat {project_src_dir}/.scannerwork/report-task.txt | grep 'ceTaskUrl' | cut -d= -f2,3"
         report_analysis_id = subprocess.check_output(
             [report_path_cmd], shell=True, text=True).strip()
-        os.system(f"echo 'scan-report-analysis-id={report_analysis_id}' >> $GITHUB_OUTPUT")
+        outputs.set_output('scan-report-analysis-id', report_analysis_id)
         #os.system(f"echo 'scan-report-url={sonar_summary_report}' >> $GITHUB_OUTPUT")
         logger.info(logger.format_msg('GHA_TRO_SONAR_BIZ_2_0002', 'Sonar scan completed', {'detailMessage': f'Sonar scan completed on analysis report id: {report_analysis_id}', 'metrics': {'status': 'success'}}))
     except Exception as e:
@@ -148,7 +150,7 @@ def main(build_var_map):
     
 
 def check_if_project_exists(sonar_url, quality_gate, org_name, repo_name):
-    sonar_project_key = f"{repo_name}" if os.getenv('GHA_ORG') == 'ENTERPRISE' else f"{org_name}:{repo_name}"
+    sonar_project_key = f"{repo_name}" if config.get_str('GHA_ORG') == 'ENTERPRISE' else f"{org_name}:{repo_name}"
     request = requests.get(f"{sonar_url}api/project_analyses/search?project={sonar_project_key}", headers=header)
     logger.info(f"checking if the project exists in sonar : {request.status_code}")
     # create new project
@@ -185,8 +187,8 @@ def check_if_project_exists(sonar_url, quality_gate, org_name, repo_name):
 def assign_quality_gate(sonar_project_key, quality_gate):
     request_quality_url = f"{sonar_url}api/qualitygates/select?gateName={quality_gate}&projectKey={sonar_project_key}"
     logger.info(f"Sending request to: {request_quality_url}")
-    max_retries = 3
-    backoff = 2
+    max_retries = config.get_int('SONAR_GATE_RETRIES', 3)
+    backoff = config.get_int('SONAR_GATE_BACKOFF', 2)
     for attempt in range(max_retries):
         try:
             response = requests.post(request_quality_url, headers=header)
@@ -256,6 +258,6 @@ def default_sonar_coverage_excl(app_type):
 
 if __name__ == '__main__':
     logger.info(logger.format_msg('GHA_EVENT_ACTION_AUD_2_9000', 'action entry/exit point', {"detailMessage": "action metric", "metrics": {"state": "start"}}))
-    build_map = yaml.safe_load(os.getenv('CONFIG_MAP'))
+    build_map = config.get_yaml('CONFIG_MAP')
     main(build_map)
     logger.info(logger.format_msg('GHA_EVENT_ACTION_AUD_2_9000', 'action entry/exit point', {"detailMessage": "action metric", "metrics": {"state": "end"}}))
\ No newline at end of file
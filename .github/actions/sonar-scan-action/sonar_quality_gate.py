@@ -5,23 +5,28 @@ import time
 import yaml
 import json
 import re
+import config
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
 COLOR_RED = "\u001b[31m"
-sonar_user = os.getenv('SONARQUBE_TOKEN')
-branch_name = os.getenv('GITHUB_REF_NAME')
-is_pr = os.environ.get('GITHUB_HEAD_REF')
-git_branch = os.getenv('GITHUB_REF_NAME')
-org_name = os.getenv('PROJECT_GIT_ORG')
-bot_deploy = os.getenv('BOT_DEPLOY')
-bot_rule_map = os.getenv('BOT_RULES_MAP')
-sonar_exception_result = json.loads(os.getenv('SONAR_EXCEPTION_STATUS')).get('sonar') if (org_name == 'CDO-KP-ORG' or org_name == 'SDS') and os.getenv('SONAR_EXCEPTION_STATUS') else False
+sonar_user = config.get_str('SONARQUBE_TOKEN')
+branch_name = config.get_str('GITHUB_REF_NAME')
+is_pr = config.get_str('GITHUB_HEAD_REF')
+git_branch = config.get_str('GITHUB_REF_NAME')
+org_name = config.get_str('PROJECT_GIT_ORG')
+bot_deploy = config.get_str('BOT_DEPLOY')
+bot_rule_map = config.get_str('BOT_RULES_MAP')
+sonar_exception_status = config.get_json('SONAR_EXCEPTION_STATUS')
+sonar_exception_result = sonar_exception_status.get('sonar') if (org_name == 'CDO-KP-ORG' or org_name == 'SDS') and sonar_exception_status else False
 header = {'Authorization': f"{sonar_user}"}
 base_sonar_url = 'https://sonarqube-bluemix.kp.org/api'
-config_map = yaml.safe_load(os.getenv('CONFIG_MAP'))
-build_group = config_map.get('build_group')
-sonar_clean_build = build_group.get('sonarCoverageCheck') if build_group.get('sonarCoverageCheck') else False
+
+def get_sonar_clean_build():
+    """sonarCoverageCheck flag from the build group of CONFIG_MAP"""
+    build_group = config.get_yaml('CONFIG_MAP', {}).get('build_group') or {}
+    return config.to_bool(build_group.get('sonarCoverageCheck'))
 
 def get_quality_gate_status(analysis_id):
     url = f"{base_sonar_url}/qualitygates/project_status?analysisId={analysis_id}"
@@ -61,11 +66,11 @@ def get_quality_gate_status(analysis_id):
     logger.info(f"[INFO]: quality gate status is {quality_gate_status}")
     pr_result_map(quality_gate_status)
     logger.info(f"Sonar info --> Artifact Version: {artifact_version} -- Quality Gate Status: {quality_gate_status}")
-    os.system(f"echo 'quality-gate-status={quality_gate_status}' >> $GITHUB_OUTPUT")
-    logger.info(f"Sonar coverage check: {sonar_clean_build}")
-    if not is_pr and sonar_clean_build and quality_gate_status != "OK":
+    outputs.set_output('quality-gate-status', quality_gate_status)
+    logger.info(f"Sonar coverage check: {get_sonar_clean_build()}")
+    if not is_pr and get_sonar_clean_build() and quality_gate_status != "OK":
         raise Exception(f"{COLOR_RED}Error in Sonar Quality Gate status: {quality_gate_status}")
-    os.system(f"echo 'quality-gate-project-status={json.dumps(quality_gate_project_status)}' >> $GITHUB_OUTPUT")
+    outputs.set_output('quality-gate-project-status', json.dumps(quality_gate_project_status))
 
 def pr_result_map(quality_gate_status):
     #Creating resultmap to add comments in the conversation of Pull request
@@ -82,11 +87,11 @@ def pr_result_map(quality_gate_status):
             if quality_gate_status == "OK":
                 sonar_gate_check_result = True
                 sonar_gate_check_comment = "Quality Gate passed for pull request"
-            elif quality_gate_status != "OK" and sonar_exception_result == False and not sonar_clean_build:
+            elif quality_gate_status != "OK" and sonar_exception_result == False and not get_sonar_clean_build():
                 logger.info("Sonar quality gate exception is enabled")
                 sonar_gate_check_result = True
                 sonar_gate_check_comment = "Quality Gate passed for pull request (exception applied)"
-            elif quality_gate_status != "OK" and sonar_clean_build:
+            elif quality_gate_status != "OK" and get_sonar_clean_build():
                 sonar_gate_check_result = False
                 sonar_gate_check_comment = "Quality Gate failed for pull request. Please find the report in summary "
             else:
@@ -95,7 +100,7 @@ def pr_result_map(quality_gate_status):
 
             result_map['result_map'].append({'title':sonar_gate_check_title, 'squads': sonar_gate_check_squad, 'result': sonar_gate_check_result, 'comments': f'{sonar_gate_check_comment}' }) 
             logger.info(f"result map in sonar check: {result_map}")
-            os.system(f"echo 'result-map={json.dumps(result_map)}' >> $GITHUB_OUTPUT")
+            outputs.set_output('result-map', json.dumps(result_map))
         except Exception as e:
             logger.error(f'Error in PR Result map method :{e}.')
             raise Exception(f'{COLOR_RED}Error in PR Result map method :{e}.')
@@ -4,6 +4,7 @@ import json
 import yaml
 import time
 import subprocess
+import outputs
 from kpghalogger import KpghaLogger
 logger = KpghaLogger()
 
@@ -155,7 +156,7 @@ def run_alignment(tidelift_project_name, tidelift_organization, tidelift_debug_s
             # set output to pass to artifactory action
             scan_results = {'TIDELIFT_ALIGNMENT': f"{alignment_map['alignment_pct']}"}
 
-            os.system(f"echo 'scan-alignment={json.dumps(scan_results)}' >> $GITHUB_OUTPUT")
+            outputs.set_output('scan-alignment', json.dumps(scan_results))
     except Exception as e:
         logger.warning(logger.format_msg('GHA_TRO_TIDELIFT_BIZ_4_1003', 'Tidelift response.json cannot be read', {'detailMessage': f'Error reading response.json: {e}', 'metrics': {'status': 'failure'}}))
     return alignment_msg, alignment_map    
@@ -283,13 +284,13 @@ def main():
         else:
             tidelift_check_result = True
             logger.error("BOT Tidelift check is marked as SKIP!")
-    os.system(f"echo 'tidelift-pct={str(align_pct)}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'tidelift-results-url={str(alignment_map['details_url'])}' >> $GITHUB_OUTPUT")
-    os.system(f"echo 'tidelift-check-result={tidelift_check_result}' >> $GITHUB_OUTPUT")
+    outputs.set_output('tidelift-pct', str(align_pct))
+    outputs.set_output('tidelift-results-url', str(alignment_map['details_url']))
+    outputs.set_output('tidelift-check-result', tidelift_check_result)
 
     logger.info(logger.format_msg('GHA_TRO_TIDELIFT_AUD_2_0006', 'Tidelift result', {'detailMessage': f'TL check: {tidelift_check_comment}', 'metrics': {'alignmentscore': align_pct, 'failurethreshold': tidelift_failure_threshold, 'checkresult': tidelift_check_result, 'checkexception': tidelift_exception_result}}))
     if alignment_map:
-        subprocess.run([f"""echo "#### :shield: [Tidelift report URL]({alignment_map.get('details_url')})" >> $GITHUB_STEP_SUMMARY"""], shell=True)
+        outputs.add_summary(f"#### :shield: [Tidelift report URL]({alignment_map.get('details_url')})")
     result_map = check_pr_branch_and_create_result_map(tidelift_check_result, tidelift_check_comment)
     return result_map
 
@@ -297,7 +298,7 @@ def main():
 if __name__ == '__main__':
     logger.info(logger.format_msg('GHA_EVENT_ACTION_AUD_2_9000', 'action entry/exit point', {"detailMessage": "action metric", "metrics": {"state": "start"}}))
     result_map = main()
-    os.system(f"echo 'tidelift-result-check-status={json.dumps(result_map)}' >> $GITHUB_OUTPUT") 
+    outputs.set_output('tidelift-result-check-status', json.dumps(result_map))
     logger.info(logger.format_msg('GHA_TRO_TIDELIFT_BIZ_2_0005', 'Tidelift PR check Result Map', {'detailMessage': result_map, 'metrics': {'status': 'success'}}))
     logger.info(logger.format_msg('GHA_EVENT_ACTION_AUD_2_9000', 'action entry/exit point', {"detailMessage": "action metric", "metrics": {"state": "end"}}))
     
\ No newline at end of file